@@ -1,24 +1,88 @@
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
 
+import asyncio
+import base64
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import copy_context
+import csv
+import io
+from datetime import datetime, timedelta
+from enum import Enum
+from functools import lru_cache, wraps
+import json
 from os import environ
+from types import SimpleNamespace
 from uuid import UUID
-from fastapi import Depends, FastAPI, HTTPException, Response, Request, status
-from fastapi.responses import RedirectResponse, JSONResponse
-from clients.notify import NotificationsAPIClient
-from requests import HTTPError
+from anyio import from_thread
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Response,
+    Request,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import RedirectResponse, StreamingResponse
+from api_gateway.cache import TTLCache
+from api_gateway.responses import ORJSONResponse, dumps
+from clients.notify import (
+    AsyncNotificationsAPIClient,
+    CircuitBreaker,
+    DeadlineExceededError,
+    NotificationsAPIClient,
+    RateLimiter,
+    RateLimitExceededError,
+    create_http_client,
+    notify_deadline,
+)
+from notifications_python_client.errors import APIError
+from requests import HTTPError, RequestException
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.engine.row import Row
 from sqlalchemy.exc import SQLAlchemyError, NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import func, cast
 from sqlalchemy.orm import Session
-from sqlalchemy import String, text
-from database.db import db_session
+from sqlalchemy import (
+    ARRAY,
+    String,
+    and_,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    update,
+)
+from database.db import (
+    async_db_engine,
+    async_db_reader_engine,
+    async_db_reader_session,
+    async_db_session,
+    db_engine,
+    db_reader_engine,
+    db_reader_session,
+    db_session,
+    pool_profile,
+)
+from database.pool import add_pool_metrics
+from database.replica import ReplicaMonitor
 from logger import log
+from request_timing import time_request
 
 from aws_lambda_powertools import Metrics
-from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.metrics import MetricUnit, single_metric
 
+from models.ImportUpload import ImportUpload
 from models.List import List
+from models.OutboxNotification import OutboxNotification
+from models.SendJob import SendJob
 from models.Subscription import Subscription
 
 from typing import Optional
@@ -46,6 +110,29 @@ if API_AUTH_TOKEN is None or not API_AUTH_TOKEN:
 METRICS_EMAIL_TARGET = "email"
 METRICS_SMS_TARGET = "sms"
 NOTIFY_KEY = environ.get("NOTIFY_KEY")
+NOTIFY_BASE_URL = "https://api.notification.canada.ca"
+NOTIFY_CONNECT_TIMEOUT = float(environ.get("NOTIFY_CONNECT_TIMEOUT", 5))
+NOTIFY_READ_TIMEOUT = float(environ.get("NOTIFY_READ_TIMEOUT", 30))
+NOTIFY_HTTP2 = environ.get("NOTIFY_HTTP2", "").lower() in ("1", "true")
+# Retries of 429, 503 and connection failures, waiting at most this long each time
+NOTIFY_MAX_RETRIES = int(environ.get("NOTIFY_MAX_RETRIES", 2))
+NOTIFY_MAX_RETRY_DELAY = float(environ.get("NOTIFY_MAX_RETRY_DELAY", 5))
+# Notify calls fail fast for a while after this many consecutive failures
+NOTIFY_CIRCUIT_FAILURE_THRESHOLD = int(
+    environ.get("NOTIFY_CIRCUIT_FAILURE_THRESHOLD", 5)
+)
+NOTIFY_CIRCUIT_RESET_SECONDS = float(environ.get("NOTIFY_CIRCUIT_RESET_SECONDS", 30))
+# Requests per minute each process sends to a Notify service, by endpoint
+NOTIFY_RATE_LIMIT_EMAIL = int(environ.get("NOTIFY_RATE_LIMIT_EMAIL", 600))
+NOTIFY_RATE_LIMIT_SMS = int(environ.get("NOTIFY_RATE_LIMIT_SMS", 600))
+NOTIFY_RATE_LIMIT_BULK = int(environ.get("NOTIFY_RATE_LIMIT_BULK", 60))
+NOTIFY_RATE_LIMIT_BURST = int(environ.get("NOTIFY_RATE_LIMIT_BURST", 10))
+# Longest wait for the rate limit before a confirmation is deferred to the outbox
+NOTIFY_RATE_LIMIT_MAX_WAIT = float(environ.get("NOTIFY_RATE_LIMIT_MAX_WAIT", 1))
+# Bulk sends have no outbox to fall back on, so they wait longer
+NOTIFY_RATE_LIMIT_BULK_MAX_WAIT = float(
+    environ.get("NOTIFY_RATE_LIMIT_BULK_MAX_WAIT", 30)
+)
 REDIRECT_ALLOW_LIST = [
     "ircc.digital.canada.ca",
     "ircc.numerique.canada.ca",
@@ -53,6 +140,99 @@ REDIRECT_ALLOW_LIST = [
     "articles.alpha.canada.ca",
 ]
 BASE_URL = environ.get("BASE_URL", "https://list-manager.alpha.canada.ca")
+# Number of rows fetched per round trip by the server-side cursor of a streamed send
+SEND_STREAM_BATCH_SIZE = int(environ.get("SEND_STREAM_BATCH_SIZE", 1000))
+# Maximum number of bulk chunks posted to Notify at the same time
+NOTIFY_BULK_MAX_IN_FLIGHT = int(environ.get("NOTIFY_BULK_MAX_IN_FLIGHT", 4))
+# Page size bounds of the paginated /lists responses
+LISTS_PAGE_DEFAULT_LIMIT = int(environ.get("LISTS_PAGE_DEFAULT_LIMIT", 100))
+LISTS_PAGE_MAX_LIMIT = int(environ.get("LISTS_PAGE_MAX_LIMIT", 1000))
+# Rows fetched per round trip, and page size bounds, of subscriber exports
+SUBSCRIBERS_EXPORT_BATCH_SIZE = int(environ.get("SUBSCRIBERS_EXPORT_BATCH_SIZE", 1000))
+SUBSCRIBERS_PAGE_MAX_LIMIT = int(environ.get("SUBSCRIBERS_PAGE_MAX_LIMIT", 1000))
+# Largest POST /subscriptions/batch, and the smallest group of confirmations
+# sharing a template that is sent through Notify's bulk endpoint
+SUBSCRIPTION_BATCH_MAX_SIZE = int(environ.get("SUBSCRIPTION_BATCH_MAX_SIZE", 100))
+SUBSCRIPTION_BATCH_BULK_MIN_SIZE = int(
+    environ.get("SUBSCRIPTION_BATCH_BULK_MIN_SIZE", 2)
+)
+# List metadata read on the public subscription paths is cached per process
+LIST_CACHE_TTL_SECONDS = int(environ.get("LIST_CACHE_TTL_SECONDS", 60))
+LIST_CACHE_MAX_SIZE = int(environ.get("LIST_CACHE_MAX_SIZE", 1024))
+# Number of uploaded subscribers imported per transaction
+IMPORT_BATCH_SIZE = int(environ.get("IMPORT_BATCH_SIZE", 5000))
+# Uploaded lines longer than this, in bytes, are counted invalid unread
+IMPORT_MAX_LINE_LENGTH = int(environ.get("IMPORT_MAX_LINE_LENGTH", 4096))
+# Running send jobs not updated for this long are considered stalled and resumed
+SEND_JOB_STALE_SECONDS = int(environ.get("SEND_JOB_STALE_SECONDS", 300))
+# Time kept at the end of an invocation to record a send job's progress and
+# hand it over. Notify calls, retries and rate limit waits included, must end
+# before it, so a chunk is never cut off after Notify may have accepted it
+SEND_JOB_HANDOFF_MS = int(environ.get("SEND_JOB_HANDOFF_MS", 5000))
+# Time left in an invocation below which a send job hands over to a new
+# invocation, by default enough for one Notify request
+SEND_JOB_TIME_MARGIN_MS = int(
+    environ.get(
+        "SEND_JOB_TIME_MARGIN_MS",
+        (NOTIFY_CONNECT_TIMEOUT + NOTIFY_READ_TIMEOUT) * 1000 + SEND_JOB_HANDOFF_MS,
+    )
+)
+# Confirmation and unsubscribe messages are written to an outbox table in the
+# same transaction as the subscription change and sent by the drain task
+NOTIFICATION_OUTBOX = environ.get("NOTIFICATION_OUTBOX", "").lower() in ("1", "true")
+NOTIFICATION_OUTBOX_BATCH_SIZE = int(environ.get("NOTIFICATION_OUTBOX_BATCH_SIZE", 50))
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(
+    environ.get("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 8)
+)
+NOTIFICATION_OUTBOX_BACKOFF_SECONDS = int(
+    environ.get("NOTIFICATION_OUTBOX_BACKOFF_SECONDS", 30)
+)
+NOTIFICATION_OUTBOX_MAX_BACKOFF_SECONDS = 3600
+NOTIFICATION_OUTBOX_TIME_MARGIN_MS = int(
+    environ.get("NOTIFICATION_OUTBOX_TIME_MARGIN_MS", 35000)
+)
+# Read-only routes fall back to the primary while the replica lags more than this
+DB_READER_MAX_LAG_SECONDS = float(environ.get("DB_READER_MAX_LAG_SECONDS", 30))
+DB_READER_CHECK_INTERVAL_SECONDS = float(
+    environ.get("DB_READER_CHECK_INTERVAL_SECONDS", 10)
+)
+# How often a server deployment publishes its connection pool metrics
+DB_POOL_METRICS_INTERVAL_SECONDS = int(
+    environ.get("DB_POOL_METRICS_INTERVAL_SECONDS", 60)
+)
+
+
+def add_db_pool_metrics():
+    add_pool_metrics(metrics, "Db", db_engine.pool)
+    if async_db_engine is not None:
+        add_pool_metrics(metrics, "AsyncDb", async_db_engine.pool)
+    if db_reader_engine is not None:
+        add_pool_metrics(metrics, "DbReader", db_reader_engine.pool)
+    if async_db_reader_engine is not None:
+        add_pool_metrics(metrics, "AsyncDbReader", async_db_reader_engine.pool)
+
+
+async def publish_db_pool_metrics():
+    # Lambda flushes metrics after each invocation; a long-running server
+    # publishes on a timer instead
+    while True:
+        await asyncio.sleep(DB_POOL_METRICS_INTERVAL_SECONDS)
+        try:
+            add_db_pool_metrics()
+            metrics.flush_metrics()
+        except Exception as err:
+            log.error(err)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    task = None
+    if pool_profile == "server":
+        task = asyncio.create_task(publish_db_pool_metrics())
+    yield
+    if task is not None:
+        task.cancel()
+
 
 description = """
 List Manager 📝 API helps you manage your lists of subscribers and easily utilize GC Notify to send messages
@@ -62,8 +242,19 @@ app = FastAPI(
     description=description,
     version="0.0.1",
     openapi_url=settings.openapi_url,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 metrics = Metrics(namespace="ListManager", service="api")
+list_cache = TTLCache(maxsize=LIST_CACHE_MAX_SIZE, ttl=LIST_CACHE_TTL_SECONDS)
+notify_clients = TTLCache(maxsize=32, ttl=3600)
+reader_monitor = None
+if db_reader_engine is not None:
+    reader_monitor = ReplicaMonitor(
+        db_reader_engine,
+        max_lag_seconds=DB_READER_MAX_LAG_SECONDS,
+        check_interval=DB_READER_CHECK_INTERVAL_SECONDS,
+    )
 
 
 async def exceptions_middleware(request: Request, call_next):
@@ -71,7 +262,7 @@ async def exceptions_middleware(request: Request, call_next):
         return await call_next(request)
     except Exception as err:
         # catch unhandled exceptions
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"message": f"Internal server error. Detail: {err}"},
         )
@@ -80,13 +271,112 @@ async def exceptions_middleware(request: Request, call_next):
 app.middleware("http")(exceptions_middleware)
 
 
+def add_route_metric(route, name, unit, value):
+    # Emitted on its own so the route dimension is not applied to other metrics
+    with single_metric(
+        name=name, unit=unit, value=value, namespace="ListManager"
+    ) as metric:
+        metric.add_dimension(name="route", value=route)
+
+
+async def timing_middleware(request: Request, call_next):
+    """Reports the time each request spends in the database and in Notify, as a
+    Server-Timing header, per route metrics and a log line."""
+    with time_request() as timings:
+        response = await call_next(request)
+
+    route = request.scope.get("route")
+    if route is None:
+        return response
+    route = f"{request.method} {route.path}"
+
+    response.headers["Server-Timing"] = timings.server_timing()
+    add_route_metric(route, "DbQueries", MetricUnit.Count, timings.db_queries)
+    add_route_metric(
+        route, "DbTime", MetricUnit.Milliseconds, timings.db_seconds * 1000
+    )
+    add_route_metric(
+        route, "NotifyTime", MetricUnit.Milliseconds, timings.notify_seconds * 1000
+    )
+    log.info(
+        "Request timing",
+        extra={
+            "route": route,
+            "status_code": response.status_code,
+            "db_queries": timings.db_queries,
+            "db_ms": round(timings.db_seconds * 1000, 1),
+            "notify_requests": timings.notify_requests,
+            "notify_ms": round(timings.notify_seconds * 1000, 1),
+            "total_ms": round(timings.elapsed_seconds() * 1000, 1),
+        },
+    )
+    return response
+
+
+app.middleware("http")(timing_middleware)
+
+
+@asynccontextmanager
+async def open_db(sync_session, async_session):
+    if async_session is not None:
+        async with async_session() as db:
+            yield db
+    else:
+        db = sync_session()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+
 # Dependency
-def get_db():
-    db = db_session()
-    try:
+async def get_db():
+    async with open_db(db_session, async_db_session) as db:
         yield db
-    finally:
-        db.close()
+
+
+async def use_reader():
+    if reader_monitor is None:
+        return False
+    if reader_monitor.is_stale():
+        usable = await run_in_threadpool(reader_monitor.check)
+    else:
+        usable = reader_monitor.usable
+    if not usable:
+        metrics.add_metric(name="DbReaderFallback", unit=MetricUnit.Count, value=1)
+    return usable
+
+
+# Dependency of read-only routes
+async def get_read_db():
+    if await use_reader():
+        sessions = (db_reader_session, async_db_reader_session)
+    else:
+        sessions = (db_session, async_db_session)
+    async with open_db(*sessions) as db:
+        yield db
+
+
+async def run_db(session, fn, *args, **kwargs):
+    """Calls fn(session, *args, **kwargs) without blocking the event loop. With
+    the async engine fn runs through AsyncSession.run_sync, so the same ORM code
+    serves both engines; with the sync engine it runs in the threadpool."""
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, session, *args, **kwargs)
+
+
+def db_route(handler):
+    """Serves a route handler that only talks to the database from the event
+    loop, running its body through run_db with the request's session."""
+
+    @wraps(handler)
+    async def endpoint(*args, session, **kwargs):
+        return await run_db(
+            session, lambda session: handler(*args, session=session, **kwargs)
+        )
+
+    return endpoint
 
 
 def verify_token(req: Request):
@@ -99,8 +389,28 @@ def verify_token(req: Request):
     return True
 
 
+def get_cached_list(session, list_id):
+    """Returns a read-only snapshot of the list's columns, or None if the list
+    does not exist. Snapshots are cached and invalidated when the list changes."""
+    list = list_cache.get(str(list_id))
+    if list is not None:
+        metrics.add_metric(name="ListCacheHit", unit=MetricUnit.Count, value=1)
+        return list
+
+    metrics.add_metric(name="ListCacheMiss", unit=MetricUnit.Count, value=1)
+    list = session.get(List, list_id)
+    if list is None:
+        return None
+
+    list = SimpleNamespace(
+        **{key: getattr(list, key) for key in List.__mapper__.columns.keys()}
+    )
+    list_cache.set(str(list_id), list)
+    return list
+
+
 @app.get("/version")
-def version():
+async def version():
     return {"version": environ.get("GIT_SHA", "unknown")}
 
 
@@ -111,7 +421,8 @@ def get_db_version(session):
 
 
 @app.get("/healthcheck", status_code=200)
-def healthcheck(response: Response, session: Session = Depends(get_db)):
+@db_route
+def healthcheck(response: Response, session: Session = Depends(get_read_db)):
     try:
         full_name = get_db_version(session)
         db_status = {"able_to_connect": True, "db_version": full_name}
@@ -182,164 +493,117 @@ class ListGetPayload(ListCreatePayload):
         extra = "forbid"
 
 
-@app.get("/lists")
-def lists(session: Session = Depends(get_db)):
-    sub_query = (
-        session.query(
-            func.count(Subscription.id).label("subscriber_count"),
-            Subscription.list_id,
-        )
-        .filter(Subscription.confirmed.is_(True))
-        .group_by(Subscription.list_id)
-        .subquery()
-    )
+def encode_cursor(created_at, id):
+    value = json.dumps([created_at.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(value.encode()).decode()
 
-    lists = (
-        session.query(
-            List.id,
-            List.name,
-            List.language,
-            List.service_id,
-            List.active,
-            List.subscribe_email_template_id,
-            List.unsubscribe_email_template_id,
-            List.subscribe_phone_template_id,
-            List.unsubscribe_phone_template_id,
-            List.subscribe_redirect_url,
-            List.confirm_redirect_url,
-            List.unsubscribe_redirect_url,
-            List.confirm_redirect_url,
-            sub_query.c.subscriber_count,
-        )
-        .outerjoin(sub_query, sub_query.c.list_id == List.id)
-        .group_by(
-            List.id,
-            List.name,
-            List.language,
-            List.service_id,
-            List.active,
-            List.subscribe_email_template_id,
-            List.unsubscribe_email_template_id,
-            List.subscribe_phone_template_id,
-            List.unsubscribe_phone_template_id,
-            List.subscribe_redirect_url,
-            List.unsubscribe_redirect_url,
-            List.confirm_redirect_url,
-            sub_query.c.subscriber_count,
-        )
-        .all()
-    )
 
-    sanitized_lists = list(
-        map(
-            lambda l: {  # noqa: E741
-                key: getattr(l, key)
-                for key in ListGetPayload.__fields__
-                if getattr(l, key) is not None
-            },
-            lists,
-        )
-    )
+def decode_cursor(cursor):
+    """Returns the (created_at, id) position encoded in a page cursor, raising
+    ValueError when the cursor is malformed."""
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (TypeError, ValueError, UnicodeError) as err:
+        raise ValueError("invalid cursor") from err
 
-    # update the list in-place
-    for list_item in sanitized_lists:
-        if "subscriber_count" not in list_item:
-            list_item["subscriber_count"] = 0
 
-    return sanitized_lists
+# Columns of a /lists item, in ListGetPayload order, selected once for all routes
+LIST_RESPONSE_COLUMNS = [
+    getattr(List, key) for key in ListGetPayload.__fields__ if key != "subscriber_count"
+] + [func.coalesce(List.confirmed_count, 0).label("subscriber_count")]
 
 
-@app.get("/lists/{service_id}")
-def lists_by_service(service_id, session: Session = Depends(get_db)):
-    sub_query = (
-        session.query(
-            func.count(Subscription.id).label("subscriber_count"),
-            Subscription.list_id,
-        )
-        .filter(Subscription.confirmed.is_(True))
-        .group_by(Subscription.list_id)
-        .subquery()
-    )
+def row_serializer(columns):
+    """Returns a function turning result rows into dicts of their non-null
+    values, with the keys of columns computed once rather than per row. Rows may
+    carry extra trailing columns, which are left out."""
+    keys = tuple(column.key for column in columns)
 
-    lists = (
-        session.query(
-            List.id,
-            List.name,
-            List.language,
-            List.service_id,
-            List.active,
-            List.subscribe_email_template_id,
-            List.unsubscribe_email_template_id,
-            List.subscribe_phone_template_id,
-            List.unsubscribe_phone_template_id,
-            List.subscribe_redirect_url,
-            List.confirm_redirect_url,
-            List.unsubscribe_redirect_url,
-            List.confirm_redirect_url,
-            sub_query.c.subscriber_count,
-        )
-        .outerjoin(sub_query, sub_query.c.list_id == List.id)
-        .group_by(
-            List.id,
-            List.name,
-            List.language,
-            List.service_id,
-            List.active,
-            List.subscribe_email_template_id,
-            List.unsubscribe_email_template_id,
-            List.subscribe_phone_template_id,
-            List.unsubscribe_phone_template_id,
-            List.subscribe_redirect_url,
-            List.unsubscribe_redirect_url,
-            List.confirm_redirect_url,
-            sub_query.c.subscriber_count,
-        )
-        .filter(List.service_id == service_id)
-        .all()
-    )
+    def serialize(rows):
+        return [
+            {key: value for key, value in zip(keys, row) if value is not None}
+            for row in rows
+        ]
 
-    sanitized_lists = list(
-        map(
-            lambda l: {  # noqa: E741
-                key: getattr(l, key)
-                for key in ListGetPayload.__fields__
-                if getattr(l, key) is not None
-            },
-            lists,
+    return serialize
+
+
+serialize_lists = row_serializer(LIST_RESPONSE_COLUMNS)
+
+
+def get_lists(session, service_id=None, limit=None, cursor=None):
+    """Returns every list, or when limit is set a page of lists ordered by
+    creation with the cursor of the next page."""
+    # created_at is only selected for the page cursor
+    query = select(*LIST_RESPONSE_COLUMNS, List.created_at)
+    if service_id is not None:
+        query = query.where(List.service_id == service_id)
+    if limit is None:
+        return serialize_lists(session.execute(query))
+
+    # Keyset pagination: seeks past the last list of the previous page
+    # instead of scanning and discarding an offset
+    if cursor is not None:
+        query = query.where(tuple_(List.created_at, List.id) > decode_cursor(cursor))
+    rows = session.execute(
+        query.order_by(List.created_at, List.id).limit(limit + 1)
+    ).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return {"lists": serialize_lists(rows), "next_cursor": next_cursor}
+
+
+async def get_lists_page(session, response, service_id, limit, cursor):
+    # Without a limit or cursor the whole array is returned, as before pagination
+    if limit is None and cursor is not None:
+        limit = LISTS_PAGE_DEFAULT_LIMIT
+    try:
+        # The lists only hold JSON native values and UUIDs, which orjson encodes
+        # directly, so jsonable_encoder is skipped
+        return ORJSONResponse(
+            await run_db(session, get_lists, service_id, limit, cursor)
         )
-    )
-    # update the list in-place
-    for list_item in sanitized_lists:
-        if "subscriber_count" not in list_item:
-            list_item["subscriber_count"] = 0
+    except ValueError as err:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return {"error": str(err)}
+
+
+@app.get("/lists")
+async def lists(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=LISTS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_db),
+):
+    return await get_lists_page(session, response, None, limit, cursor)
+
 
-    return sanitized_lists
+@app.get("/lists/{service_id}")
+async def lists_by_service(
+    service_id,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=LISTS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_db),
+):
+    return await get_lists_page(session, response, service_id, limit, cursor)
 
 
 @app.get("/lists/{service_id}/subscriber-count/", deprecated=True)
+@db_route
 def get_list_counts(
     service_id,
     response: Response,
     unique: Optional[int] = 0,
-    session: Session = Depends(get_db),
+    session: Session = Depends(get_read_db),
     _authorized: bool = Depends(verify_token),
 ):
-    lists = session.query(List.id).filter(List.service_id == service_id).all()
-
-    list_ids = list(
-        map(
-            lambda l: str(l.id),  # noqa: E741
-            lists,
-        )
-    )
-
     lists = (
-        session.query(func.count(Subscription.id), Subscription.list_id)
-        .filter(
-            Subscription.list_id.in_(list_ids),
-            Subscription.confirmed.is_(True),
-        )
-        .group_by(Subscription.list_id)
+        session.query(List.confirmed_count, List.id)
+        .filter(List.service_id == service_id, List.confirmed_count > 0)
         .all()
     )
 
@@ -355,6 +619,7 @@ def get_list_counts(
 
 
 @app.post("/list")
+@db_route
 def create_list(
     list_create_payload: ListCreatePayload,
     response: Response,
@@ -362,20 +627,12 @@ def create_list(
     _authorized: bool = Depends(verify_token),
 ):
     try:
-        list = List(
-            name=list_create_payload.name,
-            language=list_create_payload.language,
-            service_id=list_create_payload.service_id,
-            subscribe_email_template_id=list_create_payload.subscribe_email_template_id,
-            unsubscribe_email_template_id=list_create_payload.unsubscribe_email_template_id,
-            subscribe_phone_template_id=list_create_payload.subscribe_phone_template_id,
-            unsubscribe_phone_template_id=list_create_payload.unsubscribe_phone_template_id,
-            subscribe_redirect_url=list_create_payload.subscribe_redirect_url,
-            confirm_redirect_url=list_create_payload.confirm_redirect_url,
-            unsubscribe_redirect_url=list_create_payload.unsubscribe_redirect_url,
-        )
+        # Encoded to plain strings since asyncpg does not coerce UUIDs or URLs
+        # into the list's varchar columns
+        list = List(**jsonable_encoder(list_create_payload))
         session.add(list)
         session.commit()
+        list_cache.invalidate(str(list.id))
 
         metrics.add_metric(name="ListCreated", unit=MetricUnit.Count, value=1)
         metrics.add_metadata(key="list_id", value=str(list.id))
@@ -388,6 +645,7 @@ def create_list(
 
 
 @app.put("/list/{list_id}")
+@db_route
 def update_list(
     list_id,
     list_update_payload: ListUpdatePayload,
@@ -405,10 +663,11 @@ def update_list(
 
     try:
         session.query(List).filter(List.id == list.id).update(
-            list_update_payload.dict(exclude_unset=True)
+            jsonable_encoder(list_update_payload, exclude_unset=True)
         )
 
         session.commit()
+        list_cache.invalidate(str(list_id))
         metrics.add_metric(name="ListUpdated", unit=MetricUnit.Count, value=1)
         metrics.add_metadata(key="list_id", value=str(list_id))
         return {"status": "OK"}
@@ -421,6 +680,7 @@ def update_list(
 
 
 @app.delete("/list/{list_id}")
+@db_route
 def delete_list(
     list_id,
     response: Response,
@@ -438,6 +698,7 @@ def delete_list(
     try:
         session.delete(list)
         session.commit()
+        list_cache.invalidate(str(list_id))
         metrics.add_metric(name="ListDeleted", unit=MetricUnit.Count, value=1)
         metrics.add_metadata(key="list_id", value=str(list_id))
 
@@ -452,6 +713,7 @@ def delete_list(
 
 
 @app.put("/list/{list_id}/reset")
+@db_route
 def reset_list(
     list_id,
     response: Response,
@@ -476,6 +738,136 @@ def reset_list(
     return {"status": "OK"}
 
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+SUBSCRIBER_EXPORT_COLUMNS = ["id", "email", "phone", "confirmed", "created_at"]
+
+
+def get_subscribers_query(list_id, confirmed=None, cursor=None):
+    query = (
+        select(
+            Subscription.id,
+            Subscription.email,
+            Subscription.phone,
+            Subscription.confirmed,
+            Subscription.created_at,
+        )
+        .where(Subscription.list_id == list_id)
+        .order_by(Subscription.created_at, Subscription.id)
+    )
+    if confirmed is not None:
+        query = query.where(Subscription.confirmed.is_(confirmed))
+    if cursor is not None:
+        query = query.where(
+            tuple_(Subscription.created_at, Subscription.id) > decode_cursor(cursor)
+        )
+    return query
+
+
+def get_subscribers_page(session, list_id, limit, confirmed=None, cursor=None):
+    rows = session.execute(
+        get_subscribers_query(list_id, confirmed, cursor).limit(limit + 1)
+    ).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return {
+        "subscribers": [row._asdict() for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def encode_subscribers(rows, format, header=False):
+    if format == ExportFormat.ndjson:
+        return b"".join(dumps(row._asdict()) + b"\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(SUBSCRIBER_EXPORT_COLUMNS)
+    writer.writerows(
+        [str(row.id), row.email, row.phone, row.confirmed, row.created_at.isoformat()]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def stream_subscribers(query, format):
+    """Returns an iterator over the encoded export, one chunk per batch read
+    through a server-side cursor. The request's session is closed before the
+    response streams, so the iterator opens and closes a session of its own."""
+    query = query.execution_options(yield_per=SUBSCRIBERS_EXPORT_BATCH_SIZE)
+    if format == ExportFormat.csv:
+        header = encode_subscribers([], format, header=True)
+    else:
+        header = b""
+
+    if async_db_session is not None:
+
+        async def chunks():
+            yield header
+            async with async_db_session() as session:
+                result = await session.stream(query)
+                async for batch in result.partitions():
+                    yield encode_subscribers(batch, format)
+
+        return chunks()
+
+    # Iterated in the threadpool by StreamingResponse
+    def chunks():
+        yield header
+        session = db_session()
+        try:
+            for batch in session.execute(query).partitions():
+                yield encode_subscribers(batch, format)
+        finally:
+            session.close()
+
+    return chunks()
+
+
+@app.get("/list/{list_id}/subscribers")
+async def list_subscribers(
+    list_id,
+    response: Response,
+    format: ExportFormat = ExportFormat.ndjson,
+    confirmed: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=SUBSCRIBERS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_db),
+    _authorized: bool = Depends(verify_token),
+):
+    """Streams the subscribers of a list as NDJSON or CSV, ordered by creation.
+    With a limit, returns a page of subscribers and the cursor of the next one."""
+    try:
+        list = await run_db(session, lambda session: session.get(List, list_id))
+        if list is None:
+            raise NoResultFound
+    except SQLAlchemyError:
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return {"error": "list not found"}
+
+    try:
+        if limit is not None:
+            return ORJSONResponse(
+                await run_db(
+                    session, get_subscribers_page, list.id, limit, confirmed, cursor
+                )
+            )
+        query = get_subscribers_query(list.id, confirmed, cursor)
+    except ValueError as err:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return {"error": str(err)}
+
+    metrics.add_metric(name="SubscribersExported", unit=MetricUnit.Count, value=1)
+    metrics.add_metadata(key="list_id", value=str(list.id))
+    media_type = "text/csv" if format == ExportFormat.csv else "application/x-ndjson"
+    return StreamingResponse(stream_subscribers(query, format), media_type=media_type)
+
+
 class SubscriptionEvent(BaseModel):
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
@@ -486,36 +878,139 @@ class SubscriptionEvent(BaseModel):
         extra = "forbid"
 
 
-def get_subscription(
-    list_id: str,
-    email: str = None,
-    phone: str = None,
-    session: Session = Depends(get_db),
-):
-    return (
-        session.query(Subscription)
-        .filter(
-            Subscription.email == email,
-            Subscription.phone == phone,
-            Subscription.list_id == list_id,
-        )
-        .first()
+def subscription_conflict_target(column):
+    """Returns the ON CONFLICT arguments matching the unique index of column."""
+    if column == "email":
+        return {
+            "index_elements": [Subscription.list_id, func.lower(Subscription.email)],
+            "index_where": Subscription.email.isnot(None),
+        }
+    return {
+        "index_elements": [Subscription.list_id, Subscription.phone],
+        "index_where": Subscription.phone.isnot(None),
+    }
+
+
+def upsert_subscription(session, list_id, email=None, phone=None):
+    """Adds a subscription to the list unless the address is already subscribed,
+    in a single statement, and returns the id of the subscription."""
+    column = "email" if email is not None else "phone"
+    stmt = (
+        pg_insert(Subscription)
+        .values(list_id=list_id, email=email, phone=phone, confirmed=False)
+        .on_conflict_do_update(
+            **subscription_conflict_target(column),
+            # No-op update so the existing subscription id is returned
+            set_={"confirmed": Subscription.confirmed},
+        )
+        .returning(Subscription.id)
+    )
+    return session.execute(stmt).scalar_one()
+
+
+def subscription_notifications(list, subscription_id, subscription_payload):
+    """Returns the confirmation messages for a new subscription, unsaved."""
+    notifications = []
+    if (
+        subscription_payload.email is not None
+        and len(list.subscribe_email_template_id) == 36
+    ):
+        notifications.append(
+            OutboxNotification(
+                list_id=list.id,
+                type="email",
+                recipient=subscription_payload.email,
+                template_id=list.subscribe_email_template_id,
+                personalisation={
+                    "name": list.name,
+                    "confirm_link": get_confirm_link(str(subscription_id)),
+                },
+                service_api_key=subscription_payload.service_api_key,
+            )
+        )
+
+    if (
+        subscription_payload.phone is not None
+        and list.subscribe_phone_template_id is not None
+        and len(list.subscribe_phone_template_id) == 36
+    ):
+        notifications.append(
+            OutboxNotification(
+                list_id=list.id,
+                type="sms",
+                recipient=subscription_payload.phone,
+                template_id=list.subscribe_phone_template_id,
+                personalisation={
+                    "name": list.name,
+                },
+                service_api_key=subscription_payload.service_api_key,
+            )
+        )
+    return notifications
+
+
+def save_subscription(session, list, subscription_payload):
+    subscription_id = upsert_subscription(
+        session,
+        list.id,
+        email=subscription_payload.email,
+        phone=subscription_payload.phone,
+    )
+    notifications = subscription_notifications(
+        list, subscription_id, subscription_payload
+    )
+    if NOTIFICATION_OUTBOX:
+        session.add_all(notifications)
+    session.commit()
+    return subscription_id, notifications
+
+
+def defer_notification(session, notification, retry_after):
+    notification.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_after)
+    session.add(notification)
+    session.commit()
+
+
+async def deliver_notification(session, notifications_client, notification):
+    """Sends a notification now, or queues it in the outbox when the Notify
+    rate limit of its service is used up."""
+    try:
+        await send_notification(notifications_client, notification)
+    except RateLimitExceededError as err:
+        log.warning(err)
+        metrics.add_metric(name="NotificationDeferred", unit=MetricUnit.Count, value=1)
+        await run_db(session, defer_notification, notification, err.retry_after)
+
+
+async def send_notification(notifications_client, notification):
+    if notification.type == "email":
+        return await notifications_client.send_email_notification(
+            email_address=notification.recipient,
+            template_id=notification.template_id,
+            personalisation=notification.personalisation,
+        )
+    return await notifications_client.send_sms_notification(
+        phone_number=notification.recipient,
+        template_id=notification.template_id,
+        personalisation=notification.personalisation,
     )
 
 
 @app.post("/subscription")
-def create_subscription(
+async def create_subscription(
     subscription_payload: SubscriptionEvent,
     response: Response,
     session: Session = Depends(get_db),
 ):
     if subscription_payload.service_api_key:
-        notifications_client = get_notify_client(subscription_payload.service_api_key)
+        notifications_client = get_async_notify_client(
+            subscription_payload.service_api_key
+        )
     else:
-        notifications_client = get_notify_client()
+        notifications_client = get_async_notify_client()
 
     try:
-        list = session.get(List, subscription_payload.list_id)
+        list = await run_db(session, get_cached_list, subscription_payload.list_id)
         if list is None:
             raise NoResultFound
     except SQLAlchemyError:
@@ -531,67 +1026,33 @@ def create_subscription(
         return {"error": "Must be one of Email or Phone"}
 
     try:
-        subscription = get_subscription(
-            list_id=list.id,
-            email=subscription_payload.email,
-            phone=subscription_payload.phone,
-            session=session,
+        subscription_id, notifications = await run_db(
+            session, save_subscription, list, subscription_payload
         )
 
-        if subscription is None:
-            subscription = Subscription(
-                email=subscription_payload.email,
-                phone=subscription_payload.phone,
-                list=list,
-            )
-            session.add(subscription)
-            session.commit()
-
-        # Send confirmation email
-        if (
-            subscription_payload.email is not None
-            and len(list.subscribe_email_template_id) == 36
-        ):
-            confirm_link = get_confirm_link(str(subscription.id))
-
-            notifications_client.send_email_notification(
-                email_address=subscription_payload.email,
-                template_id=list.subscribe_email_template_id,
-                personalisation={
-                    "name": list.name,
-                    "confirm_link": confirm_link,
-                },
-            )
-            metrics.add_metric(
-                name="SuccessfulSubscription", unit=MetricUnit.Count, value=1
-            )
-            metrics.add_metadata(key="list_id", value=str(subscription_payload.list_id))
-            metrics.add_metadata(key="language", value=list.language)
-            metrics.add_metadata(key="target", value=METRICS_EMAIL_TARGET)
+        # Send confirmation email or SMS, unless the outbox delivers it
+        for notification in notifications:
+            if not NOTIFICATION_OUTBOX:
+                await deliver_notification(session, notifications_client, notification)
 
-        if (
-            subscription_payload.phone is not None
-            and list.subscribe_phone_template_id is not None
-            and len(list.subscribe_phone_template_id) == 36
-        ):
-            notifications_client.send_sms_notification(
-                phone_number=subscription_payload.phone,
-                template_id=list.subscribe_phone_template_id,
-                personalisation={
-                    "name": list.name,
-                },
-            )
             metrics.add_metric(
                 name="SuccessfulSubscription", unit=MetricUnit.Count, value=1
             )
             metrics.add_metadata(key="list_id", value=str(list.id))
             metrics.add_metadata(key="language", value=list.language)
-            metrics.add_metadata(key="target", value=METRICS_SMS_TARGET)
+            metrics.add_metadata(
+                key="target",
+                value=(
+                    METRICS_EMAIL_TARGET
+                    if notification.type == "email"
+                    else METRICS_SMS_TARGET
+                ),
+            )
 
         if list.subscribe_redirect_url is not None:
             return RedirectResponse(list.subscribe_redirect_url)
         else:
-            return {"id": subscription.id}
+            return {"id": subscription_id}
     except SQLAlchemyError as err:
         log.error(err)
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -599,7 +1060,7 @@ def create_subscription(
         metrics.add_metadata(key="list_id", value=str(subscription_payload.list_id))
 
         return {"error": "error saving subscription"}
-    except HTTPError as err:
+    except (APIError, HTTPError) as err:
         log.error(err)
         response.status_code = status.HTTP_502_BAD_GATEWAY
         metrics.add_metric(
@@ -610,7 +1071,204 @@ def create_subscription(
         return {"error": "error sending subscription notification"}
 
 
+class SubscriptionBatchPayload(BaseModel):
+    subscriptions: conlist(
+        SubscriptionEvent, min_items=1, max_items=SUBSCRIPTION_BATCH_MAX_SIZE
+    )
+
+    class Config:
+        extra = "forbid"
+
+
+def upsert_subscriptions(session, column, addresses):
+    """Adds the (list_id, address) pairs as subscriptions in a single statement,
+    skipping those already subscribed, and returns the subscription id of each
+    (list_id, address key). Addresses must be unique per list."""
+    stmt = (
+        pg_insert(Subscription)
+        .values(
+            [
+                {"list_id": list_id, column: address, "confirmed": False}
+                for list_id, address in addresses
+            ]
+        )
+        .on_conflict_do_update(
+            **subscription_conflict_target(column),
+            set_={"confirmed": Subscription.confirmed},
+        )
+        .returning(Subscription.id, Subscription.list_id, getattr(Subscription, column))
+    )
+    return {
+        (str(list_id), address_key(column, address)): id
+        for id, list_id, address in session.execute(stmt)
+    }
+
+
+def address_key(column, address):
+    # Emails are unique regardless of case, as in ix_subscriptions_list_id_email
+    return address.lower() if column == "email" else address
+
+
+def validate_batch_item(session, lists, item):
+    """Returns the list of a batch item, or the error result of the item."""
+    if item.email is None and item.phone is None:
+        return None, {"error": "email and phone can not be empty"}
+    if item.email and item.phone:
+        return None, {"error": "Must be one of Email or Phone"}
+
+    if item.list_id not in lists:
+        try:
+            # Malformed ids would abort the transaction of the whole batch
+            lists[item.list_id] = get_cached_list(session, UUID(item.list_id))
+        except ValueError:
+            lists[item.list_id] = None
+    if lists[item.list_id] is None:
+        return None, {"error": "list not found"}
+    return lists[item.list_id], None
+
+
+def save_subscription_batch(session, items):
+    """Saves a batch of subscriptions with one insert per address type. Returns
+    one result per item, in order, and the confirmations to send as
+    (subscription id, notification) pairs."""
+    results = [None] * len(items)
+    lists = {}
+    # Items subscribing the same address to the same list share a subscription
+    addresses = {}
+    for index, item in enumerate(items):
+        list, results[index] = validate_batch_item(session, lists, item)
+        if list is None:
+            continue
+        column = "email" if item.email is not None else "phone"
+        address = getattr(item, column)
+        addresses.setdefault(
+            (str(list.id), column, address_key(column, address)), []
+        ).append(index)
+
+    ids = {}
+    for column in ("email", "phone"):
+        pending = [
+            (list_id, getattr(items[indexes[0]], column))
+            for (list_id, key_column, _), indexes in addresses.items()
+            if key_column == column
+        ]
+        if pending:
+            ids.update(upsert_subscriptions(session, column, pending))
+
+    notifications = []
+    for (list_id, _, key), indexes in addresses.items():
+        subscription_id = ids[(list_id, key)]
+        for index in indexes:
+            results[index] = {"id": subscription_id}
+        item = items[indexes[0]]
+        notifications.extend(
+            (subscription_id, notification)
+            for notification in subscription_notifications(
+                lists[item.list_id], subscription_id, item
+            )
+        )
+
+    if NOTIFICATION_OUTBOX:
+        session.add_all(notification for _, notification in notifications)
+    session.commit()
+    return results, notifications
+
+
+def bulk_notification_rows(notifications):
+    """Returns the rows of a Notify bulk send of notifications sharing a type and
+    template: a header naming the recipient and personalisation columns, then
+    one row per recipient."""
+    keys = sorted(set().union(*(n.personalisation or {} for n in notifications)))
+    recipient = "email address" if notifications[0].type == "email" else "phone number"
+    return [[recipient, *keys]] + [
+        [n.recipient, *((n.personalisation or {}).get(key, "") for key in keys)]
+        for n in notifications
+    ]
+
+
+async def send_batch_confirmations(session, notifications):
+    """Sends the confirmations of a batch, grouped by template, and returns the
+    ids of the subscriptions whose confirmation could not be sent. Groups of
+    SUBSCRIPTION_BATCH_BULK_MIN_SIZE or more go through the bulk endpoint."""
+    groups = {}
+    for subscription_id, notification in notifications:
+        key = (
+            notification.type,
+            notification.template_id,
+            notification.service_api_key,
+        )
+        groups.setdefault(key, []).append((subscription_id, notification))
+
+    failed = set()
+    for (_, template_id, service_api_key), group in groups.items():
+        notifications_client = get_async_notify_client(service_api_key or NOTIFY_KEY)
+        if len(group) < SUBSCRIPTION_BATCH_BULK_MIN_SIZE:
+            for subscription_id, notification in group:
+                try:
+                    await deliver_notification(
+                        session, notifications_client, notification
+                    )
+                except APIError as err:
+                    log.error(err)
+                    failed.add(subscription_id)
+            continue
+
+        try:
+            await notifications_client.send_bulk_notifications(
+                "Subscription confirmations",
+                bulk_notification_rows([notification for _, notification in group]),
+                template_id,
+            )
+        except RateLimitExceededError as err:
+            log.warning(err)
+            for _, notification in group:
+                await run_db(session, defer_notification, notification, err.retry_after)
+        except APIError as err:
+            log.error(err)
+            failed.update(subscription_id for subscription_id, _ in group)
+    return failed
+
+
+@app.post("/subscriptions/batch")
+async def create_subscriptions_batch(
+    batch_payload: SubscriptionBatchPayload,
+    response: Response,
+    session: Session = Depends(get_db),
+):
+    """Creates up to SUBSCRIPTION_BATCH_MAX_SIZE subscriptions and returns one
+    result per subscription, in order: the subscription id, or an error."""
+    try:
+        results, notifications = await run_db(
+            session, save_subscription_batch, batch_payload.subscriptions
+        )
+    except SQLAlchemyError as err:
+        log.error(err)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        metrics.add_metric(name="SubscriptionSaveError", unit=MetricUnit.Count, value=1)
+        return {"error": "error saving subscriptions"}
+
+    if not NOTIFICATION_OUTBOX:
+        failed = await send_batch_confirmations(session, notifications)
+        for result in results:
+            if result.get("id") in failed:
+                result["error"] = "error sending subscription notification"
+        if failed:
+            metrics.add_metric(
+                name="SubscriptionNotificationError",
+                unit=MetricUnit.Count,
+                value=len(failed),
+            )
+
+    saved = sum("id" in result for result in results)
+    if saved:
+        metrics.add_metric(
+            name="SuccessfulSubscription", unit=MetricUnit.Count, value=saved
+        )
+    return {"results": results}
+
+
 @app.get("/subscription/{subscription_id}/confirm")
+@db_route
 def confirm_subscription(
     subscription_id, response: Response, session: Session = Depends(get_db)
 ):
@@ -632,8 +1290,9 @@ def confirm_subscription(
         )
         metrics.add_metadata(key="subscription_id", value=str(subscription_id))
 
-        if subscription.list.confirm_redirect_url is not None:
-            return RedirectResponse(subscription.list.confirm_redirect_url)
+        list = get_cached_list(session, subscription.list_id)
+        if list.confirm_redirect_url is not None:
+            return RedirectResponse(list.confirm_redirect_url)
         else:
             return {"status": "OK"}
 
@@ -645,15 +1304,63 @@ def confirm_subscription(
         return {"error": "error confirming subscription"}
 
 
+def unsubscription_notifications(list, email, phone):
+    """Returns the unsubscribe confirmation messages, unsaved."""
+    notifications = []
+    if (
+        email is not None
+        and list.unsubscribe_email_template_id is not None
+        and len(list.unsubscribe_email_template_id) == 36
+    ):
+        notifications.append(
+            OutboxNotification(
+                list_id=list.id,
+                type="email",
+                recipient=email,
+                template_id=list.unsubscribe_email_template_id,
+                personalisation={"email_address": email, "name": list.name},
+            )
+        )
+
+    if (
+        phone is not None
+        and list.unsubscribe_phone_template_id is not None
+        and len(list.unsubscribe_phone_template_id) == 36
+    ):
+        notifications.append(
+            OutboxNotification(
+                list_id=list.id,
+                type="sms",
+                recipient=phone,
+                template_id=list.unsubscribe_phone_template_id,
+                personalisation={"phone_number": phone, "name": list.name},
+            )
+        )
+    return notifications
+
+
+def delete_subscription(session, subscription, list):
+    notifications = unsubscription_notifications(
+        list, subscription.email, subscription.phone
+    )
+    session.delete(subscription)
+    if NOTIFICATION_OUTBOX:
+        session.add_all(notifications)
+    session.commit()
+    return notifications
+
+
 @app.delete("/subscription/{subscription_id}")
 @app.get("/unsubscribe/{subscription_id}")
-def unsubscribe(
+async def unsubscribe(
     subscription_id, response: Response, session: Session = Depends(get_db)
 ):
-    notifications_client = get_notify_client()
+    notifications_client = get_async_notify_client()
 
     try:
-        subscription = session.get(Subscription, subscription_id)
+        subscription = await run_db(
+            session, lambda session: session.get(Subscription, subscription_id)
+        )
         if subscription is None:
             raise NoResultFound
     except SQLAlchemyError:
@@ -661,33 +1368,12 @@ def unsubscribe(
         return {"error": "subscription not found"}
 
     try:
-        list = session.get(List, subscription.list_id)
+        list = await run_db(session, get_cached_list, subscription.list_id)
+        notifications = await run_db(session, delete_subscription, subscription, list)
 
-        email = subscription.email
-        phone = subscription.phone
-        session.delete(subscription)
-        session.commit()
-        if (
-            email is not None
-            and list.unsubscribe_email_template_id is not None
-            and len(list.unsubscribe_email_template_id) == 36
-        ):
-            notifications_client.send_email_notification(
-                email_address=email,
-                template_id=list.unsubscribe_email_template_id,
-                personalisation={"email_address": email, "name": list.name},
-            )
-
-        if (
-            phone is not None
-            and list.unsubscribe_phone_template_id is not None
-            and len(list.unsubscribe_phone_template_id) == 36
-        ):
-            notifications_client.send_sms_notification(
-                phone_number=phone,
-                template_id=list.unsubscribe_phone_template_id,
-                personalisation={"phone_number": phone, "name": list.name},
-            )
+        if not NOTIFICATION_OUTBOX:
+            for notification in notifications:
+                await deliver_notification(session, notifications_client, notification)
 
         metrics.add_metric(
             name="SuccessfulUnsubscription", unit=MetricUnit.Count, value=1
@@ -706,12 +1392,9 @@ def unsubscribe(
         metrics.add_metadata(key="subscription_id", value=str(subscription_id))
 
         return {"error": "error deleting subscription"}
-    except HTTPError as err:
+    except (APIError, HTTPError) as err:
         log.error(err)
-        # response.status_code = status.HTTP_502_BAD_GATEWAY
-        response.status_code = (
-            err.response.status_code if err.response else status.HTTP_502_BAD_GATEWAY
-        )  # set the true status from error
+        response.status_code = status.HTTP_502_BAD_GATEWAY
         metrics.add_metric(
             name="UnsubscriptionNotificationError", unit=MetricUnit.Count, value=1
         )
@@ -728,6 +1411,8 @@ class SendPayload(BaseModel):
     job_name: Optional[str] = "Bulk email"
     unique: Optional[bool] = True
     personalisation: Optional[Json] = {}
+    stream: Optional[bool] = False
+    background: Optional[bool] = False
 
     @validator("template_type", allow_reuse=True)
     def template_type_email_or_phone(cls, v):
@@ -739,122 +1424,766 @@ class SendPayload(BaseModel):
         extra = "forbid"
 
 
+def get_send_query(session, send_payload):
+    template_type = send_payload.template_type
+    cols = [getattr(Subscription, template_type)]
+    if send_payload.unique:
+        cols.append(func.max(cast(Subscription.id, String)).label("id"))
+    else:
+        cols.append(Subscription.id)
+
+    q = session.query(*cols)
+
+    if send_payload.unique:
+        q = q.group_by(template_type)
+
+    return q.filter(
+        Subscription.list_id == send_payload.list_id,
+        Subscription.confirmed.is_(True),
+    )
+
+
+def get_send_rows(session, send_payload):
+    q = get_send_query(session, send_payload)
+    subscription_count = q.count()
+
+    if subscription_count == 0:
+        raise NoResultFound
+
+    return subscription_count, q.all()
+
+
+async def stream_send_rows(session, send_payload):
+    """Returns an iterator reading the subscribers of a send through a server-side
+    cursor in fixed-size batches. It is meant to be consumed from a worker thread:
+    with the async engine each batch is fetched on the event loop."""
+    if not isinstance(session, AsyncSession):
+        return get_send_query(session, send_payload).yield_per(SEND_STREAM_BATCH_SIZE)
+
+    result = await session.stream(
+        get_send_query(session.sync_session, send_payload).statement,
+        execution_options={"yield_per": SEND_STREAM_BATCH_SIZE},
+    )
+
+    def rows():
+        while True:
+            batch = from_thread.run(result.fetchmany, SEND_STREAM_BATCH_SIZE)
+            if not batch:
+                return
+            yield from batch
+
+    return rows()
+
+
 @app.post("/send")
-def send(
+async def send(
     send_payload: SendPayload,
     response: Response,
     session: Session = Depends(get_db),
     _authorized: bool = Depends(verify_token),
 ):
+    if send_payload.background:
+        return await enqueue_send_job(send_payload, response, session)
+
     try:
-        template_type = send_payload.template_type
-        cols = [getattr(Subscription, template_type)]
-        if send_payload.unique:
-            cols.append(func.max(cast(Subscription.id, String)).label("id"))
+        if send_payload.stream:
+            # Read subscribers through a server-side cursor in fixed-size batches
+            # instead of counting and materializing the whole list up front
+            subscription_count = None
+            rs = await stream_send_rows(session, send_payload)
         else:
-            cols.append(Subscription.id)
-
-        q = session.query(*cols)
-
-        if send_payload.unique:
-            q = q.group_by(template_type)
-
-        q = q.filter(
-            Subscription.list_id == send_payload.list_id,
-            Subscription.confirmed.is_(True),
-        )
-
-        subscription_count = q.count()
-
-        if subscription_count == 0:
-            raise NoResultFound
-
-        rs = q.all()
+            subscription_count, rs = await run_db(session, get_send_rows, send_payload)
     except SQLAlchemyError:
         response.status_code = status.HTTP_404_NOT_FOUND
         return {"error": "list with confirmed subscribers not found"}
 
     try:
-        sent_notifications = send_bulk_notify(subscription_count, send_payload, rs)
+        chunks = await run_in_threadpool(
+            send_bulk_notify, subscription_count, send_payload, rs
+        )
 
     except HTTPError as err:
         log.error(err)
         response.status_code = status.HTTP_502_BAD_GATEWAY
         metrics.add_metric(name="BulkNotificationError", unit=MetricUnit.Count, value=1)
-        metrics.add_metadata(key="subscription_count", value=str(subscription_count))
+        # Streamed sends do not count their subscribers up front
+        if subscription_count is not None:
+            metrics.add_metadata(
+                key="subscription_count", value=str(subscription_count)
+            )
 
         return {"error": "error sending bulk notifications"}
 
+    except SQLAlchemyError as err:
+        log.error(err)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {"error": "error reading subscribers"}
+
     except Exception as err:
         log.error(err)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         return {"error": "error sending bulk notifications"}
 
-    return {"status": "OK", "sent": sent_notifications}
+    if send_payload.stream and not chunks:
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return {"error": "list with confirmed subscribers not found"}
+
+    sent_notifications = sum(
+        chunk["recipients"] for chunk in chunks if chunk["status"] == "OK"
+    )
+    failed_chunks = [chunk for chunk in chunks if chunk["status"] != "OK"]
+    if failed_chunks:
+        response.status_code = status.HTTP_502_BAD_GATEWAY
+        metrics.add_metric(
+            name="BulkNotificationError",
+            unit=MetricUnit.Count,
+            value=len(failed_chunks),
+        )
+        metrics.add_metadata(key="list_id", value=str(send_payload.list_id))
 
+        return {
+            "error": "error sending bulk notifications",
+            "sent": sent_notifications,
+            "chunks": chunks,
+        }
 
-def send_bulk_notify(subscription_count, send_payload, rows, recipient_limit=50000):
-    notify_bulk_subscribers = []
-    subscription_rows = []
+    return {"status": "OK", "sent": sent_notifications, "chunks": chunks}
 
+
+def build_bulk_chunks(send_payload, rows, recipient_limit=50000):
+    """Yields Notify bulk rows (header included) holding at most recipient_limit
+    recipients each. Chunks are built incrementally so only one is held in memory."""
     personalisation_keys = send_payload.personalisation.keys()
     personalisation_values = send_payload.personalisation.values()
 
     template_type = send_payload.template_type.lower()
-    # Split notifications into separate calls based on limit
-    for i, row in enumerate(rows):
+    if template_type == "email":
+        header = ["email address", "unsubscribe_link", *personalisation_keys]
+    else:
+        header = ["phone number", "subscription id", *personalisation_keys]
+
+    subscription_rows = [header]
+    for row in rows:
         # Convert SQLAlchemy Row objects to dicts
         if type(row) is Row:
             row = row._mapping
 
-        if i > 0 and (i % recipient_limit == 0):
-            notify_bulk_subscribers.append(subscription_rows)
+        if not row[template_type]:
+            continue
+
+        subscription_rows.append(
+            [
+                row[template_type],
+                (
+                    get_unsubscribe_link(str(row["id"]))  # add unsub link
+                    if "email" in template_type
+                    else row["id"]
+                ),  # phone notification untouched
+                *personalisation_values,
+            ]
+        )
+
+        # Split notifications into separate calls based on limit
+        if len(subscription_rows) - 1 == recipient_limit:
+            yield subscription_rows
+            subscription_rows = [header]
+
+    if len(subscription_rows) > 1:
+        yield subscription_rows
+
+
+def send_bulk_chunk(notifications_client, send_payload, index, subscribers):
+    recipients = len(subscribers) - 1
+    try:
+        notifications_client.send_bulk_notifications(
+            send_payload.job_name, subscribers, str(send_payload.template_id)
+        )
+        return {"chunk": index, "recipients": recipients, "status": "OK"}
+    except (APIError, RequestException) as err:
+        # Only Notify and connection errors fail the chunk, anything else is a bug
+        log.error(err)
+        return {
+            "chunk": index,
+            "recipients": recipients,
+            "status": "ERROR",
+            "error": str(err),
+        }
+
+
+def send_bulk_notify(
+    subscription_count,
+    send_payload,
+    rows,
+    recipient_limit=50000,
+    max_in_flight=NOTIFY_BULK_MAX_IN_FLIGHT,
+):
+    """Posts the bulk chunks built from rows to Notify with at most max_in_flight
+    requests outstanding and returns one result per chunk, in chunk order.
 
-        if i % recipient_limit == 0:
-            # Reset and add headers
-            subscription_rows = []
-            if template_type == "email":
-                subscription_rows.append(
-                    ["email address", "unsubscribe_link", *personalisation_keys]
+    subscription_count is informational and is None for streamed sends."""
+    notifications_client = get_notify_client(send_payload.service_api_key or NOTIFY_KEY)
+
+    # Chunks are dispatched as soon as they are full; waiting for a free slot
+    # before building the next one bounds peak memory to max_in_flight chunks
+    results = []
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for index, subscribers in enumerate(
+            build_bulk_chunks(send_payload, rows, recipient_limit)
+        ):
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                results.extend(future.result() for future in done)
+
+            in_flight.add(
+                executor.submit(
+                    # Keeps the request's timings visible from the worker thread
+                    copy_context().run,
+                    send_bulk_chunk,
+                    notifications_client,
+                    send_payload,
+                    index,
+                    subscribers,
                 )
-            elif template_type == "phone":
-                subscription_rows.append(
-                    ["phone number", "subscription id", *personalisation_keys]
+            )
+
+        results.extend(future.result() for future in wait(in_flight).done)
+
+    return sorted(results, key=lambda result: result["chunk"])
+
+
+def create_send_job(session, send_payload):
+    list = session.get(List, send_payload.list_id)
+    if list is None:
+        raise NoResultFound
+
+    job = SendJob(
+        list_id=send_payload.list_id,
+        template_id=str(send_payload.template_id),
+        template_type=send_payload.template_type.lower(),
+        job_name=send_payload.job_name,
+        unique=send_payload.unique,
+        personalisation=send_payload.personalisation,
+        service_api_key=send_payload.service_api_key,
+    )
+    session.add(job)
+    session.commit()
+    return job.id
+
+
+async def enqueue_send_job(send_payload, response, session):
+    try:
+        job_id = await run_db(session, create_send_job, send_payload)
+    except NoResultFound:
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return {"error": "list not found"}
+    except SQLAlchemyError as err:
+        log.error(err)
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        metrics.add_metric(name="SendJobCreateError", unit=MetricUnit.Count, value=1)
+        return {"error": "error creating send job"}
+
+    try:
+        await run_in_threadpool(start_send_job, job_id)
+    except Exception as err:
+        # The job stays pending and is picked up by the scheduled send task
+        log.error(err)
+
+    metrics.add_metric(name="SendJobCreated", unit=MetricUnit.Count, value=1)
+    metrics.add_metadata(key="send_job_id", value=str(job_id))
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {"status": "Accepted", "job_id": job_id}
+
+
+@app.get("/send/{job_id}")
+@db_route
+def send_job_status(
+    job_id,
+    response: Response,
+    session: Session = Depends(get_db),
+    _authorized: bool = Depends(verify_token),
+):
+    try:
+        job = session.get(SendJob, job_id)
+        if job is None:
+            raise NoResultFound
+    except SQLAlchemyError:
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return {"error": "send job not found"}
+
+    return job.to_dict()
+
+
+@app.post("/send/{job_id}/retry")
+async def retry_send_job(
+    job_id,
+    response: Response,
+    session: Session = Depends(get_db),
+    _authorized: bool = Depends(verify_token),
+):
+    """Resumes a failed send job from the first chunk it did not send."""
+    try:
+        job = await run_db(session, requeue_send_job, job_id)
+    except SQLAlchemyError:
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return {"error": "send job not found"}
+
+    if job is None:
+        response.status_code = status.HTTP_409_CONFLICT
+        return {"error": "only failed send jobs can be retried"}
+
+    try:
+        await run_in_threadpool(start_send_job, job["id"])
+    except Exception as err:
+        # The job stays pending and is picked up by the scheduled send task
+        log.error(err)
+
+    metrics.add_metric(name="SendJobRetried", unit=MetricUnit.Count, value=1)
+    metrics.add_metadata(key="send_job_id", value=str(job["id"]))
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job
+
+
+def requeue_send_job(session, job_id):
+    """Moves a failed job back to pending and returns it, or returns None when
+    the job is not failed."""
+    if session.get(SendJob, job_id) is None:
+        raise NoResultFound
+    requeued = session.execute(
+        update(SendJob)
+        .where(SendJob.id == job_id, SendJob.state == "failed")
+        .values(state="pending", error=None)
+        .returning(SendJob.id)
+    ).scalar()
+    session.commit()
+    if requeued is None:
+        return None
+    return session.get(SendJob, requeued, populate_existing=True).to_dict()
+
+
+def start_send_job(job_id):
+    """Hands the job to a new asynchronous invocation of this Lambda function.
+    Outside of Lambda the job is left pending for the scheduled send task."""
+    function_name = environ.get("AWS_LAMBDA_FUNCTION_NAME")
+    if function_name is None:
+        return
+
+    # Imported here so that boto3 is only loaded when a job is handed off
+    from boto3wrapper.wrapper import get_session
+
+    get_session().client("lambda").invoke(
+        FunctionName=function_name,
+        InvocationType="Event",
+        Payload=json.dumps({"task": "send", "job_id": str(job_id)}),
+    )
+
+
+def get_send_job_payload(job):
+    return SendPayload.construct(
+        list_id=job.list_id,
+        template_id=job.template_id,
+        template_type=job.template_type,
+        service_api_key=job.service_api_key,
+        job_name=job.job_name,
+        unique=job.unique,
+        personalisation=job.personalisation,
+    )
+
+
+def process_send_jobs(job_id=None, get_remaining_time_in_millis=None):
+    """Runs the given send job, or every pending and stalled job when job_id is
+    None, and returns the number of jobs processed."""
+    session = db_session()
+    try:
+        if job_id is not None:
+            claimable = SendJob.state.in_(["pending", "failed", "handed_off"])
+            job_ids = [job_id]
+        else:
+            stalled_before = datetime.utcnow() - timedelta(
+                seconds=SEND_JOB_STALE_SECONDS
+            )
+            # Handed off jobs belong to the invocation they were handed to,
+            # unless it never started them
+            claimable = or_(
+                SendJob.state == "pending",
+                and_(
+                    SendJob.state.in_(["running", "handed_off"]),
+                    SendJob.updated_at < stalled_before,
+                ),
+            )
+            job_ids = [
+                row.id
+                for row in session.query(SendJob.id)
+                .filter(claimable)
+                .order_by(SendJob.created_at)
+            ]
+
+        processed = 0
+        for id in job_ids:
+            job = claim_send_job(session, id, claimable)
+            if job is None:
+                continue
+            process_send_job(session, job, get_remaining_time_in_millis)
+            processed += 1
+
+        return processed
+    finally:
+        session.close()
+
+
+def claim_send_job(session, job_id, claimable):
+    """Marks the job running if it still matches claimable and returns it, or
+    None when another invocation claimed it first. The check and the update are
+    a single statement so two invocations can never run the same job."""
+    claimed = session.execute(
+        update(SendJob)
+        .where(SendJob.id == job_id, claimable)
+        .values(state="running", updated_at=datetime.utcnow())
+        .returning(SendJob.id)
+    ).scalar()
+    session.commit()
+    if claimed is None:
+        return None
+    return session.get(SendJob, claimed, populate_existing=True)
+
+
+def process_send_job(
+    session, job, get_remaining_time_in_millis=None, recipient_limit=50000
+):
+    """Sends a job one chunk at a time, committing its progress after each chunk
+    so a failed or interrupted job resumes from the next unsent subscriber."""
+    send_payload = get_send_job_payload(job)
+    notifications_client = get_notify_client(job.service_api_key or NOTIFY_KEY)
+
+    job.error = None
+    session.commit()
+
+    # Unique sends are grouped by address, so they are paged on the address
+    key_name = job.template_type if job.unique else "id"
+    key_column = getattr(Subscription, key_name)
+
+    def hand_off():
+        # Hand the rest of the job to a fresh invocation. The sweeper leaves
+        # handed off jobs alone unless the new invocation never starts
+        job.state = "handed_off"
+        session.commit()
+        start_send_job(job.id)
+
+    while True:
+        if (
+            get_remaining_time_in_millis is not None
+            and get_remaining_time_in_millis() < SEND_JOB_TIME_MARGIN_MS
+        ):
+            hand_off()
+            return
+
+        address = getattr(Subscription, job.template_type)
+        q = get_send_query(session, send_payload).filter(
+            address.isnot(None), address != ""
+        )
+        if job.cursor is not None:
+            q = q.filter(key_column > (job.cursor if job.unique else UUID(job.cursor)))
+        rows = q.order_by(key_column).limit(recipient_limit).all()
+
+        if not rows:
+            job.state = "completed"
+            # Failed jobs keep the key so they can resume, finished ones don't
+            job.service_api_key = None
+            session.commit()
+            metrics.add_metric(name="SendJobCompleted", unit=MetricUnit.Count, value=1)
+            metrics.add_metadata(key="send_job_id", value=str(job.id))
+            return
+
+        cursor = str(rows[-1]._mapping[key_name])
+        subscribers = next(build_bulk_chunks(send_payload, rows, recipient_limit), None)
+        if subscribers is None:
+            # Nothing in this batch can be sent to, so move past it
+            job.cursor = cursor
+            session.commit()
+            continue
+
+        if get_remaining_time_in_millis is None:
+            deadline = nullcontext()
+        else:
+            deadline = notify_deadline(
+                (get_remaining_time_in_millis() - SEND_JOB_HANDOFF_MS) / 1000
+            )
+        try:
+            with deadline:
+                result = send_bulk_chunk(
+                    notifications_client, send_payload, job.chunks_sent, subscribers
                 )
+        except DeadlineExceededError:
+            # The chunk was not sent, so the next invocation starts with it
+            hand_off()
+            return
+        except Exception as err:
+            # Failed rather than left running, so the sweeper does not retry it
+            job.state = "failed"
+            job.error = str(err)
+            session.commit()
+            raise
+
+        if result["status"] != "OK":
+            job.state = "failed"
+            job.error = result["error"]
+            session.commit()
+            metrics.add_metric(name="SendJobFailed", unit=MetricUnit.Count, value=1)
+            metrics.add_metadata(key="send_job_id", value=str(job.id))
+            return
+
+        job.cursor = cursor
+        job.chunks_sent += 1
+        job.sent_count += result["recipients"]
+        session.commit()
 
-        if row[template_type]:
-            subscription_rows.append(
-                [
-                    row[template_type],
-                    (
-                        get_unsubscribe_link(str(row["id"]))  # add unsub link
-                        if "email" in template_type
-                        else row["id"]
-                    ),  # phone notification untouched
-                    *personalisation_values,
-                ]
+
+def reconcile_subscriber_counts():
+    """Recomputes the subscriber counts of every list from the subscriptions
+    table and returns the number of lists whose counts had drifted."""
+    session = db_session()
+    try:
+        counts = (
+            session.query(
+                Subscription.list_id,
+                func.count(Subscription.id)
+                .filter(Subscription.confirmed.is_(True))
+                .label("confirmed"),
+                func.count(Subscription.id)
+                .filter(Subscription.confirmed.isnot(True))
+                .label("pending"),
             )
+            .group_by(Subscription.list_id)
+            .subquery()
+        )
+        confirmed = func.coalesce(counts.c.confirmed, 0)
+        pending = func.coalesce(counts.c.pending, 0)
 
-        if i == subscription_count - 1:
-            notify_bulk_subscribers.append(subscription_rows)
+        drifted = (
+            session.query(
+                List.id, confirmed.label("confirmed"), pending.label("pending")
+            )
+            .outerjoin(counts, counts.c.list_id == List.id)
+            .filter(
+                or_(List.confirmed_count != confirmed, List.pending_count != pending)
+            )
+            .all()
+        )
+        for row in drifted:
+            session.query(List).filter(List.id == row.id).update(
+                {
+                    "confirmed_count": row.confirmed,
+                    "pending_count": row.pending,
+                    "updated_at": List.updated_at,
+                },
+                synchronize_session=False,
+            )
+        session.commit()
 
-    notifications_client = get_notify_client(send_payload.service_api_key or NOTIFY_KEY)
+        metrics.add_metric(
+            name="SubscriberCountDrift", unit=MetricUnit.Count, value=len(drifted)
+        )
+        return len(drifted)
+    finally:
+        session.close()
 
-    count_sent = 0
-    for subscribers in notify_bulk_subscribers:
-        notifications_client.send_bulk_notifications(
-            send_payload.job_name, subscribers, str(send_payload.template_id)
+
+def drain_notification_outbox(get_remaining_time_in_millis=None):
+    """Sends the pending outbox notifications that are due, in batches, and
+    returns the number sent."""
+    return run_in_event_loop(drain_outbox(get_remaining_time_in_millis))
+
+
+def run_in_event_loop(coroutine):
+    """Runs coroutine on the main thread's event loop, the one Mangum serves
+    requests on. Unlike asyncio.run this leaves the loop open and current, so
+    the next API Gateway event on a warm container can still use it."""
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            raise RuntimeError("Event loop is closed")
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coroutine)
+
+
+async def drain_outbox(get_remaining_time_in_millis=None):
+    session = db_session()
+    sent = 0
+    # A client of its own since the shared one belongs to the API's event loop
+    http_client = create_http_client(
+        connect_timeout=NOTIFY_CONNECT_TIMEOUT,
+        read_timeout=NOTIFY_READ_TIMEOUT,
+        http2=NOTIFY_HTTP2,
+    )
+    semaphore = asyncio.Semaphore(NOTIFY_BULK_MAX_IN_FLIGHT)
+
+    async def attempt(notification):
+        notifications_client = get_async_notify_client(
+            notification.service_api_key or NOTIFY_KEY, http_client
+        )
+        async with semaphore:
+            try:
+                await send_notification(notifications_client, notification)
+            except Exception as err:
+                log.error(err)
+                return err
+
+    try:
+        while (
+            get_remaining_time_in_millis is None
+            or get_remaining_time_in_millis() >= NOTIFICATION_OUTBOX_TIME_MARGIN_MS
+        ):
+            # Rows stay locked while they are sent so concurrent drains skip them
+            batch = (
+                session.query(OutboxNotification)
+                .filter(
+                    OutboxNotification.state == "pending",
+                    OutboxNotification.next_attempt_at <= datetime.utcnow(),
+                )
+                .order_by(OutboxNotification.next_attempt_at)
+                .limit(NOTIFICATION_OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not batch:
+                break
+
+            errors = await asyncio.gather(*map(attempt, batch))
+            for notification, error in zip(batch, errors):
+                record_outbox_attempt(notification, error)
+                sent += error is None
+            session.commit()
+
+        metrics.add_metric(
+            name="OutboxNotificationSent", unit=MetricUnit.Count, value=sent
+        )
+        return sent
+    finally:
+        session.close()
+        await http_client.aclose()
+
+
+def record_outbox_attempt(notification, error):
+    """Marks an outbox notification sent, or schedules its retry with exponential
+    backoff. Requests Notify rejects and exhausted retries are marked failed."""
+    if isinstance(error, RateLimitExceededError):
+        # Never sent, so this does not use up an attempt
+        notification.next_attempt_at = datetime.utcnow() + timedelta(
+            seconds=error.retry_after
         )
-        count_sent += len(subscribers) - 1
+        return
+
+    notification.attempts += 1
+    if error is None:
+        notification.state = "sent"
+        notification.service_api_key = None
+        notification.error = None
+        return
+
+    notification.error = str(error)
+    status_code = getattr(error, "status_code", None)
+    rejected = (
+        status_code is not None and 400 <= status_code < 500 and status_code != 429
+    )
+    if rejected or notification.attempts >= NOTIFICATION_OUTBOX_MAX_ATTEMPTS:
+        notification.state = "failed"
+        notification.service_api_key = None
+        metrics.add_metric(
+            name="OutboxNotificationFailed", unit=MetricUnit.Count, value=1
+        )
+        return
+
+    backoff = NOTIFICATION_OUTBOX_BACKOFF_SECONDS * 2 ** (notification.attempts - 1)
+    notification.next_attempt_at = datetime.utcnow() + timedelta(
+        seconds=min(backoff, NOTIFICATION_OUTBOX_MAX_BACKOFF_SECONDS)
+    )
 
-    return count_sent
+
+# Shared by every client: an outage affects Notify as a whole, not one API key
+notify_circuit_breaker = CircuitBreaker(
+    failure_threshold=NOTIFY_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=NOTIFY_CIRCUIT_RESET_SECONDS,
+)
+notify_rate_limiter = RateLimiter(
+    {
+        "email": NOTIFY_RATE_LIMIT_EMAIL,
+        "sms": NOTIFY_RATE_LIMIT_SMS,
+        "bulk": NOTIFY_RATE_LIMIT_BULK,
+    },
+    burst=NOTIFY_RATE_LIMIT_BURST,
+)
 
 
 def get_notify_client(api_key=NOTIFY_KEY):
-    return NotificationsAPIClient(
-        api_key, base_url="https://api.notification.canada.ca"
+    # Clients are reused across requests and warm invocations so their HTTP
+    # session keeps its TLS connections to Notify alive
+    notifications_client = notify_clients.get(api_key)
+    if notifications_client is None:
+        notifications_client = NotificationsAPIClient(
+            api_key,
+            base_url=NOTIFY_BASE_URL,
+            timeout=NOTIFY_READ_TIMEOUT,
+            connect_timeout=NOTIFY_CONNECT_TIMEOUT,
+            pool_maxsize=NOTIFY_BULK_MAX_IN_FLIGHT,
+            circuit_breaker=notify_circuit_breaker,
+            max_retries=NOTIFY_MAX_RETRIES,
+            max_retry_delay=NOTIFY_MAX_RETRY_DELAY,
+            rate_limiter=notify_rate_limiter,
+            rate_limit_max_wait=NOTIFY_RATE_LIMIT_BULK_MAX_WAIT,
+        )
+        notify_clients.set(api_key, notifications_client)
+    return notifications_client
+
+
+@lru_cache(maxsize=1)
+def get_notify_http_client():
+    # Created on first use rather than at import to keep it out of cold starts
+    return create_http_client(
+        connect_timeout=NOTIFY_CONNECT_TIMEOUT,
+        read_timeout=NOTIFY_READ_TIMEOUT,
+        http2=NOTIFY_HTTP2,
+    )
+
+
+def get_async_notify_client(api_key=NOTIFY_KEY, http_client=None):
+    return AsyncNotificationsAPIClient(
+        api_key,
+        http_client or get_notify_http_client(),
+        base_url=NOTIFY_BASE_URL,
+        circuit_breaker=notify_circuit_breaker,
+        max_retries=NOTIFY_MAX_RETRIES,
+        max_retry_delay=NOTIFY_MAX_RETRY_DELAY,
+        rate_limiter=notify_rate_limiter,
+        rate_limit_max_wait=NOTIFY_RATE_LIMIT_MAX_WAIT,
     )
 
 
+def warm_up():
+    """Opens the database connection and the Notify TLS sessions ahead of the
+    next request on this container."""
+    try:
+        with db_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as err:
+        log.error(err)
+
+    # The requests session sends bulk notifications
+    try:
+        get_notify_client().request_session.head(NOTIFY_BASE_URL, timeout=5)
+    except Exception as err:
+        log.error(err)
+
+    # The httpx client sends subscribe and unsubscribe confirmations. Its
+    # connections belong to the event loop they were opened on, the one Mangum
+    # serves requests on
+    try:
+        run_in_event_loop(get_notify_http_client().head(NOTIFY_BASE_URL, timeout=5))
+    except Exception as err:
+        log.error(err)
+
+
 def get_confirm_link(subscription_id):
     return f"{BASE_URL}/subscription/{subscription_id}/confirm"
 
@@ -863,6 +2192,30 @@ def get_unsubscribe_link(subscription_id):
     return f"{BASE_URL}/unsubscribe/{subscription_id}"
 
 
+def bulk_import_subscriptions(session, list_id, column, values):
+    """Adds values as confirmed subscriptions of the list in a single INSERT ...
+    ON CONFLICT DO NOTHING, and returns the number of subscriptions inserted."""
+    incoming = select(
+        func.unnest(literal(list(values), ARRAY(String))).label("value")
+    ).subquery()
+
+    result = session.execute(
+        pg_insert(Subscription)
+        .from_select(
+            ["id", "list_id", column, "confirmed", "created_at"],
+            select(
+                func.gen_random_uuid(),
+                literal(list_id, Subscription.list_id.type),
+                incoming.c.value,
+                true(),
+                func.timezone("UTC", func.now()),
+            ),
+        )
+        .on_conflict_do_nothing(**subscription_conflict_target(column))
+    )
+    return result.rowcount
+
+
 class ListImportEmailPayload(BaseModel):
     list_id: UUID
     emails: conlist(EmailStr, min_items=1, max_items=10000)
@@ -872,6 +2225,7 @@ class ListImportEmailPayload(BaseModel):
 
 
 @app.post("/listimport", deprecated=True)
+@db_route
 def email_list_import(
     list_import_payload: ListImportEmailPayload,
     response: Response,
@@ -882,23 +2236,8 @@ def email_list_import(
     try:
         _ = session.query(List).filter(List.id == list_import_payload.list_id).one()
 
-        existing = [
-            email
-            for email, in (
-                session.query(Subscription.email)
-                .filter_by(list_id=list_import_payload.list_id)
-                .all()
-            )
-        ]
-        unique = set(list_import_payload.emails) - set(existing)
-
-        session.add_all(
-            [
-                Subscription(
-                    email=email, confirmed=True, list_id=list_import_payload.list_id
-                )
-                for email in unique
-            ]
+        inserted = bulk_import_subscriptions(
+            session, list_import_payload.list_id, "email", list_import_payload.emails
         )
         session.commit()
     except NoResultFound:
@@ -910,7 +2249,11 @@ def email_list_import(
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         return {"error": f"error importing list: {error}"}
     else:
-        return {"status": "OK"}
+        return {
+            "status": "OK",
+            "inserted": inserted,
+            "skipped": len(list_import_payload.emails) - inserted,
+        }
 
 
 class ListImportPayload(BaseModel):
@@ -932,6 +2275,7 @@ class ListImportPayload(BaseModel):
 
 
 @app.post("/list/{list_id}/import")
+@db_route
 def list_import(
     list_id,
     list_import_payload: ListImportPayload,
@@ -955,49 +2299,186 @@ def list_import(
                 "error": "Payload may only include one of: phone<list>, email<list>"
             }
 
-        if list_import_payload.email:
-            type = "email"
-            existing = [
-                email
-                for email, in (
-                    session.query(Subscription.email).filter_by(list_id=list_id).all()
-                )
-            ]
-            unique = set(list_import_payload.email) - set(existing)
-
-            session.add_all(
-                [
-                    Subscription(email=email, confirmed=True, list_id=list_id)
-                    for email in unique
-                ]
-            )
-            session.commit()
-
-        if list_import_payload.phone:
-            type = "phone"
-            existing = [
-                phone
-                for phone, in (
-                    session.query(Subscription.phone).filter_by(list_id=list_id).all()
-                )
-            ]
-            unique = set(list_import_payload.phone) - set(existing)
-
-            session.add_all(
-                [
-                    Subscription(phone=phone_number, confirmed=True, list_id=list_id)
-                    for phone_number in unique
-                ]
-            )
-            session.commit()
+        type = "email" if list_import_payload.email else "phone"
+        values = getattr(list_import_payload, type)
 
+        inserted = bulk_import_subscriptions(session, list_id, type, values)
+        session.commit()
     except NoResultFound:
         response.status_code = status.HTTP_404_NOT_FOUND
         return {"error": "list not found"}
     except SQLAlchemyError as error:
         metrics.add_metric(name="ListEmailImportError", unit=MetricUnit.Count, value=1)
-        metrics.add_metadata(key="list_id", value=str(list_import_payload.list_id))
+        metrics.add_metadata(key="list_id", value=str(list_id))
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
         return {"error": f"error importing {type} list: {error}"}
     else:
-        return {"status": "OK"}
+        return {"status": "OK", "inserted": inserted, "skipped": len(values) - inserted}
+
+
+class ImportType(str, Enum):
+    email = "email"
+    phone = "phone"
+
+
+IMPORT_HEADERS = {"email", "email address", "phone", "phone number"}
+
+
+async def iter_upload_lines(request):
+    """Yields the first CSV column of each line of the request body as the body
+    arrives, so memory use does not grow with the size of the upload."""
+    buffer = b""
+    async for chunk in request.stream():
+        *lines, rest = chunk.split(b"\n")
+        for line in lines:
+            yield parse_upload_line(buffer + line)
+            buffer = b""
+        # Only enough of a long line is kept to tell that it is too long
+        buffer = (buffer + rest)[: IMPORT_MAX_LINE_LENGTH + 1]
+
+    if buffer:
+        yield parse_upload_line(buffer)
+
+
+def parse_upload_line(line):
+    """Returns the first CSV column of the line, or None when the line is too
+    long or is not UTF-8 and cannot be read."""
+    if len(line) > IMPORT_MAX_LINE_LENGTH:
+        return None
+    try:
+        decoded = line.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return None
+    row = next(csv.reader([decoded.strip()]), [])
+    return row[0].strip() if row else ""
+
+
+def validate_import_value(type, value):
+    if type == ImportType.email:
+        return EmailStr.validate(value)
+    if not 9 <= len(value) <= 15:
+        raise ValueError("phone number must be between 9 and 15 characters")
+    return value
+
+
+def commit_import_batch(session, upload, values, line_number):
+    """Imports a batch and records the upload progress in the same transaction,
+    so a resumed upload neither skips nor repeats a committed line."""
+    inserted = bulk_import_subscriptions(session, upload.list_id, upload.type, values)
+    upload.inserted += inserted
+    upload.skipped += len(values) - inserted
+    upload.lines_committed = line_number
+    session.commit()
+    # Reload here so the route can read the upload without touching the database
+    session.refresh(upload)
+
+
+def get_import_upload(session, list_id, upload_id, type):
+    list = session.get(List, list_id)
+    if list is None:
+        raise NoResultFound
+
+    if upload_id is None:
+        upload = ImportUpload(list_id=list.id, type=type.value)
+        session.add(upload)
+        session.commit()
+        session.refresh(upload)
+        return upload
+
+    upload = session.get(ImportUpload, upload_id)
+    if upload is None or upload.list_id != list.id or upload.type != type.value:
+        raise NoResultFound
+    return upload
+
+
+def fail_import_upload(session, upload, error):
+    session.rollback()
+    upload.state = "failed"
+    upload.error = error
+    session.commit()
+    session.refresh(upload)
+
+
+@app.post("/list/{list_id}/import/upload")
+async def list_import_upload(
+    list_id,
+    type: ImportType,
+    request: Request,
+    response: Response,
+    upload_id: Optional[UUID] = None,
+    session: Session = Depends(get_db),
+    _authorized: bool = Depends(verify_token),
+):
+    """Imports a CSV or newline-delimited upload of any size in batches. A failed
+    upload is resumed by sending the same file again with its upload_id."""
+    try:
+        upload = await run_db(session, get_import_upload, list_id, upload_id, type)
+    except SQLAlchemyError:
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return {"error": "list or upload not found"}
+
+    if upload.state == "completed":
+        return upload.to_dict()
+
+    resume_after = upload.lines_committed
+    upload.state = "in_progress"
+    upload.error = None
+
+    batch = []
+    line_number = 0
+    try:
+        async for value in iter_upload_lines(request):
+            line_number += 1
+            if line_number <= resume_after:
+                continue
+            if value is None:
+                upload.invalid += 1
+                continue
+            if not value:
+                continue
+            if line_number == 1 and value.lower() in IMPORT_HEADERS:
+                continue
+
+            try:
+                batch.append(validate_import_value(type, value))
+            except ValueError:
+                upload.invalid += 1
+
+            if len(batch) == IMPORT_BATCH_SIZE:
+                await run_db(session, commit_import_batch, upload, batch, line_number)
+                batch = []
+
+        upload.state = "completed"
+        await run_db(
+            session, commit_import_batch, upload, batch, max(line_number, resume_after)
+        )
+    except SQLAlchemyError as err:
+        log.error(err)
+        await run_db(session, fail_import_upload, upload, str(err))
+
+        metrics.add_metric(name="ListUploadImportError", unit=MetricUnit.Count, value=1)
+        metrics.add_metadata(key="list_id", value=str(list_id))
+        response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        return {"error": "error importing upload", **upload.to_dict()}
+
+    return upload.to_dict()
+
+
+@app.get("/list/{list_id}/import/upload/{upload_id}")
+@db_route
+def list_import_upload_status(
+    list_id,
+    upload_id,
+    response: Response,
+    session: Session = Depends(get_db),
+    _authorized: bool = Depends(verify_token),
+):
+    try:
+        upload = session.get(ImportUpload, upload_id)
+        if upload is None or str(upload.list_id) != list_id:
+            raise NoResultFound
+    except SQLAlchemyError:
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return {"error": "upload not found"}
+
+    return upload.to_dict()
@@ -0,0 +1,14 @@
+import orjson
+from fastapi.responses import ORJSONResponse as BaseORJSONResponse
+
+
+def dumps(content):
+    """Encodes content with orjson, which handles UUID and datetime values
+    natively, falling back to str() for values it has no encoding for, such as
+    the UUID subclass returned by asyncpg."""
+    return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(BaseORJSONResponse):
+    def render(self, content):
+        return dumps(content)
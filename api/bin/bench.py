@@ -0,0 +1,235 @@
+"""Benchmarks the API's hot paths and compares runs against a baseline.
+
+Times send_bulk_notify building and dispatching bulk chunks, /lists row
+serialization and encoding, and the ON CONFLICT dedupe of list imports
+against a large existing list. The import benchmark needs the database
+(SQLALCHEMY_DATABASE_URI) and is skipped when it cannot be reached.
+
+    python bin/bench.py --output bench.json
+    python bin/bench.py --compare bench.json --max-regression 0.2
+    python bin/bench.py --filter lists --quick
+
+With --compare the command fails when a benchmark's median time grew by more
+than --max-regression (a fraction) over the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+# Importing the API builds a database engine but only connects when used
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "postgresql://localhost/list-manager")
+os.environ.setdefault("API_AUTH_TOKEN", "bench")
+# Seeding the import benchmark would otherwise be logged as a slow query
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+
+from sqlalchemy import delete, text  # noqa: E402
+from sqlalchemy.exc import SQLAlchemyError  # noqa: E402
+
+from api_gateway import api  # noqa: E402
+from api_gateway.responses import ORJSONResponse  # noqa: E402
+from database.db import db_session  # noqa: E402
+from models.List import List  # noqa: E402
+from models.Subscription import Subscription  # noqa: E402
+
+SIZES = {
+    "send_bulk_notify": [10_000, 100_000, 1_000_000],
+    "lists": [1_000, 10_000],
+    "import": [(10_000, 100_000)],
+}
+QUICK_SIZES = {
+    "send_bulk_notify": [10_000],
+    "lists": [1_000],
+    "import": [(1_000, 10_000)],
+}
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def subscriber_rows(count):
+    return [
+        {"id": uuid.uuid4(), "email": f"subscriber_{i}@example.com"}
+        for i in range(count)
+    ]
+
+
+def bench_send_bulk_notify(count):
+    rows = subscriber_rows(count)
+    send_payload = api.SendPayload(
+        list_id=uuid.uuid4(), template_id=uuid.uuid4(), template_type="email"
+    )
+
+    def run():
+        with patch("api_gateway.api.get_notify_client", return_value=MagicMock()):
+            api.send_bulk_notify(count, send_payload, rows)
+
+    return run
+
+
+def list_rows(count):
+    # Rows in LIST_RESPONSE_COLUMNS order, as returned by the /lists query
+    return [
+        ("List", "en", "service")
+        + tuple(str(uuid.uuid4()) for _ in range(4))
+        + ("https://example.com/subscribed", None, None, uuid.uuid4(), i)
+        for i in range(count)
+    ]
+
+
+def bench_lists(count):
+    rows = list_rows(count)
+
+    def run():
+        ORJSONResponse(api.serialize_lists(rows))
+
+    return run
+
+
+def bench_import(size):
+    count, existing = size
+    session = db_session()
+    try:
+        session.execute(text("SELECT 1"))
+    except SQLAlchemyError as err:
+        session.close()
+        raise SkipBenchmark(f"database unavailable: {err.__class__.__name__}")
+
+    list = List(name=f"bench_{uuid.uuid4()}", language="en", service_id="bench")
+    session.add(list)
+    session.commit()
+    api.bulk_import_subscriptions(
+        session,
+        list.id,
+        "email",
+        [f"existing_{i}@example.com" for i in range(existing)],
+    )
+    session.commit()
+    # Half of the import is already subscribed and is skipped by ON CONFLICT
+    values = [f"existing_{i}@example.com" for i in range(0, existing, 2)][: count // 2]
+    values += [f"new_{i}@example.com" for i in range(count - len(values))]
+
+    def run():
+        api.bulk_import_subscriptions(session, list.id, "email", values)
+        # Each run starts from the same existing list
+        session.rollback()
+
+    def cleanup():
+        session.execute(delete(Subscription).where(Subscription.list_id == list.id))
+        session.execute(delete(List).where(List.id == list.id))
+        session.commit()
+        session.close()
+
+    run.cleanup = cleanup
+    return run
+
+
+BENCHMARKS = {
+    "send_bulk_notify": (bench_send_bulk_notify, "{} rows"),
+    "lists": (bench_lists, "{} lists"),
+    "import": (bench_import, "{0[0]} into {0[1]}"),
+}
+
+
+def measure(run, repeat):
+    run()  # Warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def run_benchmarks(sizes, repeat, name_filter=None):
+    results = {}
+    for group, (setup, label) in BENCHMARKS.items():
+        for size in sizes[group]:
+            name = f"{group}[{label.format(size)}]"
+            if name_filter and name_filter not in name:
+                continue
+            try:
+                run = setup(size)
+            except SkipBenchmark as err:
+                print(f"{name:<40} skipped: {err}")
+                continue
+            try:
+                results[name] = measure(run, repeat)
+            finally:
+                getattr(run, "cleanup", lambda: None)()
+            print(f"{name:<40} {results[name]['median_ms']:>12.1f} ms")
+    return results
+
+
+def compare(results, baseline, max_regression):
+    """Prints each benchmark against the baseline and returns the names of those
+    whose median grew by more than max_regression."""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<40} {'-':>12} {result['median_ms']:>12.1f}")
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1
+        flag = ""
+        if change > max_regression:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<40} {previous['median_ms']:>12.1f} "
+            f"{result['median_ms']:>12.1f} {change:>+8.0%}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", help="only run benchmarks containing this text")
+    parser.add_argument("--quick", action="store_true", help="use the smallest sizes")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        QUICK_SIZES if args.quick else SIZES, args.repeat, args.filter
+    )
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "git_sha": os.environ.get("GIT_SHA", "unknown"),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline), args.max_regression)
+        if regressions:
+            print(
+                f"\n{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}"
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compares the cost of encoding large /lists responses.
+
+Builds a payload shaped like the /lists response and times three ways of
+turning it into a response body:
+
+  json      jsonable_encoder then JSONResponse, FastAPI's default
+  orjson    jsonable_encoder then ORJSONResponse, the API's default class
+  direct    ORJSONResponse alone, as returned by /lists
+
+    python bin/bench_json.py --lists 10000 --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from api_gateway.responses import ORJSONResponse  # noqa: E402
+
+
+def build_lists(count):
+    return [
+        {
+            "id": uuid.uuid4(),
+            "name": f"List {i}",
+            "language": "en",
+            "service_id": str(uuid.uuid4()),
+            "active": True,
+            "subscribe_email_template_id": str(uuid.uuid4()),
+            "unsubscribe_email_template_id": str(uuid.uuid4()),
+            "subscribe_redirect_url": "https://articles.alpha.canada.ca/subscribed",
+            "subscriber_count": i,
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(count)
+    ]
+
+
+ENCODERS = {
+    "json": lambda lists: JSONResponse(jsonable_encoder(lists)).body,
+    "orjson": lambda lists: ORJSONResponse(jsonable_encoder(lists)).body,
+    "direct": lambda lists: ORJSONResponse(lists).body,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lists", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    lists = build_lists(args.lists)
+    print(f"Encoding {args.lists} lists, best of {args.repeat} runs\n")
+    print(f"{'encoder':<10} {'ms':>10} {'speedup':>10} {'bytes':>12}")
+    baseline = None
+    for name, encode in ENCODERS.items():
+        best = min(timeit.repeat(lambda: encode(lists), number=1, repeat=args.repeat))
+        baseline = baseline or best
+        size = len(encode(lists))
+        print(f"{name:<10} {best * 1000:>10.1f} {baseline / best:>9.1f}x {size:>12}")
+
+
+if __name__ == "__main__":
+    main()
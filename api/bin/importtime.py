@@ -0,0 +1,81 @@
+"""Reports the import cost of the Lambda entry point.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+prints the slowest modules and top level packages. Pass --max-total-ms to
+fail when the total import time of the entry point exceeds a budget.
+
+    python bin/importtime.py --top 20 --max-total-ms 2000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(output):
+    """Returns a list of (module, self_us, cumulative_us, depth) tuples."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def profile(module):
+    env = dict(os.environ)
+    # Importing the entry point builds a database engine but never connects
+    env.setdefault("SQLALCHEMY_DATABASE_URI", "postgresql://localhost/list-manager")
+    env.setdefault("API_AUTH_TOKEN", "importtime")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        sys.exit(result.returncode)
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-total-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    imports = profile(args.module)
+    total_ms = sum(self_us for _, self_us, _, _ in imports) / 1000
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in imports:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"Total import time for {args.module}: {total_ms:.1f} ms\n")
+    print(f"{'package':<40} {'self [ms]':>10}")
+    for name, self_us in sorted(packages.items(), key=lambda p: -p[1])[: args.top]:
+        print(f"{name:<40} {self_us / 1000:>10.1f}")
+
+    print(f"\n{'module':<60} {'self [ms]':>10} {'cumulative [ms]':>16}")
+    slowest = sorted(imports, key=lambda i: -i[1])[: args.top]
+    for name, self_us, cumulative_us, _ in slowest:
+        print(f"{name:<60} {self_us / 1000:>10.1f} {cumulative_us / 1000:>16.1f}")
+
+    if args.max_total_ms is not None and total_ms > args.max_total_ms:
+        print(
+            f"\nImport time {total_ms:.1f} ms exceeds the {args.max_total_ms:.0f} ms budget"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
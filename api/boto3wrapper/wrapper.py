@@ -3,7 +3,7 @@ import os
 
 
 def get_session():
-    options = {"region_name": "ca_central_1"}
+    options = {"region_name": "ca-central-1"}
 
     use_localstack = os.environ.get("AWS_LOCALSTACK", False)
     if use_localstack:
@@ -1,9 +1,318 @@
+import asyncio
+import random
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+
+import httpx
+import requests
+from aws_lambda_powertools import Metrics
+from aws_lambda_powertools.metrics import MetricUnit
+from notifications_python_client import __version__
+from notifications_python_client.authentication import create_jwt_token
+from notifications_python_client.errors import HTTP503Error, HTTPError
 from notifications_python_client.notifications import (
     NotificationsAPIClient as BaseNotify,
 )
+from requests.adapters import HTTPAdapter
+
+from request_timing import time_notify_request
+
+metrics = Metrics(namespace="ListManager", service="api")
+
+# Notify rejects these before doing any work, so sending again cannot send twice.
+# 502 and 504 are not retried: the notification may have been accepted upstream.
+RETRY_STATUS_CODES = {429, 503}
+
+
+class CircuitOpenError(HTTP503Error):
+    def __init__(self):
+        super().__init__(message="Notify circuit breaker is open")
+
+
+class CircuitBreaker:
+    """Fails Notify requests fast after failure_threshold consecutive server or
+    connection errors. After reset_timeout seconds a single trial request is let
+    through: it closes the breaker if it succeeds and reopens it if it fails."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if (
+                self.state == "open"
+                and time.monotonic() - self.opened_at >= self.reset_timeout
+            ):
+                self.state = "half_open"
+                return True
+            return False
+
+    def release_trial(self):
+        """Reopens the breaker when a trial request ended without an outcome,
+        so the next request can be the trial instead."""
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                metrics.add_metric(
+                    name="NotifyCircuitClosed", unit=MetricUnit.Count, value=1
+                )
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    metrics.add_metric(
+                        name="NotifyCircuitOpened", unit=MetricUnit.Count, value=1
+                    )
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class RateLimitExceededError(HTTPError):
+    """Raised instead of calling Notify when the client side rate limit for an
+    API key would need a longer wait than the caller allows."""
+
+    def __init__(self, retry_after):
+        super().__init__(message="Notify rate limit exceeded")
+        self.retry_after = retry_after
+
+    @property
+    def status_code(self):
+        return 429
+
+
+class DeadlineExceededError(Exception):
+    """Raised instead of starting a rate limit wait, a retry or a request that
+    could still be running when the deadline set by notify_deadline passes."""
+
+
+request_deadline = ContextVar("notify_request_deadline", default=None)
+
+
+@contextmanager
+def notify_deadline(seconds):
+    """Bounds the Notify calls made in the block, including their retries and
+    rate limit waits, to finish within seconds."""
+    token = request_deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def reserve(self, max_wait):
+        """Takes a token and returns how long to wait before using it, or
+        returns None without taking one if that wait is longer than max_wait.
+        Tokens may be borrowed ahead so concurrent callers queue up in turn."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        wait = max(1 - self.tokens, 0) / self.rate
+        if wait > max_wait:
+            return None
+        self.tokens -= 1
+        return wait
+
+
+class RateLimiter:
+    """Token buckets per Notify service and endpoint kind ("email", "sms" or "bulk"),
+    keeping this process under Notify's per service rate limits. rates maps
+    each kind to requests per minute; kinds without a rate are not limited."""
+
+    def __init__(self, rates, burst=10):
+        self.rates = rates
+        self.burst = burst
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, service_id, kind, max_wait=0):
+        rate = self.rates.get(kind)
+        if not rate:
+            return 0
+        with self._lock:
+            bucket = self.buckets.get((service_id, kind))
+            if bucket is None:
+                bucket = TokenBucket(rate / 60, min(self.burst, rate))
+                self.buckets[(service_id, kind)] = bucket
+            wait = bucket.reserve(max_wait)
+        if wait is None:
+            metrics.add_metric(
+                name="NotifyRateLimitExceeded", unit=MetricUnit.Count, value=1
+            )
+            raise RateLimitExceededError(1 / bucket.rate)
+        if wait > 0:
+            metrics.add_metric(
+                name="NotifyRateLimitWait", unit=MetricUnit.Seconds, value=wait
+            )
+        return wait
+
+
+def endpoint_kind(url):
+    for kind in ("email", "sms", "bulk"):
+        if url.endswith(f"/v2/notifications/{kind}"):
+            return kind
+    return None
+
+
+def retry_after_seconds(headers):
+    value = headers.get("Retry-After") if headers is not None else None
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, headers=None, base_delay=0.5, max_delay=5):
+    """Returns how long to wait before retry number attempt (from 0), using
+    Retry-After when Notify sends it and full-jitter exponential backoff
+    otherwise, or None when Notify asks to wait longer than max_delay."""
+    retry_after = retry_after_seconds(headers)
+    if retry_after is not None:
+        return retry_after if retry_after <= max_delay else None
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+class ResilientClientMixin:
+    # Longest a single attempt can take, checked against the request deadline
+    attempt_timeout = 0
+
+    def _configure_resilience(
+        self,
+        circuit_breaker,
+        max_retries,
+        max_retry_delay,
+        rate_limiter=None,
+        rate_limit_max_wait=1,
+    ):
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.max_retry_delay = max_retry_delay
+        self.rate_limiter = rate_limiter
+        self.rate_limit_max_wait = rate_limit_max_wait
+
+    def _time_left(self):
+        deadline = request_deadline.get()
+        return None if deadline is None else deadline - time.monotonic()
+
+    def _check_deadline(self, wait=0):
+        time_left = self._time_left()
+        if time_left is not None and wait + self.attempt_timeout > time_left:
+            metrics.add_metric(
+                name="NotifyDeadlineExceeded", unit=MetricUnit.Count, value=1
+            )
+            raise DeadlineExceededError()
+
+    def _rate_limit_delay(self, url):
+        if self.rate_limiter is None:
+            return 0
+        max_wait = self.rate_limit_max_wait
+        time_left = self._time_left()
+        if time_left is not None:
+            max_wait = min(max_wait, max(time_left - self.attempt_timeout, 0))
+        try:
+            delay = self.rate_limiter.reserve(
+                self.service_id, endpoint_kind(url), max_wait
+            )
+        except RateLimitExceededError as err:
+            if max_wait < self.rate_limit_max_wait:
+                # The wait was only refused because of the deadline
+                raise DeadlineExceededError() from err
+            raise
+        return delay
 
+    def _check_circuit(self):
+        """Raises CircuitOpenError when the breaker rejects the request, and
+        returns whether the request is the breaker's half open trial."""
+        if not self.circuit_breaker.allow_request():
+            metrics.add_metric(
+                name="NotifyCircuitRejected", unit=MetricUnit.Count, value=1
+            )
+            raise CircuitOpenError()
+        return self.circuit_breaker.state == "half_open"
+
+    def _record_result(self, status_code=None, connection_error=False):
+        """Records the outcome of an attempt with the circuit breaker and returns
+        whether it may be retried."""
+        if connection_error or (status_code is not None and status_code >= 500):
+            self.circuit_breaker.record_failure()
+        else:
+            # Any other answer, including a 4xx, shows that Notify is up
+            self.circuit_breaker.record_success()
+        return connection_error or status_code in RETRY_STATUS_CODES
+
+    def _next_retry_delay(self, attempt, headers):
+        if attempt >= self.max_retries:
+            return None
+        delay = retry_delay(attempt, headers, max_delay=self.max_retry_delay)
+        if delay is not None:
+            self._check_deadline(delay)
+            metrics.add_metric(
+                name="NotifyRequestRetry", unit=MetricUnit.Count, value=1
+            )
+        return delay
+
+
+class NotificationsAPIClient(ResilientClientMixin, BaseNotify):
+    def __init__(
+        self,
+        *args,
+        pool_maxsize=10,
+        connect_timeout=5,
+        circuit_breaker=None,
+        max_retries=2,
+        max_retry_delay=5,
+        rate_limiter=None,
+        rate_limit_max_wait=1,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.connect_timeout = connect_timeout
+        self.attempt_timeout = connect_timeout + self.timeout
+        self._configure_resilience(
+            circuit_breaker,
+            max_retries,
+            max_retry_delay,
+            rate_limiter,
+            rate_limit_max_wait,
+        )
+        # Keep enough pooled connections for concurrent bulk requests
+        self.request_session.mount(
+            "https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        )
 
-class NotificationsAPIClient(BaseNotify):
     def send_bulk_notifications(
         self,
         job_name,
@@ -25,5 +334,193 @@ class NotificationsAPIClient(BaseNotify):
         return self.post("/v2/notifications/bulk", data=notification)
 
     def _perform_request(self, method, url, kwargs):
-        kwargs["timeout"] = 30
-        return super()._perform_request(method, url, kwargs)
+        kwargs["timeout"] = (self.connect_timeout, self.timeout)
+        attempt = 0
+        while True:
+            # Rate limited before the circuit check, so a trial is never stopped
+            # by the rate limiter once it has started
+            delay = self._rate_limit_delay(url)
+            self._check_deadline(delay)
+            if delay:
+                time.sleep(delay)
+            trial = self._check_circuit()
+            try:
+                with time_notify_request():
+                    response = super()._perform_request(method, url, kwargs)
+            except HTTPError as err:
+                # The base client raises from the original requests exception
+                connection_error = isinstance(err.__context__, requests.ConnectionError)
+                response = err.response
+                retryable = self._record_result(
+                    None if response is None else response.status_code,
+                    connection_error=connection_error or response is None,
+                )
+                delay = self._next_retry_delay(
+                    attempt, None if response is None else response.headers
+                )
+                # Read timeouts are not retried: Notify may have sent the message
+                if (
+                    not retryable
+                    or delay is None
+                    or (response is None and not connection_error)
+                ):
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self._record_result(response.status_code)
+                return response
+            finally:
+                # A trial that ended without an outcome must not wedge the
+                # breaker in half_open
+                if trial:
+                    self.circuit_breaker.release_trial()
+
+
+def create_http_client(
+    connect_timeout=5, read_timeout=30, http2=False, max_connections=10
+):
+    """Returns an httpx.AsyncClient meant to be shared by every
+    AsyncNotificationsAPIClient, so connections are pooled and kept alive
+    across API keys and requests."""
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+
+
+class AsyncNotificationsAPIClient(ResilientClientMixin):
+    def __init__(
+        self,
+        api_key,
+        http_client,
+        base_url="https://api.notification.canada.ca",
+        circuit_breaker=None,
+        max_retries=2,
+        max_retry_delay=5,
+        rate_limiter=None,
+        rate_limit_max_wait=1,
+    ):
+        self.service_id = api_key[-73:-37]
+        self.api_key = api_key[-36:]
+        self.base_url = base_url
+        self.http_client = http_client
+        self._configure_resilience(
+            circuit_breaker,
+            max_retries,
+            max_retry_delay,
+            rate_limiter,
+            rate_limit_max_wait,
+        )
+
+    async def send_email_notification(
+        self,
+        email_address,
+        template_id,
+        personalisation=None,
+        reference=None,
+        email_reply_to_id=None,
+    ):
+        notification = {"email_address": email_address, "template_id": template_id}
+        if personalisation:
+            notification.update({"personalisation": personalisation})
+        if reference:
+            notification.update({"reference": reference})
+        if email_reply_to_id:
+            notification.update({"email_reply_to_id": email_reply_to_id})
+        return await self.post("/v2/notifications/email", data=notification)
+
+    async def send_sms_notification(
+        self,
+        phone_number,
+        template_id,
+        personalisation=None,
+        reference=None,
+        sms_sender_id=None,
+    ):
+        notification = {"phone_number": phone_number, "template_id": template_id}
+        if personalisation:
+            notification.update({"personalisation": personalisation})
+        if reference:
+            notification.update({"reference": reference})
+        if sms_sender_id:
+            notification.update({"sms_sender_id": sms_sender_id})
+        return await self.post("/v2/notifications/sms", data=notification)
+
+    async def send_bulk_notifications(
+        self,
+        job_name,
+        subscriptions,
+        template_id,
+        scheduled_for=None,
+        email_reply_to_id=None,
+    ):
+        notification = {
+            "name": job_name,
+            "template_id": template_id,
+            "rows": subscriptions,
+        }
+
+        if scheduled_for:
+            notification.update({"scheduled_for": scheduled_for})
+        if email_reply_to_id:
+            notification.update({"reply_to_id": email_reply_to_id})
+        return await self.post("/v2/notifications/bulk", data=notification)
+
+    async def post(self, url, data):
+        attempt = 0
+        while True:
+            delay = self._rate_limit_delay(url)
+            self._check_deadline(delay)
+            if delay:
+                await asyncio.sleep(delay)
+            trial = self._check_circuit()
+            try:
+                with time_notify_request():
+                    response = await self._post(url, data)
+            except httpx.HTTPStatusError as err:
+                retryable = self._record_result(err.response.status_code)
+                delay = self._next_retry_delay(attempt, err.response.headers)
+                if not retryable or delay is None:
+                    # Raise the same errors as the synchronous client
+                    if err.response.status_code == 503:
+                        raise HTTP503Error(err.response) from err
+                    raise HTTPError(err.response) from err
+            except httpx.HTTPError as err:
+                # Only requests that never reached Notify are retried
+                retryable = self._record_result(
+                    connection_error=isinstance(
+                        err, (httpx.ConnectError, httpx.ConnectTimeout)
+                    )
+                )
+                delay = self._next_retry_delay(attempt, None)
+                if not retryable or delay is None:
+                    raise HTTPError(message=str(err)) from err
+            else:
+                self._record_result(response.status_code)
+                if response.status_code == 204:
+                    return None
+                return response.json()
+            finally:
+                # Also covers cancellation while the trial is in flight
+                if trial:
+                    self.circuit_breaker.release_trial()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _post(self, url, data):
+        headers = {
+            "Content-type": "application/json",
+            "Authorization": f"Bearer {create_jwt_token(self.api_key, self.service_id)}",
+            "User-agent": f"NOTIFY-API-PYTHON-CLIENT/{__version__}",
+        }
+        response = await self.http_client.post(
+            urllib.parse.urljoin(self.base_url, url), json=data, headers=headers
+        )
+        response.raise_for_status()
+        return response
@@ -3,17 +3,126 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from database.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+from database.slow_queries import log_slow_queries
+from request_timing import instrument_queries
+
 if os.environ.get("CI"):
     connection_string = os.environ.get("SQLALCHEMY_DATABASE_TEST_URI")
 else:
     connection_string = os.environ.get("SQLALCHEMY_DATABASE_URI")
-# Timeout is set to 10 seconds
+
+# Lambda serves one request at a time per container, so a single connection is
+# enough and keeps RDS Proxy connections to one per container. Under uvicorn
+# ("server") requests run concurrently and need a pool of their own.
+POOL_PROFILES = {
+    "lambda": {"pool_size": 1, "max_overflow": 0, "pool_timeout": 10},
+    "server": {"pool_size": 10, "max_overflow": 10, "pool_timeout": 10},
+}
+
+
+def get_pool_options(profile):
+    """Returns the pool options of the profile, each of which can be overridden
+    by its own variable, e.g. SQLALCHEMY_POOL_SIZE."""
+    if profile not in POOL_PROFILES:
+        raise ValueError(
+            f"unknown SQLALCHEMY_POOL_PROFILE {profile!r}, "
+            f"expected one of: {', '.join(POOL_PROFILES)}"
+        )
+    return {
+        key: int(os.environ.get(f"SQLALCHEMY_{key.upper()}", default))
+        for key, default in POOL_PROFILES[profile].items()
+    }
+
+
+pool_profile = os.environ.get(
+    "SQLALCHEMY_POOL_PROFILE",
+    "lambda" if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") else "server",
+)
+pool_options = get_pool_options(pool_profile)
+
+# Statements slower than this are logged, with the EXPLAIN (ANALYZE, BUFFERS)
+# plan of the given fraction of the slow SELECTs. A threshold of 0 disables it.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 500))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(
+    os.environ.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0)
+)
+
+
+def instrument(engine):
+    instrument_engine(engine)
+    instrument_queries(engine)
+    if SLOW_QUERY_THRESHOLD_MS > 0:
+        log_slow_queries(
+            engine, SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        )
+
+
 db_engine = create_engine(
     connection_string,
-    pool_size=1,
-    max_overflow=0,
+    poolclass=InstrumentedQueuePool,
+    **pool_options,
     pool_pre_ping=True,  # Check that a connection is still active before attempting to use
     pool_recycle=1500,  # Prune connections older than 25 minutes (RDS Proxy has a timeout of 30 minutes)
     pool_use_lifo=True,  # Always re-use last connection used (allows server-side timeouts to remove unused connections)
 )
+instrument(db_engine)
 db_session = sessionmaker(bind=db_engine)
+
+# Read-only routes are served from a replica when SQLALCHEMY_DATABASE_READER_URI
+# is set, falling back to the engine above while it is unavailable or lagging
+reader_connection_string = os.environ.get("SQLALCHEMY_DATABASE_READER_URI")
+db_reader_engine = None
+db_reader_session = None
+if reader_connection_string:
+    db_reader_engine = create_engine(
+        reader_connection_string,
+        poolclass=InstrumentedQueuePool,
+        **pool_options,
+        pool_pre_ping=True,
+        pool_recycle=1500,
+        pool_use_lifo=True,
+    )
+    instrument(db_reader_engine)
+    db_reader_session = sessionmaker(bind=db_reader_engine)
+
+# Routes use an asyncpg engine instead when SQLALCHEMY_ASYNC is set. The sync
+# engine above is still used by the scheduled tasks and migrations.
+async_db_engine = None
+async_db_session = None
+async_db_reader_engine = None
+async_db_reader_session = None
+if os.environ.get("SQLALCHEMY_ASYNC", "").lower() in ("1", "true"):
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_db_engine = create_async_engine(
+        make_url(connection_string).set(drivername="postgresql+asyncpg"),
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        **pool_options,
+        pool_pre_ping=True,
+        pool_recycle=1500,
+        pool_use_lifo=True,
+    )
+    instrument(async_db_engine.sync_engine)
+    # Objects are not expired on commit so their attributes stay readable
+    # outside of the session's greenlet
+    async_db_session = async_sessionmaker(bind=async_db_engine, expire_on_commit=False)
+
+    if reader_connection_string:
+        async_db_reader_engine = create_async_engine(
+            make_url(reader_connection_string).set(drivername="postgresql+asyncpg"),
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
+            **pool_options,
+            pool_pre_ping=True,
+            pool_recycle=1500,
+            pool_use_lifo=True,
+        )
+        instrument(async_db_reader_engine.sync_engine)
+        async_db_reader_session = async_sessionmaker(
+            bind=async_db_reader_engine, expire_on_commit=False
+        )
@@ -1,8 +1,8 @@
-from alembic.config import Config
-from alembic import command
-
-
 def migrate_head():
+    # alembic is only needed by the migrate task, so keep it out of cold starts
+    from alembic.config import Config
+    from alembic import command
+
     alembic_cfg = Config("./db_migrations/alembic.ini")
     alembic_cfg.set_main_option("script_location", "./db_migrations")
     command.upgrade(alembic_cfg, "head")
@@ -0,0 +1,117 @@
+import threading
+import time
+
+from aws_lambda_powertools.metrics import MetricUnit
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Pool activity since the last snapshot: checkouts, the time spent waiting
+    for them, peak concurrent and overflow connections, timeouts and
+    invalidated connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self.timeouts = 0
+        self.invalidations = 0
+
+    def record_checkout(self, wait_seconds, checked_out, overflow):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidation(self, *args):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self):
+        """Returns the activity recorded so far and starts counting afresh."""
+        with self._lock:
+            snapshot = {
+                "checkouts": self.checkouts,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+            }
+            self._reset()
+            return snapshot
+
+
+class InstrumentedPoolMixin:
+    """Records each checkout in self.stats. The stats carry over when the pool
+    is recreated, as on engine.dispose()."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(
+            time.perf_counter() - started, self.checkedout(), max(self.overflow(), 0)
+        )
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine):
+    """Counts the connections of an engine built with an instrumented pool that
+    are invalidated, such as those failing pre-ping after a failover."""
+    stats = engine.pool.stats
+    event.listen(engine, "invalidate", stats.record_invalidation)
+    event.listen(engine, "soft_invalidate", stats.record_invalidation)
+
+
+def add_pool_metrics(metrics, prefix, pool):
+    """Adds the pool activity since the last call to metrics, named
+    {prefix}PoolCheckouts, {prefix}PoolWaitTime and so on. Idle pools add none."""
+    stats = pool.stats.snapshot()
+    if not (stats["checkouts"] or stats["timeouts"] or stats["invalidations"]):
+        return
+
+    for name, unit, value in (
+        ("Checkouts", MetricUnit.Count, stats["checkouts"]),
+        ("WaitTime", MetricUnit.Milliseconds, stats["wait_seconds"] * 1000),
+        ("MaxWaitTime", MetricUnit.Milliseconds, stats["max_wait_seconds"] * 1000),
+        ("PeakCheckedOut", MetricUnit.Count, stats["peak_checked_out"]),
+        ("PeakOverflow", MetricUnit.Count, stats["peak_overflow"]),
+        ("Timeouts", MetricUnit.Count, stats["timeouts"]),
+        ("Invalidations", MetricUnit.Count, stats["invalidations"]),
+    ):
+        metrics.add_metric(name=f"{prefix}Pool{name}", unit=unit, value=value)
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from logger import log
+
+# Whether the server is a replica, and whether it is Aurora, where the lag has
+# to come from aurora_replica_status() instead of the WAL replay functions
+SERVER_ROLE = text(
+    """
+    SELECT pg_is_in_recovery(),
+        to_regproc('aurora_replica_status') IS NOT NULL
+    """
+)
+
+# Seconds the replica is behind the primary. A replica that has replayed all
+# the WAL it received is up to date even if the primary has been idle since its
+# last transaction. NULL until the replica has replayed a transaction.
+REPLICATION_LAG = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+# Seconds this Aurora replica is behind the writer
+AURORA_REPLICATION_LAG = text(
+    """
+    SELECT replica_lag_in_msec / 1000.0
+    FROM aurora_replica_status()
+    WHERE server_id = aurora_db_instance_identifier()
+    """
+)
+
+
+class ReplicaMonitor:
+    """Tells whether reads can go to a replica: it must accept connections and
+    lag the primary by at most max_lag_seconds. The replica is checked at most
+    once per check_interval seconds and the answer is reused in between."""
+
+    def __init__(self, engine, max_lag_seconds=30, check_interval=10):
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.checked_at = None
+        self.usable = False
+        self._lock = threading.Lock()
+
+    def is_stale(self):
+        return (
+            self.checked_at is None
+            or time.monotonic() - self.checked_at >= self.check_interval
+        )
+
+    def check(self):
+        # Other threads keep using the last answer while one thread checks
+        if not self._lock.acquire(blocking=False):
+            return self.usable
+        try:
+            if self.is_stale():
+                self.usable = self._check()
+                self.checked_at = time.monotonic()
+            return self.usable
+        finally:
+            self._lock.release()
+
+    def _check(self):
+        try:
+            with self.engine.connect() as connection:
+                in_recovery, aurora = connection.execute(SERVER_ROLE).one()
+                if not in_recovery:
+                    # The primary itself, which cannot lag
+                    return True
+                lag = connection.execute(
+                    AURORA_REPLICATION_LAG if aurora else REPLICATION_LAG
+                ).scalar()
+        except SQLAlchemyError as err:
+            log.warning(f"Read replica unavailable: {err}")
+            return False
+
+        if lag is None:
+            log.warning("Read replica lag unknown")
+            return False
+        if lag > self.max_lag_seconds:
+            log.warning(f"Read replica lagging by {lag:.0f} seconds")
+            return False
+        return True
@@ -0,0 +1,100 @@
+import random
+import time
+
+from sqlalchemy import event
+
+from logger import log
+
+# Longest statement text written to a slow query log line
+MAX_STATEMENT_LENGTH = 4000
+
+
+def parameters_shape(parameters, many=False):
+    """Describes bound parameters by type only, since values can hold
+    subscriber email addresses and phone numbers."""
+    if many:
+        rows = list(parameters)
+        return {"rows": len(rows), "row": parameters_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def explain(cursor, statement, parameters, savepoint=True):
+    """Returns the EXPLAIN (ANALYZE, BUFFERS) plan of a SELECT statement. The
+    statement runs again, so this is only done for a sample of slow queries.
+
+    Inside a transaction it runs in a savepoint that is always rolled back, so
+    anything the statement writes is undone and a failure does not abort the
+    caller's transaction."""
+    if not savepoint:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+    cursor.execute("SAVEPOINT slow_query_explain")
+    try:
+        return explain(cursor, statement, parameters, savepoint=False)
+    finally:
+        cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+
+
+class SlowQueryLog:
+    """Logs statements that take longer than threshold_ms, with the EXPLAIN
+    plan of a explain_sample_rate fraction of the slow SELECT statements."""
+
+    def __init__(self, threshold_ms, explain_sample_rate=0.0):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, many):
+        duration_ms = (
+            time.perf_counter() - conn.info["slow_query_started"].pop()
+        ) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        entry = {
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+            "parameters": parameters_shape(parameters, many),
+            "duration_ms": round(duration_ms, 1),
+        }
+        if (
+            not many
+            and statement.lstrip().upper().startswith("SELECT")
+            and random.random() < self.explain_sample_rate
+        ):
+            try:
+                # A cursor of its own so the results of statement stay unread
+                dbapi_connection = conn.connection.dbapi_connection
+                explain_cursor = dbapi_connection.cursor()
+                try:
+                    entry["plan"] = explain(
+                        explain_cursor,
+                        statement,
+                        parameters,
+                        savepoint=not getattr(dbapi_connection, "autocommit", False),
+                    )
+                finally:
+                    explain_cursor.close()
+            except Exception as err:
+                log.warning(f"Could not explain slow query: {err}")
+        log.warning("Slow query", extra=entry)
+
+    def handle_error(self, exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("slow_query_started"):
+            connection.info["slow_query_started"].pop()
+
+
+def log_slow_queries(engine, threshold_ms, explain_sample_rate=0.0):
+    slow_query_log = SlowQueryLog(threshold_ms, explain_sample_rate)
+    event.listen(engine, "before_cursor_execute", slow_query_log.before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", slow_query_log.after_cursor_execute)
+    event.listen(engine, "handle_error", slow_query_log.handle_error)
+    return slow_query_log
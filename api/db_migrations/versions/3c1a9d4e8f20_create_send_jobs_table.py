@@ -0,0 +1,47 @@
+"""create send_jobs table
+
+Revision ID: 3c1a9d4e8f20
+Revises: 5fc8cb635a37
+Create Date: 2026-10-17 09:12:41.208311
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "3c1a9d4e8f20"
+down_revision = "5fc8cb635a37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "send_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("list_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("template_id", sa.String, nullable=False),
+        sa.Column("template_type", sa.String, nullable=False),
+        sa.Column("job_name", sa.String, nullable=False),
+        sa.Column("unique", sa.Boolean, nullable=False),
+        sa.Column("personalisation", postgresql.JSONB, nullable=False),
+        sa.Column("service_api_key", sa.String, nullable=True),
+        sa.Column("state", sa.String, nullable=False),
+        sa.Column("cursor", sa.String, nullable=True),
+        sa.Column("chunks_sent", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("sent_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("error", sa.String, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime, nullable=True),
+        sa.ForeignKeyConstraint(["list_id"], ["lists.id"], ondelete="CASCADE"),
+    )
+    op.create_index("ix_send_jobs_list_id", "send_jobs", ["list_id"])
+    op.create_index("ix_send_jobs_state", "send_jobs", ["state"])
+
+
+def downgrade():
+    op.drop_index("ix_send_jobs_state", table_name="send_jobs")
+    op.drop_index("ix_send_jobs_list_id", table_name="send_jobs")
+    op.drop_table("send_jobs")
@@ -0,0 +1,108 @@
+"""add subscriber counts to lists
+
+Revision ID: 8e4b6f0d2a71
+Revises: 3c1a9d4e8f20
+Create Date: 2026-10-17 11:02:17.734520
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8e4b6f0d2a71"
+down_revision = "3c1a9d4e8f20"
+branch_labels = None
+depends_on = None
+
+# Per-list confirmed/pending deltas of a set of subscription rows
+COUNT_DELTAS = """
+    SELECT list_id,
+        {sign}count(*) FILTER (WHERE confirmed IS TRUE) AS confirmed,
+        {sign}count(*) FILTER (WHERE confirmed IS NOT TRUE) AS pending
+    FROM {table}
+    GROUP BY list_id
+"""
+
+APPLY_DELTAS = """
+    UPDATE lists
+    SET confirmed_count = lists.confirmed_count + deltas.confirmed,
+        pending_count = lists.pending_count + deltas.pending
+    FROM (
+        SELECT list_id, sum(confirmed) AS confirmed, sum(pending) AS pending
+        FROM ({deltas}) AS changes
+        GROUP BY list_id
+    ) AS deltas
+    WHERE lists.id = deltas.list_id
+        AND (deltas.confirmed <> 0 OR deltas.pending <> 0);
+"""
+
+TRIGGERS = {
+    "INSERT": ("REFERENCING NEW TABLE AS new_rows", ["new_rows"]),
+    "UPDATE": (
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        ["new_rows", "old_rows"],
+    ),
+    "DELETE": ("REFERENCING OLD TABLE AS old_rows", ["old_rows"]),
+}
+
+
+def upgrade():
+    op.add_column(
+        "lists",
+        sa.Column("confirmed_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "lists",
+        sa.Column("pending_count", sa.Integer, nullable=False, server_default="0"),
+    )
+
+    # Statement level triggers keep the counts in the same transaction as the
+    # subscription change, with one lists update per statement for bulk writes
+    for operation, (referencing, tables) in TRIGGERS.items():
+        deltas = " UNION ALL ".join(
+            COUNT_DELTAS.format(sign="-" if table == "old_rows" else "", table=table)
+            for table in tables
+        )
+        op.execute(
+            f"""
+            CREATE FUNCTION subscriptions_count_{operation.lower()}() RETURNS trigger AS $$
+            BEGIN
+                {APPLY_DELTAS.format(deltas=deltas)}
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER subscriptions_count_{operation.lower()}
+            AFTER {operation} ON subscriptions
+            {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION subscriptions_count_{operation.lower()}();
+            """
+        )
+
+    op.execute(
+        """
+        UPDATE lists
+        SET confirmed_count = counts.confirmed, pending_count = counts.pending
+        FROM (
+            SELECT list_id,
+                count(*) FILTER (WHERE confirmed IS TRUE) AS confirmed,
+                count(*) FILTER (WHERE confirmed IS NOT TRUE) AS pending
+            FROM subscriptions
+            GROUP BY list_id
+        ) AS counts
+        WHERE lists.id = counts.list_id;
+        """
+    )
+
+
+def downgrade():
+    for operation in TRIGGERS:
+        op.execute(
+            f"DROP TRIGGER subscriptions_count_{operation.lower()} ON subscriptions"
+        )
+        op.execute(f"DROP FUNCTION subscriptions_count_{operation.lower()}()")
+
+    op.drop_column("lists", "pending_count")
+    op.drop_column("lists", "confirmed_count")
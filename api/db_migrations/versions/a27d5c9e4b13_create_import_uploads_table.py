@@ -0,0 +1,41 @@
+"""create import_uploads table
+
+Revision ID: a27d5c9e4b13
+Revises: 8e4b6f0d2a71
+Create Date: 2026-10-17 13:40:05.118926
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a27d5c9e4b13"
+down_revision = "8e4b6f0d2a71"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "import_uploads",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("list_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("type", sa.String, nullable=False),
+        sa.Column("state", sa.String, nullable=False),
+        sa.Column("lines_committed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("inserted", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("skipped", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("invalid", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("error", sa.String, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime, nullable=True),
+        sa.ForeignKeyConstraint(["list_id"], ["lists.id"], ondelete="CASCADE"),
+    )
+    op.create_index("ix_import_uploads_list_id", "import_uploads", ["list_id"])
+
+
+def downgrade():
+    op.drop_index("ix_import_uploads_list_id", table_name="import_uploads")
+    op.drop_table("import_uploads")
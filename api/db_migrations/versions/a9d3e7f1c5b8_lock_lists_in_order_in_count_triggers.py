@@ -0,0 +1,92 @@
+"""lock lists in order in count triggers
+
+Revision ID: a9d3e7f1c5b8
+Revises: e8a3d5b7c0f2
+Create Date: 2026-10-17 20:12:05.318427
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a9d3e7f1c5b8"
+down_revision = "e8a3d5b7c0f2"
+branch_labels = None
+depends_on = None
+
+# Per-list confirmed/pending deltas of a set of subscription rows
+COUNT_DELTAS = """
+    SELECT list_id,
+        {sign}count(*) FILTER (WHERE confirmed IS TRUE) AS confirmed,
+        {sign}count(*) FILTER (WHERE confirmed IS NOT TRUE) AS pending
+    FROM {table}
+    GROUP BY list_id
+"""
+
+# The UPDATE ... FROM below locks lists rows in whatever order the join
+# produces them, so two bulk writes touching the same lists could deadlock.
+# Locking them by id first makes every statement wait in the same order. NO KEY
+# UPDATE is the lock the UPDATE takes, and unlike FOR UPDATE it does not wait on
+# the KEY SHARE locks that inserts take on lists for the foreign key check.
+#
+# Every write to a list still holds its lists row until the transaction
+# commits, so concurrent writes to one large list are serialised on that row.
+LOCK_LISTS = """
+    PERFORM 1 FROM lists
+    WHERE id IN (
+        SELECT list_id
+        FROM ({deltas}) AS changes
+        GROUP BY list_id
+        HAVING sum(confirmed) <> 0 OR sum(pending) <> 0
+    )
+    ORDER BY id
+    FOR NO KEY UPDATE;
+"""
+
+APPLY_DELTAS = """
+    UPDATE lists
+    SET confirmed_count = lists.confirmed_count + deltas.confirmed,
+        pending_count = lists.pending_count + deltas.pending
+    FROM (
+        SELECT list_id, sum(confirmed) AS confirmed, sum(pending) AS pending
+        FROM ({deltas}) AS changes
+        GROUP BY list_id
+    ) AS deltas
+    WHERE lists.id = deltas.list_id
+        AND (deltas.confirmed <> 0 OR deltas.pending <> 0);
+"""
+
+TRIGGERS = {
+    "INSERT": ["new_rows"],
+    "UPDATE": ["new_rows", "old_rows"],
+    "DELETE": ["old_rows"],
+}
+
+
+def replace_functions(statements):
+    for operation, tables in TRIGGERS.items():
+        deltas = " UNION ALL ".join(
+            COUNT_DELTAS.format(sign="-" if table == "old_rows" else "", table=table)
+            for table in tables
+        )
+        body = "".join(statement.format(deltas=deltas) for statement in statements)
+        op.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION subscriptions_count_{operation.lower()}()
+            RETURNS trigger AS $$
+            BEGIN
+                {body}
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            """
+        )
+
+
+def upgrade():
+    replace_functions([LOCK_LISTS, APPLY_DELTAS])
+
+
+def downgrade():
+    replace_functions([APPLY_DELTAS])
@@ -0,0 +1,30 @@
+"""clear keys of completed send jobs
+
+Revision ID: b4f7c2e9d1a6
+Revises: f6b2d8e4a317
+Create Date: 2026-10-17 19:12:05.418327
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b4f7c2e9d1a6"
+down_revision = "f6b2d8e4a317"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        UPDATE send_jobs SET service_api_key = NULL
+        WHERE state = 'completed' AND service_api_key IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    # The cleared keys cannot be restored
+    pass
@@ -0,0 +1,125 @@
+"""add unique subscription indexes
+
+Revision ID: c5e2f8a1d6b4
+Revises: a27d5c9e4b13
+Create Date: 2026-10-17 15:21:48.660274
+
+"""
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c5e2f8a1d6b4"
+down_revision = "a27d5c9e4b13"
+branch_labels = None
+depends_on = None
+
+log = logging.getLogger("alembic.runtime.migration")
+
+# Removed duplicates are kept here for review, and the table is left in place
+# on downgrade. Drop it once the removals have been checked.
+CREATE_REMOVED_DUPLICATES = """
+    CREATE TABLE IF NOT EXISTS subscriptions_removed_duplicates
+    (LIKE subscriptions)
+"""
+
+# Keeps the confirmed, then oldest, subscription of each duplicate group and
+# moves the others to subscriptions_removed_duplicates
+REMOVE_DUPLICATES = """
+    WITH removed AS (
+        DELETE FROM subscriptions
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY list_id, {key}
+                ORDER BY confirmed IS TRUE DESC, created_at, id
+            ) AS position
+            FROM subscriptions
+            WHERE {column} IS NOT NULL
+        ) AS ranked
+        WHERE subscriptions.id = ranked.id AND ranked.position > 1
+        RETURNING subscriptions.*
+    )
+    INSERT INTO subscriptions_removed_duplicates SELECT * FROM removed
+"""
+
+
+# A subscription written between the dedupe and the end of a concurrent build
+# fails the build, so the dedupe and build are repeated this many times
+BUILD_ATTEMPTS = 3
+
+INDEXES = (
+    ("ix_subscriptions_list_id_email", ["list_id", "lower(email)"], "email"),
+    ("ix_subscriptions_list_id_phone", ["list_id", "phone"], "phone"),
+)
+
+
+def drop_invalid_index(name):
+    """Drops the index if a failed concurrent build left it behind invalid."""
+    invalid = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT NOT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": name},
+        )
+        .scalar()
+    )
+    if invalid:
+        op.drop_index(name, table_name="subscriptions", postgresql_concurrently=True)
+
+
+def remove_duplicates(key, column):
+    removed = (
+        op.get_bind()
+        .execute(sa.text(REMOVE_DUPLICATES.format(key=key, column=column)))
+        .rowcount
+    )
+    log.info(
+        f"Moved {removed} duplicate {column} subscriptions to "
+        "subscriptions_removed_duplicates"
+    )
+
+
+def upgrade():
+    op.execute(CREATE_REMOVED_DUPLICATES)
+
+    # Built without blocking writes to subscriptions, which CONCURRENTLY cannot
+    # do inside a transaction. Each statement commits on its own, so the dedupe
+    # runs right before the build it makes possible.
+    with op.get_context().autocommit_block():
+        for name, (list_id, key), column in INDEXES:
+            for attempt in range(1, BUILD_ATTEMPTS + 1):
+                drop_invalid_index(name)
+                remove_duplicates(key, column)
+                try:
+                    op.create_index(
+                        name,
+                        "subscriptions",
+                        [list_id, sa.text(key)],
+                        unique=True,
+                        postgresql_where=sa.text(f"{column} IS NOT NULL"),
+                        postgresql_concurrently=True,
+                        if_not_exists=True,
+                    )
+                    break
+                except sa.exc.IntegrityError:
+                    if attempt == BUILD_ATTEMPTS:
+                        raise
+                    log.info(f"Duplicate {column} written during the build of {name}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name="subscriptions",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
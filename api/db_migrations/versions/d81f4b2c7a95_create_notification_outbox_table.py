@@ -0,0 +1,59 @@
+"""create notification_outbox table
+
+Revision ID: d81f4b2c7a95
+Revises: c5e2f8a1d6b4
+Create Date: 2026-10-17 18:05:41.392017
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "d81f4b2c7a95"
+down_revision = "c5e2f8a1d6b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("list_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("type", sa.String, nullable=False),
+        sa.Column("recipient", sa.String, nullable=False),
+        sa.Column("template_id", sa.String, nullable=False),
+        sa.Column(
+            "personalisation",
+            postgresql.JSONB,
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column("service_api_key", sa.String, nullable=True),
+        sa.Column("state", sa.String, nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime, nullable=False),
+        sa.Column("error", sa.String, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("updated_at", sa.DateTime, nullable=True),
+        sa.ForeignKeyConstraint(["list_id"], ["lists.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_notification_outbox_list_id", "notification_outbox", ["list_id"]
+    )
+    op.create_index(
+        "ix_notification_outbox_state_next_attempt_at",
+        "notification_outbox",
+        ["state", "next_attempt_at"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_notification_outbox_state_next_attempt_at",
+        table_name="notification_outbox",
+    )
+    op.drop_index("ix_notification_outbox_list_id", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
@@ -0,0 +1,30 @@
+"""add list pagination indexes
+
+Revision ID: e3a9c6d1f482
+Revises: d81f4b2c7a95
+Create Date: 2026-10-17 18:02:11.318406
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e3a9c6d1f482"
+down_revision = "d81f4b2c7a95"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_lists_created_at_id", "lists", ["created_at", "id"])
+    op.create_index(
+        "ix_lists_service_id_created_at_id",
+        "lists",
+        ["service_id", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_lists_service_id_created_at_id", table_name="lists")
+    op.drop_index("ix_lists_created_at_id", table_name="lists")
@@ -0,0 +1,30 @@
+"""clear keys of finished outbox notifications
+
+Revision ID: e8a3d5b7c0f2
+Revises: b4f7c2e9d1a6
+Create Date: 2026-10-17 19:26:41.093518
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e8a3d5b7c0f2"
+down_revision = "b4f7c2e9d1a6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        UPDATE notification_outbox SET service_api_key = NULL
+        WHERE state IN ('sent', 'failed') AND service_api_key IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    # The cleared keys cannot be restored
+    pass
@@ -0,0 +1,61 @@
+"""add subscription export index
+
+Revision ID: f6b2d8e4a317
+Revises: e3a9c6d1f482
+Create Date: 2026-10-17 18:44:37.902115
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f6b2d8e4a317"
+down_revision = "e3a9c6d1f482"
+branch_labels = None
+depends_on = None
+
+
+INDEX = "ix_subscriptions_list_id_created_at_id"
+
+
+def drop_invalid_index(name):
+    """Drops the index if a failed concurrent build left it behind invalid."""
+    invalid = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT NOT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": name},
+        )
+        .scalar()
+    )
+    if invalid:
+        op.drop_index(name, table_name="subscriptions", postgresql_concurrently=True)
+
+
+def upgrade():
+    # Built without blocking writes to subscriptions, which CONCURRENTLY cannot
+    # do inside a transaction
+    with op.get_context().autocommit_block():
+        drop_invalid_index(INDEX)
+        op.create_index(
+            INDEX,
+            "subscriptions",
+            ["list_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX,
+            table_name="subscriptions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -6,25 +6,54 @@ from aws_lambda_powertools import Metrics
 
 app = api.app
 metrics = Metrics(namespace="ListManager", service="api")
+# Built once per container and reused by warm invocations
+asgi_handler = Mangum(app)
+
+
+def run_task(task, *args):
+    try:
+        task(*args)
+        return "Success"
+    except Exception as err:
+        log.error(err)
+        return "Error"
 
 
 @metrics.log_metrics(capture_cold_start_metric=True)
 def handler(event, context):
+    try:
+        return dispatch(event, context)
+    finally:
+        api.add_db_pool_metrics()
+
+
+def dispatch(event, context):
     if "httpMethod" in event:
         # Assume it is an API Gateway event
-        asgi_handler = Mangum(app)
         response = asgi_handler(event, context)
         return response
 
     elif event.get("task", "") == "migrate":
-        try:
-            migrate_head()
-            return "Success"
-        except Exception as err:
-            log.error(err)
-            return "Error"
+        return run_task(migrate_head)
+
+    elif event.get("task", "") == "send":
+        return run_task(
+            api.process_send_jobs,
+            event.get("job_id"),
+            context.get_remaining_time_in_millis,
+        )
+
+    elif event.get("task", "") == "reconcile_counts":
+        return run_task(api.reconcile_subscriber_counts)
+
+    elif event.get("task", "") == "drain_notifications":
+        return run_task(
+            api.drain_notification_outbox, context.get_remaining_time_in_millis
+        )
 
     elif event.get("task", "") == "heartbeat":
+        if event.get("warm_up"):
+            api.warm_up()
         return "Success"
 
     else:
@@ -0,0 +1,54 @@
+import datetime
+import uuid
+
+from sqlalchemy import DateTime, Column, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from models import Base
+from models.List import List
+
+
+class ImportUpload(Base):
+    __tablename__ = "import_uploads"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    list_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey(List.id, ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    type = Column(String, nullable=False)
+    state = Column(String, nullable=False, default="in_progress")
+    # Number of lines of the upload whose subscriptions have been committed
+    lines_committed = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    invalid = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(
+        DateTime,
+        index=False,
+        unique=False,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+    )
+    updated_at = Column(
+        DateTime,
+        index=False,
+        unique=False,
+        nullable=True,
+        onupdate=datetime.datetime.utcnow,
+    )
+
+    def to_dict(self):
+        return {
+            "upload_id": self.id,
+            "list_id": self.list_id,
+            "type": self.type,
+            "state": self.state,
+            "lines_committed": self.lines_committed,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "invalid": self.invalid,
+        }
@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Boolean, DateTime, Column, String
+from sqlalchemy import Boolean, DateTime, Column, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, validates
 
@@ -24,6 +24,9 @@ class List(Base):
     confirm_redirect_url = Column(String)
     unsubscribe_redirect_url = Column(String)
     service_id = Column(String, nullable=False, index=True)
+    # Maintained by triggers on the subscriptions table
+    confirmed_count = Column(Integer, nullable=False, default=0)
+    pending_count = Column(Integer, nullable=False, default=0)
     created_at = Column(
         DateTime,
         index=False,
@@ -41,6 +44,12 @@ class List(Base):
 
     subscriptions = relationship("Subscription", cascade="all,delete")
 
+    # Keyset pagination of /lists and /lists/{service_id}
+    __table_args__ = (
+        Index("ix_lists_created_at_id", created_at, id),
+        Index("ix_lists_service_id_created_at_id", service_id, created_at, id),
+    )
+
     @validates("name")
     def validate_name(self, _key, value):
         assert value != ""
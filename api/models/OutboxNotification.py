@@ -0,0 +1,50 @@
+import datetime
+import uuid
+
+from sqlalchemy import DateTime, Column, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from models import Base
+from models.List import List
+
+
+class OutboxNotification(Base):
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index(
+            "ix_notification_outbox_state_next_attempt_at", "state", "next_attempt_at"
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    list_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey(List.id, ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    # Either "email" or "sms"
+    type = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    template_id = Column(String, nullable=False)
+    personalisation = Column(JSONB, nullable=False, default=dict)
+    # Cleared once the notification is sent or has failed for good
+    service_api_key = Column(String, nullable=True)
+    state = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    error = Column(String, nullable=True)
+    created_at = Column(
+        DateTime,
+        index=False,
+        unique=False,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+    )
+    updated_at = Column(
+        DateTime,
+        index=False,
+        unique=False,
+        nullable=True,
+        onupdate=datetime.datetime.utcnow,
+    )
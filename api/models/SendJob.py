@@ -0,0 +1,62 @@
+import datetime
+import uuid
+
+from sqlalchemy import Boolean, DateTime, Column, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from models import Base
+from models.List import List
+
+
+class SendJob(Base):
+    __tablename__ = "send_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    list_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey(List.id, ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    template_id = Column(String, nullable=False)
+    template_type = Column(String, nullable=False)
+    job_name = Column(String, nullable=False)
+    unique = Column(Boolean, nullable=False, default=True)
+    personalisation = Column(JSONB, nullable=False, default=dict)
+    # Cleared once the job completes
+    service_api_key = Column(String, nullable=True)
+    state = Column(String, nullable=False, default="pending", index=True)
+    # Key of the last subscriber sent, used to resume the job from the next chunk
+    cursor = Column(String, nullable=True)
+    chunks_sent = Column(Integer, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(
+        DateTime,
+        index=False,
+        unique=False,
+        nullable=False,
+        default=datetime.datetime.utcnow,
+    )
+    updated_at = Column(
+        DateTime,
+        index=False,
+        unique=False,
+        nullable=True,
+        onupdate=datetime.datetime.utcnow,
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "list_id": self.list_id,
+            "template_id": self.template_id,
+            "template_type": self.template_type,
+            "job_name": self.job_name,
+            "state": self.state,
+            "chunks_sent": self.chunks_sent,
+            "sent_count": self.sent_count,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
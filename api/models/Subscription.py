@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Boolean, DateTime, Column, ForeignKey, String
+from sqlalchemy import Boolean, DateTime, Column, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -34,3 +34,23 @@ class Subscription(Base):
         UUID(as_uuid=True), ForeignKey(List.id), index=True, nullable=False
     )
     list = relationship("List", back_populates="subscriptions")
+
+    # An address can only be subscribed once to a list
+    __table_args__ = (
+        Index(
+            "ix_subscriptions_list_id_email",
+            list_id,
+            func.lower(email),
+            unique=True,
+            postgresql_where=email.isnot(None),
+        ),
+        Index(
+            "ix_subscriptions_list_id_phone",
+            list_id,
+            phone,
+            unique=True,
+            postgresql_where=phone.isnot(None),
+        ),
+        # Keyset pagination of subscriber exports
+        Index("ix_subscriptions_list_id_created_at_id", list_id, created_at, id),
+    )
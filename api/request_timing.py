@@ -0,0 +1,92 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+
+class RequestTimings:
+    """Time a request spends in the database and in Notify. Updated from the
+    request's event loop and from the worker threads it hands work to."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.notify_requests = 0
+        self.notify_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds += seconds
+
+    def add_notify_request(self, seconds):
+        with self._lock:
+            self.notify_requests += 1
+            self.notify_seconds += seconds
+
+    def elapsed_seconds(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Returns the value of a Server-Timing header, durations in ms."""
+        return ", ".join(
+            [
+                f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+                f"notify;dur={self.notify_seconds * 1000:.1f}"
+                f';desc="{self.notify_requests} requests"',
+                f"total;dur={self.elapsed_seconds() * 1000:.1f}",
+            ]
+        )
+
+
+current_timings = ContextVar("current_timings", default=None)
+
+
+@contextmanager
+def time_request():
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        current_timings.reset(token)
+
+
+@contextmanager
+def time_notify_request():
+    timings = current_timings.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.add_notify_request(time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    started = conn.info["query_started"].pop()
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add_query(time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # Statements that fail never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_queries(engine):
+    """Adds the statements run on engine to the timings of the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -4,13 +4,17 @@
 import json
 import os
 import main
+from api_gateway import api
 import pytest
 import uuid
 
 from aws_lambda_powertools.metrics import MetricUnit
+from datetime import datetime, timedelta
 from fastapi import HTTPException
-from unittest.mock import ANY, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
 from models.List import List
 from models.Subscription import Subscription
 
@@ -110,6 +114,179 @@ def test_return_lists_by_service(list_fixture, list_fixture_with_redirects, clie
     assert response.status_code == 200
 
 
+def test_return_lists_by_service_in_pages(session, client):
+    service_id = f"paged_{uuid.uuid4()}"
+    created_at = datetime.utcnow()
+    lists = [
+        List(
+            name=f"page_{i}",
+            language="en",
+            service_id=service_id,
+            created_at=created_at + timedelta(seconds=i),
+        )
+        for i in range(3)
+    ]
+    session.add_all(lists)
+    session.commit()
+
+    response = client.get(f"/lists/{service_id}", params={"limit": 2})
+    first_page = response.json()
+    assert response.status_code == 200
+    assert [item["name"] for item in first_page["lists"]] == ["page_0", "page_1"]
+    assert first_page["next_cursor"] is not None
+
+    response = client.get(
+        f"/lists/{service_id}",
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+    )
+    assert [item["name"] for item in response.json()["lists"]] == ["page_2"]
+    assert response.json()["next_cursor"] is None
+
+    for list in lists:
+        session.delete(list)
+    session.commit()
+
+
+def test_return_lists_with_invalid_cursor(client):
+    response = client.get("/lists", params={"limit": 1, "cursor": "not-a-cursor"})
+    assert response.json() == {"error": "invalid cursor"}
+    assert response.status_code == 400
+
+
+def test_return_lists_limit_is_bounded(client):
+    response = client.get("/lists", params={"limit": api.LISTS_PAGE_MAX_LIMIT + 1})
+    assert response.status_code == 422
+
+
+@pytest.fixture
+def export_list(session):
+    list = List(name=f"export_{uuid.uuid4()}", language="en", service_id="export")
+    created_at = datetime.utcnow()
+    session.add(list)
+    session.add_all(
+        [
+            Subscription(
+                email=f"export_{i}@example.com",
+                list=list,
+                confirmed=i != 1,
+                created_at=created_at + timedelta(seconds=i),
+            )
+            for i in range(3)
+        ]
+    )
+    session.commit()
+    yield list
+    session.delete(list)
+    session.commit()
+
+
+def test_list_subscribers_streams_ndjson(export_list, client):
+    response = client.get(
+        f"/list/{export_list.id}/subscribers",
+        headers={"Authorization": os.environ["API_AUTH_TOKEN"]},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["email"] for row in rows] == [
+        "export_0@example.com",
+        "export_1@example.com",
+        "export_2@example.com",
+    ]
+    assert rows[1]["confirmed"] is False
+
+
+def test_list_subscribers_streams_confirmed_csv(export_list, client):
+    response = client.get(
+        f"/list/{export_list.id}/subscribers",
+        params={"format": "csv", "confirmed": True},
+        headers={"Authorization": os.environ["API_AUTH_TOKEN"]},
+    )
+    lines = response.text.splitlines()
+    assert response.headers["content-type"].startswith("text/csv")
+    assert lines[0] == "id,email,phone,confirmed,created_at"
+    assert [line.split(",")[1] for line in lines[1:]] == [
+        "export_0@example.com",
+        "export_2@example.com",
+    ]
+
+
+def test_list_subscribers_in_pages(export_list, client):
+    headers = {"Authorization": os.environ["API_AUTH_TOKEN"]}
+    response = client.get(
+        f"/list/{export_list.id}/subscribers", params={"limit": 2}, headers=headers
+    )
+    page = response.json()
+    assert [row["email"] for row in page["subscribers"]] == [
+        "export_0@example.com",
+        "export_1@example.com",
+    ]
+
+    response = client.get(
+        f"/list/{export_list.id}/subscribers",
+        params={"limit": 2, "cursor": page["next_cursor"]},
+        headers=headers,
+    )
+    assert [row["email"] for row in response.json()["subscribers"]] == [
+        "export_2@example.com"
+    ]
+    assert response.json()["next_cursor"] is None
+
+
+def test_list_subscribers_list_not_found(client):
+    response = client.get(
+        f"/list/{uuid.uuid4()}/subscribers",
+        headers={"Authorization": os.environ["API_AUTH_TOKEN"]},
+    )
+    assert response.json() == {"error": "list not found"}
+    assert response.status_code == 404
+
+
+def test_row_serializer_skips_nulls_and_trailing_columns():
+    serialize = api.row_serializer([List.id, List.name, List.active])
+    rows = [("id", "name", None, "created_at")]
+    assert serialize(rows) == [{"id": "id", "name": "name"}]
+
+
+@pytest.fixture
+def reader_session():
+    engine = create_engine(os.environ["SQLALCHEMY_DATABASE_TEST_URI"])
+    return MagicMock(wraps=sessionmaker(bind=engine))
+
+
+def test_read_only_routes_use_the_reader(reader_session, list_fixture, client):
+    monitor = MagicMock(usable=True, **{"is_stale.return_value": False})
+    with patch("api_gateway.api.reader_monitor", monitor), patch(
+        "api_gateway.api.db_reader_session", reader_session
+    ):
+        response = client.get(f"/lists/{list_fixture.service_id}")
+    assert response.status_code == 200
+    reader_session.assert_called_once()
+
+
+@patch("api_gateway.api.metrics")
+def test_read_only_routes_fall_back_to_the_primary(
+    mock_metrics, reader_session, list_fixture, client
+):
+    monitor = MagicMock(usable=False, **{"is_stale.return_value": False})
+    with patch("api_gateway.api.reader_monitor", monitor), patch(
+        "api_gateway.api.db_reader_session", reader_session
+    ):
+        response = client.get(f"/lists/{list_fixture.service_id}")
+    assert response.status_code == 200
+    reader_session.assert_not_called()
+    mock_metrics.add_metric.assert_any_call(
+        name="DbReaderFallback", unit=MetricUnit.Count, value=1
+    )
+
+
+def test_responses_report_server_timing(list_fixture, client):
+    response = client.get("/lists")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="0 queries"' not in timing
+
+
 def test_create_list(client):
     response = client.post(
         "/list",
@@ -416,11 +593,9 @@ def test_edit_list_with_correct_id_unknown_error(mock_db_session, list_fixture,
 #     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
 
 
-@patch("main.Mangum")
-def test_metrics(mock_mangum, context_fixture, capsys, metrics):
-    mock_asgi_handler = MagicMock()
+@patch("main.asgi_handler")
+def test_metrics(mock_asgi_handler, context_fixture, capsys, metrics):
     mock_asgi_handler.return_value = True
-    mock_mangum.return_value = mock_asgi_handler
     main.handler({"httpMethod": "GET"}, context_fixture)
 
     logs = capsys.readouterr().out.strip().split("\n")
@@ -644,3 +819,117 @@ def test_return_list_subscriber_count(list_with_subscribers, client, session):
     } in data
 
     session.expire_all()
+
+
+@patch("api_gateway.api.get_async_notify_client")
+def test_subscriber_counts_follow_subscription_lifecycle(
+    mock_client, list_fixture, client, session
+):
+    mock_client.return_value = AsyncMock()
+    session.expire(list_fixture)
+    initial = (list_fixture.confirmed_count, list_fixture.pending_count)
+
+    def counts():
+        session.expire(list_fixture)
+        return (
+            list_fixture.confirmed_count - initial[0],
+            list_fixture.pending_count - initial[1],
+        )
+
+    response = client.post(
+        "/subscription",
+        json={"email": "counter@example.com", "list_id": str(list_fixture.id)},
+    )
+    subscription_id = response.json()["id"]
+    assert counts() == (0, 1)
+
+    client.get(f"/subscription/{subscription_id}/confirm")
+    assert counts() == (1, 0)
+
+    client.post(
+        f"/list/{list_fixture.id}/import",
+        headers={"Authorization": os.environ["API_AUTH_TOKEN"]},
+        json={"email": ["counter1@example.com", "counter2@example.com"]},
+    )
+    assert counts() == (3, 0)
+
+    client.delete(f"/subscription/{subscription_id}")
+    assert counts() == (2, 0)
+
+    session.query(Subscription).filter(
+        Subscription.email.in_(["counter1@example.com", "counter2@example.com"])
+    ).delete()
+    session.commit()
+    assert counts() == (0, 0)
+
+
+def test_subscriber_counts_after_reset(list_with_subscribers, client, session):
+    list1, list2 = list_with_subscribers
+    assert (list2.confirmed_count, list2.pending_count) == (1, 1)
+
+    client.put(
+        f"/list/{list2.id}/reset",
+        headers={"Authorization": os.environ["API_AUTH_TOKEN"]},
+    )
+    session.expire_all()
+    assert (list2.confirmed_count, list2.pending_count) == (0, 0)
+    assert (list1.confirmed_count, list1.pending_count) == (2, 0)
+
+
+def test_reconcile_subscriber_counts(list_with_subscribers, session):
+    list1, list2 = list_with_subscribers
+    session.query(List).filter(List.id == list1.id).update(
+        {"confirmed_count": 42, "pending_count": 7}
+    )
+    session.commit()
+
+    assert api.reconcile_subscriber_counts() == 1
+
+    session.expire_all()
+    assert (list1.confirmed_count, list1.pending_count) == (2, 0)
+    assert (list2.confirmed_count, list2.pending_count) == (1, 1)
+    assert api.reconcile_subscriber_counts() == 0
+
+
+@patch("api_gateway.api.NotificationsAPIClient")
+def test_get_notify_client_reuses_client_per_api_key(mock_client):
+    api.notify_clients.clear()
+    mock_client.side_effect = lambda *args, **kwargs: MagicMock()
+
+    first = api.get_notify_client("key-a")
+    assert api.get_notify_client("key-a") is first
+    assert api.get_notify_client("key-b") is not first
+    assert mock_client.call_count == 2
+    api.notify_clients.clear()
+
+
+@patch("api_gateway.api.get_notify_http_client")
+@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.db_engine")
+def test_warm_up(mock_engine, mock_get_notify_client, mock_get_notify_http_client):
+    mock_get_notify_http_client.return_value = AsyncMock()
+    api.warm_up()
+    mock_engine.connect.return_value.__enter__.return_value.execute.assert_called_once()
+    mock_get_notify_client.return_value.request_session.head.assert_called_once_with(
+        api.NOTIFY_BASE_URL, timeout=5
+    )
+    mock_get_notify_http_client.return_value.head.assert_awaited_once_with(
+        api.NOTIFY_BASE_URL, timeout=5
+    )
+
+
+@patch("api_gateway.api.log")
+@patch("api_gateway.api.get_notify_http_client")
+@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.db_engine")
+def test_warm_up_logs_errors(
+    mock_engine, mock_get_notify_client, mock_get_notify_http_client, mock_log
+):
+    mock_engine.connect.side_effect = SQLAlchemyError("db down")
+    mock_get_notify_client.return_value.request_session.head.side_effect = Exception(
+        "notify down"
+    )
+    mock_get_notify_http_client.return_value = AsyncMock()
+    mock_get_notify_http_client.return_value.head.side_effect = Exception("notify down")
+    api.warm_up()
+    assert mock_log.error.call_count == 3
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import pytest
+import uuid
+
+from unittest.mock import AsyncMock, patch
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from api_gateway import api
+from models.List import List
+from models.Subscription import Subscription
+
+
+@pytest.fixture
+def async_db_session():
+    # Each test client request may run on its own event loop, so connections
+    # are not pooled across requests
+    engine = create_async_engine(
+        make_url(os.environ["SQLALCHEMY_DATABASE_TEST_URI"]).set(
+            drivername="postgresql+asyncpg"
+        ),
+        poolclass=NullPool,
+    )
+    async_db_session = async_sessionmaker(bind=engine, expire_on_commit=False)
+    with patch("api_gateway.api.async_db_session", async_db_session):
+        yield async_db_session
+
+
+def test_lists_with_async_session(async_db_session, list_fixture, client):
+    response = client.get("/lists")
+    assert response.status_code == 200
+    assert str(list_fixture.id) in [list["id"] for list in response.json()]
+
+
+def test_create_list_with_async_session(async_db_session, client):
+    response = client.post(
+        "/list",
+        json={
+            "name": f"async_list_{uuid.uuid4()}",
+            "language": "en",
+            "service_id": "async_service_id",
+            "subscribe_email_template_id": str(uuid.uuid4()),
+        },
+        headers={"Authorization": os.environ["API_AUTH_TOKEN"]},
+    )
+    assert response.status_code == 200
+    assert "id" in response.json()
+
+
+@patch("api_gateway.api.get_async_notify_client")
+def test_subscription_lifecycle_with_async_session(
+    mock_client, async_db_session, list_fixture, client
+):
+    mock_client.return_value = AsyncMock()
+    email = f"async_{uuid.uuid4()}@example.com"
+    response = client.post(
+        "/subscription", json={"email": email, "list_id": str(list_fixture.id)}
+    )
+    assert response.status_code == 200
+    subscription_id = response.json()["id"]
+    mock_client().send_email_notification.assert_called_once()
+
+    response = client.get(f"/subscription/{subscription_id}/confirm")
+    assert response.json() == {"status": "OK"}
+
+    response = client.delete(f"/subscription/{subscription_id}")
+    assert response.json() == {"status": "OK"}
+    assert mock_client().send_email_notification.call_count == 2
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_send_streamed_with_async_session(
+    mock_client, async_db_session, session, client
+):
+    list = List(name=f"async_send_{uuid.uuid4()}", language="en", service_id="async")
+    session.add(list)
+    session.add_all(
+        [
+            Subscription(email="async_0@example.com", list=list, confirmed=True),
+            Subscription(email="async_1@example.com", list=list, confirmed=True),
+        ]
+    )
+    session.commit()
+
+    response = client.post(
+        "/send",
+        json={
+            "service_api_key": str(uuid.uuid4()),
+            "list_id": str(list.id),
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "stream": True,
+        },
+        headers={"Authorization": os.environ["API_AUTH_TOKEN"]},
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["sent"] == 2
+    mock_client().send_bulk_notifications.assert_called_once()
+
+
+def test_list_subscribers_with_async_session(async_db_session, session, client):
+    list = List(name=f"async_export_{uuid.uuid4()}", language="en", service_id="async")
+    session.add(list)
+    session.add(Subscription(email="async_export@example.com", list=list))
+    session.commit()
+
+    response = client.get(
+        f"/list/{list.id}/subscribers",
+        params={"format": "csv"},
+        headers={"Authorization": os.environ["API_AUTH_TOKEN"]},
+    )
+    assert response.status_code == 200
+    assert "async_export@example.com" in response.text.splitlines()[1]
+
+
+def test_run_db_passes_sync_session_to_fn():
+    session = object()
+    result = asyncio.run(api.run_db(session, lambda s, value: (s, value), 1))
+    assert result == (session, 1)
@@ -3,8 +3,10 @@
 
 import uuid
 from sqlalchemy.exc import SQLAlchemyError
+from models.ImportUpload import ImportUpload
+from models.List import List
 from models.Subscription import Subscription
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 ##
 # Old Endpoint Tests
@@ -24,7 +26,7 @@ def test_email_list_import(session, list_to_be_updated_fixture, client):
         json={"list_id": str(list_to_be_updated_fixture.id), "emails": email_list},
     )
     assert response.status_code == 200
-    assert response.json() == {"status": "OK"}
+    assert response.json() == {"status": "OK", "inserted": 10, "skipped": 0}
 
     data = session.query(Subscription).filter(
         Subscription.list_id == list_to_be_updated_fixture.id,
@@ -134,7 +136,8 @@ def test_email_list_import_new(session, list_to_be_updated_fixture, client):
         json={"email": email_list},
     )
     assert response.status_code == 200
-    assert response.json() == {"status": "OK"}
+    assert response.json()["status"] == "OK"
+    assert response.json()["inserted"] + response.json()["skipped"] == 10
 
     data = session.query(Subscription).filter(
         Subscription.list_id == list_to_be_updated_fixture.id,
@@ -153,7 +156,8 @@ def test_email_list_import_new_no_duplicates(
         json={"email": email_list},
     )
     assert response.status_code == 200
-    assert response.json() == {"status": "OK"}
+    assert response.json()["status"] == "OK"
+    assert response.json()["inserted"] + response.json()["skipped"] == 10
 
     # Do it again with the same list
     response = client.post(
@@ -161,7 +165,7 @@ def test_email_list_import_new_no_duplicates(
         json={"email": email_list},
     )
     assert response.status_code == 200
-    assert response.json() == {"status": "OK"}
+    assert response.json() == {"status": "OK", "inserted": 0, "skipped": 10}
 
     # Since we submitted the same list twice, should still be the same result (no dupes)
     data = session.query(Subscription).filter(
@@ -178,7 +182,7 @@ def test_email_list_import_new_no_duplicates(
         json={"email": email_list},
     )
     assert response.status_code == 200
-    assert response.json() == {"status": "OK"}
+    assert response.json() == {"status": "OK", "inserted": 5, "skipped": 10}
 
     # There were five new emails in the list
     data = session.query(Subscription).filter(
@@ -197,7 +201,7 @@ def test_phone_list_import(session, list_to_be_updated_fixture, client):
         json={"phone": phone_list},
     )
     assert response.status_code == 200
-    assert response.json() == {"status": "OK"}
+    assert response.json() == {"status": "OK", "inserted": 10, "skipped": 0}
 
     data = session.query(Subscription).filter(
         Subscription.list_id == list_to_be_updated_fixture.id,
@@ -297,3 +301,192 @@ def test_import_validation_at_least_one(list_to_be_updated_fixture, client):
     assert response.json() == {
         "error": "Payload must include one of: phone<list>, email<list>"
     }
+
+
+def test_import_deduplicates_payload_and_existing(
+    session, list_fixture_required_data_only, client
+):
+    list_id = list_fixture_required_data_only.id
+    response = client.post(
+        f"/list/{list_id}/import",
+        json={"email": ["dupe@example.com", "dupe@example.com", "other@example.com"]},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"status": "OK", "inserted": 2, "skipped": 1}
+
+    response = client.post(
+        f"/list/{list_id}/import",
+        json={"email": ["other@example.com", "new@example.com"]},
+    )
+    assert response.json() == {"status": "OK", "inserted": 1, "skipped": 1}
+
+    data = session.query(Subscription).filter(Subscription.list_id == list_id)
+    assert sorted(subscription.email for subscription in data) == [
+        "dupe@example.com",
+        "new@example.com",
+        "other@example.com",
+    ]
+    assert all(subscription.confirmed for subscription in data)
+    assert all(subscription.created_at is not None for subscription in data)
+
+
+##
+# Upload Endpoint Tests
+##
+
+
+@patch("api_gateway.api.IMPORT_BATCH_SIZE", 2)
+def test_upload_import_in_batches(session, list_fixture_required_data_only, client):
+    list_id = list_fixture_required_data_only.id
+    upload = "\r\n".join(
+        [
+            "email address,name",
+            "one@example.com,One",
+            "NotAnEmail",
+            "",
+            "two@example.com",
+            '"three@example.com",Three',
+            "one@example.com",
+        ]
+    )
+    response = client.post(
+        f"/list/{list_id}/import/upload?type=email",
+        content=upload.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data == {
+        "upload_id": ANY,
+        "list_id": str(list_id),
+        "type": "email",
+        "state": "completed",
+        "lines_committed": 7,
+        "inserted": 3,
+        "skipped": 1,
+        "invalid": 1,
+    }
+
+    subscriptions = session.query(Subscription).filter(
+        Subscription.list_id == list_id, Subscription.confirmed.is_(True)
+    )
+    assert sorted(subscription.email for subscription in subscriptions) == [
+        "one@example.com",
+        "three@example.com",
+        "two@example.com",
+    ]
+
+    response = client.get(f"/list/{list_id}/import/upload/{data['upload_id']}")
+    assert response.json() == data
+
+
+def test_upload_import_counts_undecodable_lines_invalid(session, client):
+    list = List(name="upload_latin1", language="en", service_id="upload_latin1")
+    session.add(list)
+    session.commit()
+
+    # A Latin-1 CSV, as saved by Excel, with an accented address
+    upload = "email\r\nrené@example.com\r\nplain@example.com\r\n".encode("latin-1")
+    response = client.post(
+        f"/list/{list.id}/import/upload?type=email",
+        content=upload,
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["state"] == "completed"
+    assert data["inserted"] == 1
+    assert data["invalid"] == 1
+
+    emails = session.query(Subscription.email).filter(Subscription.list_id == list.id)
+    assert [email for email, in emails] == ["plain@example.com"]
+
+
+@patch("api_gateway.api.IMPORT_MAX_LINE_LENGTH", 32)
+def test_upload_import_counts_long_lines_invalid(session, client):
+    list = List(name="upload_long_line", language="en", service_id="upload_long")
+    session.add(list)
+    session.commit()
+
+    # A valid address over the limit, which arrives over several chunks
+    upload = [b"email\nfirst@example.com\nlong.address", b".for.testing"]
+    upload += [b"@example.com\nlast@example.com"]
+    response = client.post(
+        f"/list/{list.id}/import/upload?type=email",
+        content=iter(upload),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["inserted"] == 2
+    assert data["invalid"] == 1
+
+    emails = session.query(Subscription.email).filter(Subscription.list_id == list.id)
+    assert sorted(email for email, in emails) == [
+        "first@example.com",
+        "last@example.com",
+    ]
+
+
+def test_upload_import_resumes_after_committed_lines(
+    session, list_fixture_required_data_only, client
+):
+    list_id = list_fixture_required_data_only.id
+    upload = ImportUpload(list_id=list_id, type="phone", lines_committed=2)
+    session.add(upload)
+    session.commit()
+
+    response = client.post(
+        f"/list/{list_id}/import/upload?type=phone&upload_id={upload.id}",
+        content=b"613-555-0001\n613-555-0002\n613-555-0003\n",
+    )
+    assert response.status_code == 200
+    assert response.json()["state"] == "completed"
+    assert response.json()["lines_committed"] == 3
+    assert response.json()["inserted"] == 1
+
+    phones = session.query(Subscription.phone).filter(Subscription.list_id == list_id)
+    assert [phone for phone, in phones] == ["613-555-0003"]
+
+
+def test_upload_import_list_not_found(client):
+    response = client.post(
+        f"/list/{uuid.uuid4()}/import/upload?type=email", content=b"one@example.com"
+    )
+    assert response.status_code == 404
+    assert response.json() == {"error": "list or upload not found"}
+
+
+def test_upload_import_wrong_upload_type(
+    session, list_fixture_required_data_only, client
+):
+    list_id = list_fixture_required_data_only.id
+    upload = ImportUpload(list_id=list_id, type="phone")
+    session.add(upload)
+    session.commit()
+
+    response = client.post(
+        f"/list/{list_id}/import/upload?type=email&upload_id={upload.id}",
+        content=b"one@example.com",
+    )
+    assert response.status_code == 404
+
+
+@patch("api_gateway.api.bulk_import_subscriptions")
+def test_upload_import_failure_can_be_resumed(
+    mock_bulk_import, session, list_fixture_required_data_only, client
+):
+    mock_bulk_import.side_effect = SQLAlchemyError("database went away")
+    list_id = list_fixture_required_data_only.id
+
+    response = client.post(
+        f"/list/{list_id}/import/upload?type=email", content=b"one@example.com"
+    )
+    assert response.status_code == 500
+    data = response.json()
+    assert data["error"] == "error importing upload"
+    assert data["state"] == "failed"
+    assert data["lines_committed"] == 0
+
+    upload = session.get(ImportUpload, uuid.UUID(data["upload_id"]))
+    assert upload.error == "database went away"
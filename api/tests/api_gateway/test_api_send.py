@@ -1,8 +1,21 @@
 import json
+import os
+import pytest
 import uuid
 
 from unittest.mock import patch
+from notifications_python_client.errors import HTTPError as NotifyHTTPError
 from requests import HTTPError
+from datetime import datetime, timedelta
+from clients.notify import DeadlineExceededError
+from api_gateway.api import (
+    claim_send_job,
+    process_send_job,
+    process_send_jobs,
+    start_send_job,
+)
+from models.List import List
+from models.SendJob import SendJob
 from models.Subscription import Subscription
 from sqlalchemy import text
 
@@ -138,6 +151,27 @@ def test_send_notify_error(mock_client, mock_db_session, client):
     assert response.status_code == 502
 
 
+@patch("api_gateway.api.metrics")
+@patch("api_gateway.api.get_notify_client")
+def test_send_streamed_notify_error(mock_client, mock_metrics, client):
+    mock_client.side_effect = HTTPError()
+    response = client.post(
+        "/send",
+        json={
+            "service_api_key": str(uuid.uuid4()),
+            "list_id": str(uuid.uuid4()),
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "stream": True,
+        },
+    )
+    assert response.json() == {"error": "error sending bulk notifications"}
+    assert response.status_code == 502
+    assert "subscription_count" not in [
+        call.kwargs["key"] for call in mock_metrics.add_metadata.call_args_list
+    ]
+
+
 @patch("api_gateway.api.get_notify_client")
 def test_send_duplicate_emails(mock_client, list_fixture_with_duplicates, client):
     template_id = str(uuid.uuid4())
@@ -170,8 +204,9 @@ def test_send_duplicate_emails(mock_client, list_fixture_with_duplicates, client
     )
     data = response.json()
 
+    # Duplicate addresses can't be stored, so unique makes no difference
     assert data["status"] == "OK"
-    assert data["sent"] == 4
+    assert data["sent"] == 2
 
 
 @patch("api_gateway.api.get_notify_client")
@@ -206,4 +241,377 @@ def test_send_duplicate_phones(mock_client, list_fixture_with_duplicates, client
     )
     data = response.json()
     assert data["status"] == "OK"
-    assert data["sent"] == 3
+    assert data["sent"] == 2
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_send_email_streamed(mock_client, list_fixture_with_duplicates, client):
+    response = client.post(
+        "/send",
+        json={
+            "service_api_key": str(uuid.uuid4()),
+            "list_id": str(list_fixture_with_duplicates.id),
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "job_name": "Job Name",
+            "stream": True,
+        },
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["status"] == "OK"
+    assert data["sent"] == 2
+    mock_client().send_bulk_notifications.assert_called_once()
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_send_streamed_invalid_list(mock_client, client):
+    response = client.post(
+        "/send",
+        json={
+            "service_api_key": str(uuid.uuid4()),
+            "list_id": str(uuid.uuid4()),
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "stream": True,
+        },
+    )
+    assert response.json() == {"error": "list with confirmed subscribers not found"}
+    assert response.status_code == 404
+    mock_client().send_bulk_notifications.assert_not_called()
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_send_partial_failure_reports_chunks(
+    mock_client, list_fixture_with_duplicates, client
+):
+    mock_client().send_bulk_notifications.side_effect = NotifyHTTPError(
+        message="Notify is down"
+    )
+    response = client.post(
+        "/send",
+        json={
+            "service_api_key": str(uuid.uuid4()),
+            "list_id": str(list_fixture_with_duplicates.id),
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "job_name": "Job Name",
+        },
+    )
+    data = response.json()
+
+    assert response.status_code == 502
+    assert data["error"] == "error sending bulk notifications"
+    assert data["sent"] == 0
+    assert data["chunks"] == [
+        {
+            "chunk": 0,
+            "recipients": 2,
+            "status": "ERROR",
+            "error": "503 - Notify is down",
+        }
+    ]
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_send_unexpected_error_is_not_a_failed_chunk(
+    mock_client, list_fixture_with_duplicates, client
+):
+    mock_client().send_bulk_notifications.side_effect = TypeError("bug")
+    response = client.post(
+        "/send",
+        json={
+            "service_api_key": str(uuid.uuid4()),
+            "list_id": str(list_fixture_with_duplicates.id),
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "job_name": "Job Name",
+        },
+    )
+    assert response.status_code == 500
+    assert response.json() == {"error": "error sending bulk notifications"}
+
+
+@patch("api_gateway.api.start_send_job")
+def test_send_background_creates_job(
+    mock_start_send_job, list_fixture_with_duplicates, client, session
+):
+    response = client.post(
+        "/send",
+        json={
+            "service_api_key": str(uuid.uuid4()),
+            "list_id": str(list_fixture_with_duplicates.id),
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "job_name": "Job Name",
+            "background": True,
+        },
+    )
+    data = response.json()
+
+    assert response.status_code == 202
+    assert data["status"] == "Accepted"
+    mock_start_send_job.assert_called_once_with(uuid.UUID(data["job_id"]))
+
+    response = client.get(f"/send/{data['job_id']}")
+    assert response.status_code == 200
+    assert response.json()["state"] == "pending"
+    assert response.json()["sent_count"] == 0
+    assert "service_api_key" not in response.json()
+
+
+@patch("api_gateway.api.start_send_job")
+def test_send_background_invalid_list(mock_start_send_job, client):
+    response = client.post(
+        "/send",
+        json={
+            "list_id": str(uuid.uuid4()),
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "background": True,
+        },
+    )
+    assert response.json() == {"error": "list not found"}
+    assert response.status_code == 404
+    mock_start_send_job.assert_not_called()
+
+
+def test_send_job_status_not_found(client):
+    response = client.get(f"/send/{uuid.uuid4()}")
+    assert response.json() == {"error": "send job not found"}
+    assert response.status_code == 404
+
+
+@patch("api_gateway.api.start_send_job")
+def test_retry_failed_send_job(
+    mock_start_send_job, list_fixture_with_duplicates, session, client
+):
+    job = send_job(
+        session,
+        list_id=list_fixture_with_duplicates.id,
+        state="failed",
+        error="Notify is down",
+        cursor="fixture_email",
+        chunks_sent=1,
+    )
+
+    response = client.post(f"/send/{job.id}/retry")
+    assert response.status_code == 202
+    assert response.json()["state"] == "pending"
+    assert response.json()["error"] is None
+    assert response.json()["chunks_sent"] == 1
+    mock_start_send_job.assert_called_once_with(job.id)
+
+    response = client.post(f"/send/{job.id}/retry")
+    assert response.status_code == 409
+    assert response.json() == {"error": "only failed send jobs can be retried"}
+
+
+def test_retry_send_job_not_found(client):
+    response = client.post(f"/send/{uuid.uuid4()}/retry")
+    assert response.status_code == 404
+    assert response.json() == {"error": "send job not found"}
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_process_send_job_resumes_after_failed_chunk(
+    mock_client, list_fixture_with_duplicates, session
+):
+    mock_client().send_bulk_notifications.side_effect = [
+        {"data": "ok"},
+        NotifyHTTPError(message="Notify is down"),
+        {"data": "ok"},
+    ]
+    job = SendJob(
+        list_id=list_fixture_with_duplicates.id,
+        template_id=str(uuid.uuid4()),
+        template_type="email",
+        job_name="Job Name",
+        service_api_key="service-api-key",
+    )
+    session.add(job)
+    session.commit()
+
+    process_send_job(session, job, recipient_limit=1)
+    assert job.state == "failed"
+    assert job.service_api_key == "service-api-key"
+    assert job.error == "503 - Notify is down"
+    assert job.chunks_sent == 1
+    assert job.sent_count == 1
+
+    process_send_job(session, job, recipient_limit=1)
+    assert job.state == "completed"
+    assert job.service_api_key is None
+    assert job.error is None
+    assert job.chunks_sent == 2
+    assert job.sent_count == 2
+
+    sent_to = [
+        call.args[1][1][0]
+        for call in mock_client().send_bulk_notifications.call_args_list
+    ]
+    assert sent_to == ["fixture_email", "fixture_email_unique", "fixture_email_unique"]
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_process_send_job_skips_blank_addresses(mock_client, session):
+    list = List(name="blank_phones", language="en", service_id="blank_phones")
+    session.add(list)
+    session.commit()
+    session.add_all(
+        [
+            Subscription(list_id=list.id, phone="", confirmed=True),
+            Subscription(list_id=list.id, phone="+15555550123", confirmed=True),
+        ]
+    )
+    session.commit()
+    job = send_job(session, list_id=list.id, template_type="phone", unique=False)
+
+    process_send_job(session, job, recipient_limit=1)
+    assert job.state == "completed"
+    assert job.sent_count == 1
+    mock_client().send_bulk_notifications.assert_called_once()
+
+
+@patch("api_gateway.api.build_bulk_chunks")
+@patch("api_gateway.api.get_notify_client")
+def test_process_send_job_moves_past_unsendable_batches(
+    mock_client, mock_build_bulk_chunks, list_fixture_with_duplicates, session
+):
+    mock_build_bulk_chunks.side_effect = lambda *args: iter([])
+    job = send_job(session, list_id=list_fixture_with_duplicates.id)
+
+    process_send_job(session, job)
+    assert job.state == "completed"
+    assert job.cursor is not None
+    assert job.sent_count == 0
+    mock_client().send_bulk_notifications.assert_not_called()
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_process_send_job_fails_on_unexpected_error(
+    mock_client, list_fixture_with_duplicates, session
+):
+    mock_client().send_bulk_notifications.side_effect = TypeError("bug")
+    job = send_job(session, list_id=list_fixture_with_duplicates.id)
+
+    with pytest.raises(TypeError):
+        process_send_job(session, job)
+    assert job.state == "failed"
+    assert job.error == "bug"
+
+
+@patch("api_gateway.api.start_send_job")
+@patch("api_gateway.api.get_notify_client")
+def test_process_send_job_hands_over_when_out_of_time(
+    mock_client, mock_start_send_job, list_fixture_with_duplicates, session
+):
+    job = SendJob(
+        list_id=list_fixture_with_duplicates.id,
+        template_id=str(uuid.uuid4()),
+        template_type="phone",
+        job_name="Job Name",
+        unique=False,
+    )
+    session.add(job)
+    session.commit()
+
+    process_send_job(session, job, get_remaining_time_in_millis=lambda: 1000)
+    assert job.state == "handed_off"
+    mock_start_send_job.assert_called_once_with(job.id)
+    mock_client().send_bulk_notifications.assert_not_called()
+
+
+def send_job(session, **kwargs):
+    job = SendJob(
+        **{
+            "template_id": str(uuid.uuid4()),
+            "template_type": "email",
+            "job_name": "Job Name",
+            **kwargs,
+        }
+    )
+    session.add(job)
+    session.commit()
+    return job
+
+
+def test_claim_send_job_only_once(list_fixture_with_duplicates, session):
+    job = send_job(session, list_id=list_fixture_with_duplicates.id)
+    claimable = SendJob.state == "pending"
+
+    claimed = claim_send_job(session, job.id, claimable)
+    assert claimed.id == job.id
+    assert claimed.state == "running"
+    assert claim_send_job(session, job.id, claimable) is None
+
+
+@patch("api_gateway.api.process_send_job")
+def test_process_send_jobs_skips_running_job(
+    mock_process_send_job, list_fixture_with_duplicates, session
+):
+    job = send_job(session, list_id=list_fixture_with_duplicates.id, state="running")
+
+    assert process_send_jobs(job.id) == 0
+    mock_process_send_job.assert_not_called()
+
+
+@patch("api_gateway.api.process_send_job")
+def test_process_send_jobs_sweeps_stalled_hand_off_only(
+    mock_process_send_job, list_fixture_with_duplicates, session
+):
+    job = send_job(session, list_id=list_fixture_with_duplicates.id, state="handed_off")
+    job.updated_at = datetime.utcnow()
+    session.commit()
+    # Other tests may leave claimable jobs behind, so read ids while attached
+    swept = []
+    mock_process_send_job.side_effect = lambda session, job, *args: swept.append(job.id)
+
+    process_send_jobs()
+    assert job.id not in swept
+
+    job.updated_at = datetime.utcnow() - timedelta(hours=1)
+    session.commit()
+    swept.clear()
+
+    process_send_jobs()
+    assert job.id in swept
+    session.refresh(job)
+    assert job.state == "running"
+
+
+@patch("api_gateway.api.start_send_job")
+@patch("api_gateway.api.get_notify_client")
+def test_process_send_job_hands_over_before_deadline(
+    mock_client, mock_start_send_job, list_fixture_with_duplicates, session
+):
+    mock_client().send_bulk_notifications.side_effect = DeadlineExceededError()
+    job = send_job(session, list_id=list_fixture_with_duplicates.id)
+
+    process_send_job(session, job, get_remaining_time_in_millis=lambda: 50000)
+    assert job.state == "handed_off"
+    assert job.chunks_sent == 0
+    assert job.cursor is None
+    mock_start_send_job.assert_called_once_with(job.id)
+
+
+@patch("boto3wrapper.wrapper.get_session")
+def test_start_send_job_invokes_lambda(mock_get_session):
+    job_id = uuid.uuid4()
+    with patch.dict(os.environ, {"AWS_LAMBDA_FUNCTION_NAME": "api"}):
+        start_send_job(job_id)
+
+    mock_get_session().client("lambda").invoke.assert_called_once_with(
+        FunctionName="api",
+        InvocationType="Event",
+        Payload=json.dumps({"task": "send", "job_id": str(job_id)}),
+    )
+
+
+@patch("boto3wrapper.wrapper.get_session")
+def test_start_send_job_outside_lambda(mock_get_session):
+    with patch.dict(os.environ, clear=True):
+        start_send_job(uuid.uuid4())
+
+    mock_get_session.assert_not_called()
@@ -2,27 +2,36 @@
 # pylint: disable=missing-function-docstring
 
 
+import pytest
 import uuid
-from unittest.mock import ANY, MagicMock, patch
-from sqlalchemy.exc import SQLAlchemyError
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from requests import HTTPError
+from notifications_python_client.errors import HTTPError as NotifyHTTPError
+from api_gateway import api
+from clients.notify import CircuitOpenError
+from models.Subscription import Subscription
 
 
-@patch("api_gateway.api.get_notify_client")
+def async_notify_client():
+    return MagicMock(return_value=AsyncMock())
+
+
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_subscription_event_with_bad_list_id(mock_client, client):
     response = client.post("/subscription", json={"list_id": ""})
     assert response.json() == {"error": "list not found"}
     assert response.status_code == 404
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_subscription_event_with_id_not_found(mock_client, client):
     response = client.post("/subscription", json={"list_id": str(uuid.uuid4())})
     assert response.json() == {"error": "list not found"}
     assert response.status_code == 404
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_subscription_event_empty_phone_and_email(
     mock_client, list_fixture, client
 ):
@@ -31,7 +40,7 @@ def test_create_subscription_event_empty_phone_and_email(
     assert response.status_code == 400
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_subscription_event_with_bad_email(mock_client, list_fixture, client):
     response = client.post(
         "/subscription",
@@ -49,7 +58,7 @@ def test_create_subscription_event_with_bad_email(mock_client, list_fixture, cli
     assert response.status_code == 422
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_succeeds_with_email(mock_client, list_fixture, client):
     response = client.post(
         "/subscription",
@@ -67,7 +76,7 @@ def test_create_succeeds_with_email(mock_client, list_fixture, client):
     )
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_succeeds_with_phone(mock_client, list_fixture, client):
     response = client.post(
         "/subscription", json={"phone": "123456789", "list_id": str(list_fixture.id)}
@@ -81,7 +90,7 @@ def test_create_succeeds_with_phone(mock_client, list_fixture, client):
     )
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_fails_with_email_and_phone_validation_error(
     mock_client, list_fixture, client
 ):
@@ -97,7 +106,7 @@ def test_create_fails_with_email_and_phone_validation_error(
     assert response.status_code == 422
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_email_sub_succeeds_with_redirect(
     mock_client, list_fixture_with_redirects, client
 ):
@@ -110,13 +119,14 @@ def test_create_email_sub_succeeds_with_redirect(
         follow_redirects=False,
     )
     assert response.status_code == 307
-    assert response.headers == {
+    assert dict(response.headers) == {
         "content-length": "0",
+        "server-timing": ANY,
         "location": list_fixture_with_redirects.subscribe_redirect_url,
     }
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_phone_sub_succeeds_with_redirect(
     mock_client, list_fixture_with_redirects, client
 ):
@@ -129,13 +139,14 @@ def test_create_phone_sub_succeeds_with_redirect(
         follow_redirects=False,
     )
     assert response.status_code == 307
-    assert response.headers == {
+    assert dict(response.headers) == {
         "content-length": "0",
+        "server-timing": ANY,
         "location": list_fixture_with_redirects.subscribe_redirect_url,
     }
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_create_subscription_with_undeclared_parameter(
     mock_client, list_fixture, client
 ):
@@ -179,8 +190,9 @@ def test_confirm_with_correct_id_and_redirects(
         follow_redirects=False,
     )
     assert response.status_code == 307
-    assert response.headers == {
+    assert dict(response.headers) == {
         "content-length": "0",
+        "server-timing": ANY,
         "location": list_fixture_with_redirects.confirm_redirect_url,
     }
     session.refresh(subscription_fixture_with_redirects)
@@ -199,21 +211,21 @@ def test_confirm_with_correct_id_unknown_error(
     assert response.status_code == 500
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_unsubscribe_event_with_bad_id(mock_client, client):
     response = client.delete("/subscription/foo")
     assert response.json() == {"error": "subscription not found"}
     assert response.status_code == 404
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_unsubscribe_event_with_id_not_found(mock_client, client):
     response = client.delete(f"/subscription/{str(uuid.uuid4())}")
     assert response.json() == {"error": "subscription not found"}
     assert response.status_code == 404
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_unsubscribe_event_with_correct_id(mock_client, subscription_fixture, client):
     response = client.delete(f"/subscription/{str(subscription_fixture.id)}")
     assert response.json() == {"status": "OK"}
@@ -234,7 +246,7 @@ def test_unsubscribe_event_with_correct_id(mock_client, subscription_fixture, cl
     )
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_unsubscribe_event_with_correct_id_and_redirect(
     mock_client,
     subscription_fixture_with_redirects,
@@ -246,14 +258,15 @@ def test_unsubscribe_event_with_correct_id_and_redirect(
         follow_redirects=False,
     )
     assert response.status_code == 307
-    assert response.headers == {
+    assert dict(response.headers) == {
         "content-length": "0",
+        "server-timing": ANY,
         "location": list_fixture_with_redirects.unsubscribe_redirect_url,
     }
 
 
 @patch("api_gateway.api.db_session")
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_unsubscribe_event_with_correct_id_unknown_error(
     mock_client, mock_db_session, subscription_fixture, client
 ):
@@ -265,21 +278,21 @@ def test_unsubscribe_event_with_correct_id_unknown_error(
     assert response.status_code == 500
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_get_unsubscribe_event_with_bad_id(mock_client, client):
     response = client.get("/unsubscribe/foo")
     assert response.json() == {"error": "subscription not found"}
     assert response.status_code == 404
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_get_unsubscribe_event_with_id_not_found(mock_client, client):
     response = client.get(f"/unsubscribe/{str(uuid.uuid4())}")
     assert response.json() == {"error": "subscription not found"}
     assert response.status_code == 404
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_get_unsubscribe_event_with_correct_id(
     mock_client, subscription_fixture, client
 ):
@@ -302,7 +315,7 @@ def test_get_unsubscribe_event_with_correct_id(
     )
 
 
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_get_unsubscribe_event_with_correct_id_and_redirect(
     mock_client,
     subscription_fixture_with_redirects,
@@ -314,14 +327,15 @@ def test_get_unsubscribe_event_with_correct_id_and_redirect(
         follow_redirects=False,
     )
     assert response.status_code == 307
-    assert response.headers == {
+    assert dict(response.headers) == {
         "content-length": "0",
+        "server-timing": ANY,
         "location": list_fixture_with_redirects.unsubscribe_redirect_url,
     }
 
 
 @patch("api_gateway.api.db_session")
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_get_unsubscribe_event_with_correct_id_unknown_error(
     mock_client, mock_db_session, subscription_fixture, client
 ):
@@ -334,7 +348,7 @@ def test_get_unsubscribe_event_with_correct_id_unknown_error(
 
 
 @patch("api_gateway.api.db_session")
-@patch("api_gateway.api.get_notify_client")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
 def test_get_unsubscribe_event_with_correct_id_notify_error(
     mock_client, mock_db_session, subscription_fixture, client
 ):
@@ -344,3 +358,218 @@ def test_get_unsubscribe_event_with_correct_id_notify_error(
     response = client.get(f"/unsubscribe/{str(subscription_fixture.id)}")
     assert response.json() == {"error": "error sending unsubscription notification"}
     assert response.status_code == 502
+
+
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
+def test_create_subscription_event_notify_error(mock_client, list_fixture, client):
+    mock_client().send_email_notification.side_effect = NotifyHTTPError(
+        response=MagicMock(status_code=400)
+    )
+    response = client.post(
+        "/subscription",
+        json={"email": f"{uuid.uuid4()}@example.com", "list_id": str(list_fixture.id)},
+    )
+    assert response.json() == {"error": "error sending subscription notification"}
+    assert response.status_code == 502
+
+
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
+def test_unsubscribe_event_circuit_open(mock_client, subscription_fixture, client):
+    mock_client().send_sms_notification.side_effect = CircuitOpenError()
+    response = client.delete(f"/subscription/{str(subscription_fixture.id)}")
+    assert response.json() == {"error": "error sending unsubscription notification"}
+    assert response.status_code == 502
+
+
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
+def test_create_subscription_twice_returns_same_subscription(
+    mock_client, list_fixture_required_data_only, session, client
+):
+    list_fixture_required_data_only.subscribe_email_template_id = str(uuid.uuid4())
+    session.commit()
+
+    ids = [
+        client.post(
+            "/subscription",
+            json={
+                "email": email,
+                "list_id": str(list_fixture_required_data_only.id),
+            },
+        ).json()["id"]
+        for email in ["twice@example.com", "Twice@Example.com"]
+    ]
+    assert ids[0] == ids[1]
+
+    subscriptions = session.query(Subscription).filter(
+        Subscription.list_id == list_fixture_required_data_only.id
+    )
+    assert subscriptions.count() == 1
+    assert mock_client().send_email_notification.call_count == 2
+
+
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
+def test_create_phone_subscription_twice_returns_same_subscription(
+    mock_client, list_fixture_required_data_only, session, client
+):
+    ids = [
+        client.post(
+            "/subscription",
+            json={
+                "phone": "6135550000",
+                "list_id": str(list_fixture_required_data_only.id),
+            },
+        ).json()["id"]
+        for _ in range(2)
+    ]
+    assert ids[0] == ids[1]
+
+
+def test_unique_indexes_reject_duplicate_addresses(
+    list_fixture_required_data_only, session
+):
+    session.add(
+        Subscription(email="dupe@example.com", list=list_fixture_required_data_only)
+    )
+    session.commit()
+
+    session.add(
+        Subscription(email="DUPE@example.com", list=list_fixture_required_data_only)
+    )
+    with pytest.raises(IntegrityError):
+        session.commit()
+    session.rollback()
+
+
+@patch("api_gateway.api.metrics")
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
+def test_list_lookups_are_cached_until_list_updated(
+    mock_client, mock_metrics, list_fixture, client
+):
+    def subscribe():
+        client.post(
+            "/subscription",
+            json={"email": "cached@example.com", "list_id": str(list_fixture.id)},
+        )
+        return mock_client().send_email_notification.call_args.kwargs["template_id"]
+
+    assert subscribe() == list_fixture.subscribe_email_template_id
+    assert subscribe() == list_fixture.subscribe_email_template_id
+    mock_metrics.add_metric.assert_any_call(name="ListCacheMiss", unit=ANY, value=1)
+    mock_metrics.add_metric.assert_any_call(name="ListCacheHit", unit=ANY, value=1)
+
+    template_id = str(uuid.uuid4())
+    response = client.put(
+        f"/list/{list_fixture.id}",
+        json={"subscribe_email_template_id": template_id},
+    )
+    assert response.json() == {"status": "OK"}
+    assert subscribe() == template_id
+
+    client.put(
+        f"/list/{list_fixture.id}",
+        json={"subscribe_email_template_id": list_fixture.subscribe_email_template_id},
+    )
+
+
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
+def test_create_subscriptions_batch(mock_client, list_fixture, session, client):
+    list_id = str(list_fixture.id)
+    prefix = uuid.uuid4()
+    response = client.post(
+        "/subscriptions/batch",
+        json={
+            "subscriptions": [
+                {"email": f"{prefix}_0@example.com", "list_id": list_id},
+                {"email": f"{prefix}_1@example.com", "list_id": list_id},
+                {"email": f"{prefix}_0@EXAMPLE.com", "list_id": list_id},
+                {"phone": "+15555550123", "list_id": list_id},
+                {"list_id": list_id},
+                {"email": f"{prefix}_2@example.com", "list_id": "not-a-list"},
+            ]
+        },
+    )
+    results = response.json()["results"]
+
+    assert response.status_code == 200
+    assert results[0] == {"id": ANY}
+    assert results[1] == {"id": ANY}
+    assert results[2] == results[0]
+    assert results[3] == {"id": ANY}
+    assert results[4] == {"error": "email and phone can not be empty"}
+    assert results[5] == {"error": "list not found"}
+    assert (
+        session.query(Subscription)
+        .filter(Subscription.email.like(f"{prefix}%"))
+        .count()
+        == 2
+    )
+
+    # The two email confirmations share a template and go out as one bulk send
+    mock_client().send_bulk_notifications.assert_called_once_with(
+        "Subscription confirmations",
+        [
+            ["email address", "confirm_link", "name"],
+            [f"{prefix}_0@example.com", ANY, "fixture_name"],
+            [f"{prefix}_1@example.com", ANY, "fixture_name"],
+        ],
+        list_fixture.subscribe_email_template_id,
+    )
+    mock_client().send_email_notification.assert_not_called()
+    mock_client().send_sms_notification.assert_called_once_with(
+        phone_number="+15555550123",
+        template_id=list_fixture.subscribe_phone_template_id,
+        personalisation={"name": "fixture_name"},
+    )
+
+
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
+def test_create_subscriptions_batch_returns_existing_subscriptions(
+    mock_client, list_fixture, client
+):
+    email = f"batch_{uuid.uuid4()}@example.com"
+    response = client.post(
+        "/subscription", json={"email": email, "list_id": str(list_fixture.id)}
+    )
+    subscription_id = response.json()["id"]
+
+    response = client.post(
+        "/subscriptions/batch",
+        json={"subscriptions": [{"email": email, "list_id": str(list_fixture.id)}]},
+    )
+    assert response.json() == {"results": [{"id": subscription_id}]}
+
+
+@patch("api_gateway.api.get_async_notify_client", new_callable=async_notify_client)
+def test_create_subscriptions_batch_reports_notification_errors(
+    mock_client, list_fixture, client
+):
+    mock_client().send_bulk_notifications.side_effect = NotifyHTTPError(
+        message="Request failed"
+    )
+    response = client.post(
+        "/subscriptions/batch",
+        json={
+            "subscriptions": [
+                {
+                    "email": f"{uuid.uuid4()}@example.com",
+                    "list_id": str(list_fixture.id),
+                }
+                for _ in range(2)
+            ]
+        },
+    )
+    assert (
+        response.json()["results"]
+        == [{"id": ANY, "error": "error sending subscription notification"}] * 2
+    )
+
+
+def test_create_subscriptions_batch_is_bounded(client):
+    response = client.post(
+        "/subscriptions/batch",
+        json={
+            "subscriptions": [{"email": "fake@example.com", "list_id": "list"}]
+            * (api.SUBSCRIPTION_BATCH_MAX_SIZE + 1)
+        },
+    )
+    assert response.status_code == 422
@@ -0,0 +1,49 @@
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+from unittest.mock import patch
+
+from api_gateway.cache import TTLCache
+
+
+def test_cache_returns_value_until_expired():
+    cache = TTLCache(maxsize=2, ttl=10)
+    with patch("api_gateway.cache.monotonic", return_value=100):
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+    with patch("api_gateway.cache.monotonic", return_value=110):
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cache_invalidate_and_clear():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_disabled_with_zero_size():
+    cache = TTLCache(maxsize=0, ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") is None
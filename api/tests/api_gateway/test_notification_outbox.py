@@ -0,0 +1,191 @@
+import uuid
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from notifications_python_client.errors import HTTPError
+
+from clients.notify import RateLimitExceededError
+
+from api_gateway import api
+from models.OutboxNotification import OutboxNotification
+from models.Subscription import Subscription
+
+
+def outbox_notification(list, **kwargs):
+    return OutboxNotification(
+        list_id=list.id,
+        type="email",
+        recipient="fake@email.com",
+        template_id="template_id",
+        personalisation={"name": "fixture_name"},
+        **kwargs,
+    )
+
+
+@patch("api_gateway.api.NOTIFICATION_OUTBOX", True)
+@patch("api_gateway.api.get_async_notify_client")
+def test_subscribe_writes_confirmation_to_outbox(
+    mock_client, list_fixture, session, client
+):
+    mock_client.return_value = AsyncMock()
+    email = f"outbox_{uuid.uuid4()}@example.com"
+    response = client.post(
+        "/subscription", json={"email": email, "list_id": str(list_fixture.id)}
+    )
+    assert response.status_code == 200
+    mock_client().send_email_notification.assert_not_called()
+
+    notification = session.query(OutboxNotification).filter_by(recipient=email).one()
+    assert notification.state == "pending"
+    assert notification.type == "email"
+    assert notification.template_id == list_fixture.subscribe_email_template_id
+    assert notification.personalisation == {
+        "name": list_fixture.name,
+        "confirm_link": api.get_confirm_link(response.json()["id"]),
+    }
+
+    session.delete(notification)
+    session.query(Subscription).filter_by(id=response.json()["id"]).delete()
+    session.commit()
+
+
+@patch("api_gateway.api.NOTIFICATION_OUTBOX", True)
+@patch("api_gateway.api.get_async_notify_client")
+def test_unsubscribe_writes_confirmation_to_outbox(
+    mock_client, list_fixture, session, client
+):
+    mock_client.return_value = AsyncMock()
+    email = f"outbox_{uuid.uuid4()}@example.com"
+    subscription = Subscription(email=email, phone="+15555550100", list=list_fixture)
+    session.add(subscription)
+    session.commit()
+
+    response = client.delete(f"/subscription/{subscription.id}")
+    assert response.json() == {"status": "OK"}
+    mock_client().send_email_notification.assert_not_called()
+    mock_client().send_sms_notification.assert_not_called()
+
+    notifications = (
+        session.query(OutboxNotification)
+        .filter(OutboxNotification.recipient.in_([email, "+15555550100"]))
+        .all()
+    )
+    assert sorted(notification.type for notification in notifications) == [
+        "email",
+        "sms",
+    ]
+
+    for notification in notifications:
+        session.delete(notification)
+    session.commit()
+
+
+@patch("api_gateway.api.get_async_notify_client")
+def test_drain_sends_due_notifications(mock_client, list_fixture, session):
+    mock_client.return_value = AsyncMock()
+    due = outbox_notification(list_fixture)
+    later = outbox_notification(
+        list_fixture, next_attempt_at=datetime.utcnow() + timedelta(hours=1)
+    )
+    session.add_all([due, later])
+    session.commit()
+
+    assert api.drain_notification_outbox() == 1
+    mock_client().send_email_notification.assert_called_once_with(
+        email_address="fake@email.com",
+        template_id="template_id",
+        personalisation={"name": "fixture_name"},
+    )
+
+    session.expire_all()
+    assert (due.state, due.attempts) == ("sent", 1)
+    assert (later.state, later.attempts) == ("pending", 0)
+
+    session.delete(due)
+    session.delete(later)
+    session.commit()
+
+
+@patch("api_gateway.api.get_async_notify_client")
+def test_drain_retries_failed_notifications_later(mock_client, list_fixture, session):
+    mock_client.return_value = AsyncMock()
+    mock_client().send_email_notification.side_effect = HTTPError(
+        message="Request failed"
+    )
+    notification = outbox_notification(list_fixture)
+    session.add(notification)
+    session.commit()
+
+    assert api.drain_notification_outbox() == 0
+
+    session.expire_all()
+    assert notification.state == "pending"
+    assert notification.attempts == 1
+    assert notification.error == "503 - Request failed"
+    assert notification.next_attempt_at > datetime.utcnow()
+
+    session.delete(notification)
+    session.commit()
+
+
+@patch("api_gateway.api.get_async_notify_client")
+def test_subscribe_defers_rate_limited_confirmation_to_outbox(
+    mock_client, list_fixture, session, client
+):
+    mock_client.return_value = AsyncMock()
+    mock_client().send_email_notification.side_effect = RateLimitExceededError(2)
+    email = f"outbox_{uuid.uuid4()}@example.com"
+    response = client.post(
+        "/subscription", json={"email": email, "list_id": str(list_fixture.id)}
+    )
+    assert response.status_code == 200
+
+    notification = session.query(OutboxNotification).filter_by(recipient=email).one()
+    assert notification.state == "pending"
+    assert notification.next_attempt_at > datetime.utcnow()
+
+    session.delete(notification)
+    session.query(Subscription).filter_by(id=response.json()["id"]).delete()
+    session.commit()
+
+
+def test_record_outbox_attempt_keeps_attempts_when_rate_limited():
+    notification = OutboxNotification(attempts=1)
+    api.record_outbox_attempt(notification, RateLimitExceededError(5))
+
+    assert notification.attempts == 1
+    assert notification.next_attempt_at > datetime.utcnow()
+
+
+def test_record_outbox_attempt_backs_off_exponentially():
+    notification = OutboxNotification(attempts=2, service_api_key="key")
+    before = datetime.utcnow()
+    api.record_outbox_attempt(notification, Exception("timeout"))
+
+    assert notification.state != "failed"
+    assert notification.service_api_key == "key"
+    assert notification.next_attempt_at >= before + timedelta(
+        seconds=api.NOTIFICATION_OUTBOX_BACKOFF_SECONDS * 4
+    )
+
+
+def test_record_outbox_attempt_fails_rejected_notifications():
+    notification = OutboxNotification(attempts=0, service_api_key="key")
+    api.record_outbox_attempt(
+        notification, HTTPError(response=MagicMock(status_code=400))
+    )
+    assert notification.state == "failed"
+    assert notification.service_api_key is None
+
+
+def test_record_outbox_attempt_fails_after_max_attempts():
+    notification = OutboxNotification(attempts=api.NOTIFICATION_OUTBOX_MAX_ATTEMPTS - 1)
+    api.record_outbox_attempt(notification, Exception("timeout"))
+    assert notification.state == "failed"
+
+
+def test_record_outbox_attempt_clears_key_once_sent():
+    notification = OutboxNotification(attempts=0, service_api_key="key")
+    api.record_outbox_attempt(notification, None)
+    assert notification.state == "sent"
+    assert notification.service_api_key is None
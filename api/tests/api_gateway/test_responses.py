@@ -0,0 +1,22 @@
+import json
+import uuid
+
+from datetime import datetime
+
+from api_gateway.responses import ORJSONResponse
+
+
+class SubclassedUUID(uuid.UUID):
+    pass
+
+
+def test_orjson_response_encodes_uuids_and_datetimes():
+    id = uuid.uuid4()
+    response = ORJSONResponse(
+        {"id": id, "other_id": SubclassedUUID(str(id)), "at": datetime(2024, 1, 2)}
+    )
+    assert json.loads(response.body) == {
+        "id": str(id),
+        "other_id": str(id),
+        "at": "2024-01-02T00:00:00",
+    }
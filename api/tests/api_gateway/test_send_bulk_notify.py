@@ -1,7 +1,13 @@
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
 
-from api_gateway.api import send_bulk_notify, get_unsubscribe_link, SendPayload
+from api_gateway.api import (
+    build_bulk_chunks,
+    get_unsubscribe_link,
+    send_bulk_notify,
+    SendPayload,
+)
+from notifications_python_client.errors import HTTPError
 from unittest.mock import patch, ANY
 import uuid
 
@@ -23,9 +29,9 @@ def test_send_more_than_limit(mock_client):
 
     calls = [ANY for x in range(calls_to_make)]
 
-    emails_sent = send_bulk_notify(len(emails), send_payload, emails, limit)
-    mock_client().send_bulk_notifications.assert_has_calls(calls)
-    assert emails_sent == items
+    chunks = send_bulk_notify(len(emails), send_payload, emails, limit)
+    mock_client().send_bulk_notifications.assert_has_calls(calls, any_order=True)
+    assert sum(chunk["recipients"] for chunk in chunks) == items
 
 
 @patch("api_gateway.api.get_notify_client")
@@ -50,11 +56,11 @@ def test_send_emails_only(mock_client):
         if x["email"]
     ]
 
-    emails_sent = send_bulk_notify(len(subscribers), send_payload, subscribers)
+    chunks = send_bulk_notify(len(subscribers), send_payload, subscribers)
     mock_client().send_bulk_notifications.assert_called_once_with(
         "Job Name", subscriber_arr, template_id
     )
-    assert emails_sent == 2
+    assert chunks == [{"chunk": 0, "recipients": 2, "status": "OK"}]
 
 
 @patch("api_gateway.api.get_notify_client")
@@ -77,8 +83,65 @@ def test_send_sms_only(mock_client):
         [x["phone"], x["id"]] for x in subscribers if x["phone"]
     ]
 
-    emails_sent = send_bulk_notify(len(subscribers), send_payload, subscribers)
+    chunks = send_bulk_notify(len(subscribers), send_payload, subscribers)
     mock_client().send_bulk_notifications.assert_called_once_with(
         "Job Name", subscriber_arr, template_id
     )
-    assert emails_sent == 1
+    assert chunks == [{"chunk": 0, "recipients": 1, "status": "OK"}]
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_send_streamed_rows_dispatches_full_chunks(mock_client):
+    limit = 3
+    rows = ({"email": f"{x}@example.com", "id": x} for x in range(7))
+
+    send_payload = SendPayload(
+        list_id=str(uuid.uuid4()),
+        template_type="email",
+        template_id=str(uuid.uuid4()),
+        job_name="Job Name",
+    )
+
+    chunks = send_bulk_notify(None, send_payload, rows, limit, max_in_flight=1)
+    calls = mock_client().send_bulk_notifications.call_args_list
+    assert [len(call.args[1]) - 1 for call in calls] == [3, 3, 1]
+    assert [chunk["recipients"] for chunk in chunks] == [3, 3, 1]
+
+
+@patch("api_gateway.api.get_notify_client")
+def test_send_bulk_notify_reports_failed_chunks(mock_client):
+    mock_client().send_bulk_notifications.side_effect = [
+        {"data": "ok"},
+        HTTPError(message="Notify is down"),
+    ]
+    rows = [{"email": f"{x}@example.com", "id": x} for x in range(4)]
+
+    send_payload = SendPayload(
+        list_id=str(uuid.uuid4()),
+        template_type="email",
+        template_id=str(uuid.uuid4()),
+        job_name="Job Name",
+    )
+
+    chunks = send_bulk_notify(len(rows), send_payload, rows, 2, max_in_flight=1)
+    assert chunks == [
+        {"chunk": 0, "recipients": 2, "status": "OK"},
+        {
+            "chunk": 1,
+            "recipients": 2,
+            "status": "ERROR",
+            "error": "503 - Notify is down",
+        },
+    ]
+
+
+def test_build_bulk_chunks_skips_header_only_chunks():
+    send_payload = SendPayload(
+        list_id=str(uuid.uuid4()),
+        template_type="phone",
+        template_id=str(uuid.uuid4()),
+        job_name="Job Name",
+    )
+    rows = [{"email": "one@two.com", "phone": None, "id": "1"}]
+
+    assert list(build_bulk_chunks(send_payload, rows)) == []
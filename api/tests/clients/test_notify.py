@@ -0,0 +1,349 @@
+import asyncio
+import json
+import pytest
+import uuid
+
+import httpx
+import requests
+from unittest.mock import AsyncMock, MagicMock, patch
+from notifications_python_client.errors import HTTP503Error, HTTPError
+
+from clients.notify import (
+    AsyncNotificationsAPIClient,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    NotificationsAPIClient,
+    RateLimiter,
+    RateLimitExceededError,
+    create_http_client,
+    notify_deadline,
+    retry_delay,
+)
+
+API_KEY = f"test-{uuid.uuid4()}-{uuid.uuid4()}"
+
+
+def async_client(handler, max_retries=0, **kwargs):
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AsyncNotificationsAPIClient(
+        API_KEY,
+        http_client,
+        base_url="https://notify.test",
+        max_retries=max_retries,
+        **kwargs,
+    )
+
+
+def test_send_email_notification_posts_to_notify():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(201, json={"id": "notification-id"})
+
+    client = async_client(handler)
+    response = asyncio.run(
+        client.send_email_notification(
+            email_address="fake@email.com",
+            template_id="template-id",
+            personalisation={"name": "fixture_name"},
+        )
+    )
+
+    assert response == {"id": "notification-id"}
+    assert str(requests[0].url) == "https://notify.test/v2/notifications/email"
+    assert requests[0].headers["Authorization"].startswith("Bearer ")
+    assert json.loads(requests[0].content) == {
+        "email_address": "fake@email.com",
+        "template_id": "template-id",
+        "personalisation": {"name": "fixture_name"},
+    }
+
+
+def test_send_bulk_notifications_posts_rows():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(201, json={"data": {}})
+
+    client = async_client(handler)
+    rows = [["email address"], ["fake@email.com"]]
+    asyncio.run(client.send_bulk_notifications("Job Name", rows, "template-id"))
+
+    assert str(requests[0].url) == "https://notify.test/v2/notifications/bulk"
+    assert json.loads(requests[0].content) == {
+        "name": "Job Name",
+        "template_id": "template-id",
+        "rows": rows,
+    }
+
+
+@pytest.mark.parametrize("status_code,error", [(400, HTTPError), (503, HTTP503Error)])
+def test_error_responses_raise_notify_errors(status_code, error):
+    client = async_client(
+        lambda request: httpx.Response(status_code, json={"errors": ["failed"]})
+    )
+    with pytest.raises(error) as err:
+        asyncio.run(client.send_sms_notification("+15555555555", "template-id"))
+    assert err.value.status_code == status_code
+
+
+def test_transport_errors_raise_notify_errors():
+    def handler(request):
+        raise httpx.ConnectTimeout("timed out")
+
+    client = async_client(handler)
+    with pytest.raises(HTTPError) as err:
+        asyncio.run(client.send_sms_notification("+15555555555", "template-id"))
+    assert err.value.status_code == 503
+
+
+def test_create_http_client_configures_timeouts():
+    http_client = create_http_client(connect_timeout=2, read_timeout=10)
+    assert http_client.timeout.connect == 2
+    assert http_client.timeout.read == 10
+
+
+@patch("clients.notify.asyncio.sleep", new_callable=AsyncMock)
+def test_async_client_retries_rate_limited_requests(mock_sleep):
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "2"}, json={}),
+        httpx.Response(201, json={"id": "notification-id"}),
+    ]
+    client = async_client(lambda request: responses.pop(0), max_retries=2)
+
+    response = asyncio.run(client.send_email_notification("fake@email.com", "id"))
+
+    assert response == {"id": "notification-id"}
+    mock_sleep.assert_called_once_with(2.0)
+
+
+@patch("clients.notify.asyncio.sleep", new_callable=AsyncMock)
+def test_async_client_does_not_retry_read_timeouts(mock_sleep):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("timed out")
+
+    client = async_client(handler, max_retries=2)
+    with pytest.raises(HTTPError):
+        asyncio.run(client.send_email_notification("fake@email.com", "id"))
+    assert len(calls) == 1
+    mock_sleep.assert_not_called()
+
+
+def requests_response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b"{}"
+    return response
+
+
+@patch("clients.notify.time.sleep")
+def test_sync_client_retries_unavailable_notify(mock_sleep):
+    client = NotificationsAPIClient(API_KEY, base_url="https://notify.test")
+    with patch.object(
+        client.request_session,
+        "request",
+        side_effect=[requests_response(503), requests_response(201)],
+    ) as mock_request:
+        client.send_bulk_notifications("Job Name", [], "template-id")
+    assert mock_request.call_count == 2
+    mock_sleep.assert_called_once()
+
+
+@patch("clients.notify.time.sleep")
+def test_sync_client_retries_connection_errors(mock_sleep):
+    client = NotificationsAPIClient(API_KEY, base_url="https://notify.test")
+    with patch.object(
+        client.request_session,
+        "request",
+        side_effect=[requests.ConnectionError(), requests_response(201)],
+    ) as mock_request:
+        client.send_bulk_notifications("Job Name", [], "template-id")
+    assert mock_request.call_count == 2
+
+
+@patch("clients.notify.time.sleep")
+def test_sync_client_does_not_retry_rejected_requests(mock_sleep):
+    client = NotificationsAPIClient(API_KEY, base_url="https://notify.test")
+    with patch.object(
+        client.request_session, "request", return_value=requests_response(400)
+    ) as mock_request:
+        with pytest.raises(HTTPError):
+            client.send_bulk_notifications("Job Name", [], "template-id")
+    assert mock_request.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+def test_retry_delay_honours_retry_after():
+    assert retry_delay(0, {"Retry-After": "3"}) == 3
+    assert retry_delay(0, {"Retry-After": "120"}, max_delay=5) is None
+    assert 0 <= retry_delay(3, max_delay=2) <= 2
+
+
+def test_circuit_breaker_fails_fast_once_open():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500, json={})
+
+    client = async_client(handler, circuit_breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            asyncio.run(client.send_sms_notification("+15555555555", "id"))
+
+    with pytest.raises(CircuitOpenError) as err:
+        asyncio.run(client.send_sms_notification("+15555555555", "id"))
+    assert err.value.status_code == 503
+    assert len(calls) == 2
+
+
+@patch("clients.notify.time.monotonic")
+def test_circuit_breaker_closes_after_successful_trial(mock_monotonic):
+    mock_monotonic.return_value = 100
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    mock_monotonic.return_value = 131
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+
+def half_open_due_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    return breaker
+
+
+def test_rate_limited_request_does_not_start_half_open_trial():
+    breaker = half_open_due_breaker()
+    rate_limiter = MagicMock()
+    rate_limiter.reserve.side_effect = RateLimitExceededError(5)
+    client = NotificationsAPIClient(
+        API_KEY,
+        base_url="https://notify.test",
+        circuit_breaker=breaker,
+        rate_limiter=rate_limiter,
+    )
+    with patch.object(client.request_session, "request") as mock_request:
+        with pytest.raises(RateLimitExceededError):
+            client.send_bulk_notifications("Job Name", [], "template-id")
+    mock_request.assert_not_called()
+
+    assert breaker.state == "open"
+    assert breaker.allow_request()
+
+
+def test_cancelled_trial_reopens_circuit_breaker():
+    def handler(request):
+        raise asyncio.CancelledError()
+
+    breaker = half_open_due_breaker()
+    client = async_client(handler, circuit_breaker=breaker)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(client.send_sms_notification("+15555555555", "id"))
+
+    assert breaker.state == "open"
+    assert breaker.allow_request()
+
+
+@patch("clients.notify.time.monotonic")
+def test_rate_limiter_waits_then_refuses(mock_monotonic):
+    mock_monotonic.return_value = 100
+    limiter = RateLimiter({"email": 60}, burst=2)
+
+    assert limiter.reserve("service", "email", max_wait=1) == 0
+    assert limiter.reserve("service", "email", max_wait=1) == 0
+    assert limiter.reserve("service", "email", max_wait=1) == 1
+    with pytest.raises(RateLimitExceededError) as err:
+        limiter.reserve("service", "email", max_wait=1)
+    assert err.value.status_code == 429
+
+    # Other services, and endpoints without a rate, have budgets of their own
+    assert limiter.reserve("other", "email") == 0
+    assert limiter.reserve("service", "sms") == 0
+
+    mock_monotonic.return_value = 103
+    assert limiter.reserve("service", "email") == 0
+
+
+@patch("clients.notify.asyncio.sleep", new_callable=AsyncMock)
+def test_async_client_refuses_requests_over_rate_limit(mock_sleep):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(201, json={})
+
+    client = async_client(
+        handler,
+        rate_limiter=RateLimiter({"sms": 60}, burst=1),
+        rate_limit_max_wait=0,
+    )
+    asyncio.run(client.send_sms_notification("+15555555555", "id"))
+    with pytest.raises(RateLimitExceededError):
+        asyncio.run(client.send_sms_notification("+15555555555", "id"))
+    assert len(calls) == 1
+
+
+def deadline_client(**kwargs):
+    # Each attempt may take up to 2 seconds
+    return NotificationsAPIClient(
+        API_KEY,
+        base_url="https://notify.test",
+        connect_timeout=1,
+        timeout=1,
+        **kwargs,
+    )
+
+
+def test_sync_client_does_not_start_requests_past_deadline():
+    client = deadline_client()
+    with patch.object(client.request_session, "request") as mock_request:
+        with notify_deadline(1):
+            with pytest.raises(DeadlineExceededError):
+                client.send_bulk_notifications("Job Name", [], "template-id")
+    mock_request.assert_not_called()
+
+
+@patch("clients.notify.time.sleep")
+def test_sync_client_does_not_retry_past_deadline(mock_sleep):
+    response = requests_response(503)
+    response.headers["Retry-After"] = "2"
+    client = deadline_client()
+    with patch.object(
+        client.request_session, "request", return_value=response
+    ) as mock_request:
+        with notify_deadline(3):
+            with pytest.raises(DeadlineExceededError):
+                client.send_bulk_notifications("Job Name", [], "template-id")
+    assert mock_request.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+@patch("clients.notify.time.sleep")
+def test_sync_client_does_not_wait_for_rate_limit_past_deadline(mock_sleep):
+    client = deadline_client(
+        rate_limiter=RateLimiter({"bulk": 6}, burst=1), rate_limit_max_wait=30
+    )
+    with patch.object(
+        client.request_session, "request", return_value=requests_response(201)
+    ) as mock_request:
+        with notify_deadline(5):
+            client.send_bulk_notifications("Job Name", [], "template-id")
+            # The next token is 10 seconds away
+            with pytest.raises(DeadlineExceededError):
+                client.send_bulk_notifications("Job Name", [], "template-id")
+        client.send_bulk_notifications("Job Name", [], "template-id")
+    assert mock_request.call_count == 2
+    mock_sleep.assert_called_once()
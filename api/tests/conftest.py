@@ -167,24 +167,32 @@ def setup_db():
     yield
 
 
+def get_or_create_subscription(session, list, email, phone):
+    # An address can only be subscribed once to a list, so reuse it across tests
+    subscription = (
+        session.query(Subscription)
+        .filter_by(list_id=list.id, email=email, phone=phone)
+        .first()
+    )
+    if subscription is None:
+        subscription = Subscription(email=email, phone=phone, list=list)
+        session.add(subscription)
+        session.commit()
+    return subscription
+
+
 @pytest.fixture(scope="function")
 def subscription_fixture(session, list_fixture):
-    subscription = Subscription(
-        email="fixture_email", phone="fixture_phone", list=list_fixture
+    return get_or_create_subscription(
+        session, list_fixture, "fixture_email", "fixture_phone"
     )
-    session.add(subscription)
-    session.commit()
-    return subscription
 
 
 @pytest.fixture(scope="function")
 def subscription_fixture_with_redirects(session, list_fixture_with_redirects):
-    subscription = Subscription(
-        email="fixture_email", phone="fixture_phone", list=list_fixture_with_redirects
+    return get_or_create_subscription(
+        session, list_fixture_with_redirects, "fixture_email", "fixture_phone"
     )
-    session.add(subscription)
-    session.commit()
-    return subscription
 
 
 @pytest.fixture(scope="session")
@@ -199,33 +207,19 @@ def list_fixture_with_duplicates(session):
         unsubscribe_phone_template_id="dae60d25-0c83-45b7-b2ba-db208281e4e4",
     )
     session.add(list_fixture)
+    # Duplicate addresses are rejected by the unique subscription indexes
     subscription = Subscription(
         email="fixture_email", phone="fixture_phone", list=list_fixture, confirmed=True
     )
     session.add(subscription)
 
     subscription2 = Subscription(
-        email="fixture_email", list=list_fixture, confirmed=True
-    )
-    session.add(subscription2)
-
-    subscription3 = Subscription(
-        email="fixture_email_unique", list=list_fixture, confirmed=True
-    )
-    session.add(subscription3)
-
-    subscription4 = Subscription(
         email="fixture_email_unique",
         phone="fixture_phone_unique",
         list=list_fixture,
         confirmed=True,
     )
-    session.add(subscription4)
-
-    subscription5 = Subscription(
-        phone="fixture_phone", list=list_fixture, confirmed=True
-    )
-    session.add(subscription5)
+    session.add(subscription2)
 
     session.commit()
     return list_fixture
@@ -247,6 +241,13 @@ def list_to_be_updated_fixture(session):
     return list
 
 
+@pytest.fixture(autouse=True)
+def clear_list_cache():
+    # Fixtures change lists behind the API's back, so start every test cold
+    api.list_cache.clear()
+    yield
+
+
 @pytest.fixture(scope="session")
 def client() -> Generator[TestClient, Any, None]:
     with TestClient(api.app) as client:
@@ -0,0 +1,19 @@
+import os
+import pytest
+from unittest.mock import patch
+
+from database.db import get_pool_options
+
+
+def test_get_pool_options_from_profile():
+    with patch.dict(os.environ, {"SQLALCHEMY_POOL_SIZE": "3"}):
+        assert get_pool_options("lambda") == {
+            "pool_size": 3,
+            "max_overflow": 0,
+            "pool_timeout": 10,
+        }
+
+
+def test_get_pool_options_unknown_profile():
+    with pytest.raises(ValueError, match="expected one of: lambda, server"):
+        get_pool_options("lamdba")
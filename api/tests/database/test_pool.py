@@ -0,0 +1,63 @@
+import pytest
+
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine, exc, text
+
+from database.pool import InstrumentedQueuePool, add_pool_metrics, instrument_engine
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.01,
+    )
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_pool_records_checkouts_and_overflow(engine):
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = engine.pool.stats.snapshot()
+    assert stats["checkouts"] == 2
+    assert stats["peak_checked_out"] == 2
+    assert stats["peak_overflow"] == 1
+    assert stats["timeouts"] == 1
+    assert engine.pool.stats.snapshot()["checkouts"] == 0
+
+
+def test_pool_records_invalidations(engine):
+    with engine.connect() as connection:
+        connection.invalidate()
+    assert engine.pool.stats.snapshot()["invalidations"] == 1
+
+
+def test_pool_stats_survive_dispose(engine):
+    stats = engine.pool.stats
+    engine.dispose()
+    with engine.connect():
+        pass
+    assert engine.pool.stats is stats
+    assert stats.snapshot()["checkouts"] == 1
+
+
+def test_add_pool_metrics(engine):
+    metrics = MagicMock()
+    add_pool_metrics(metrics, "Db", engine.pool)
+    metrics.add_metric.assert_not_called()
+
+    with engine.connect():
+        pass
+    add_pool_metrics(metrics, "Db", engine.pool)
+    names = [call.kwargs["name"] for call in metrics.add_metric.call_args_list]
+    assert "DbPoolCheckouts" in names
+    assert "DbPoolWaitTime" in names
@@ -0,0 +1,74 @@
+import os
+import pytest
+
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from database.replica import (
+    AURORA_REPLICATION_LAG,
+    REPLICATION_LAG,
+    ReplicaMonitor,
+)
+
+
+def lagging_engine(lag, in_recovery=True, aurora=False):
+    engine = MagicMock()
+    connection = engine.connect.return_value.__enter__.return_value
+    connection.execute.return_value.one.return_value = (in_recovery, aurora)
+    connection.execute.return_value.scalar.return_value = lag
+    return engine
+
+
+def test_primary_is_usable():
+    engine = create_engine(os.environ["SQLALCHEMY_DATABASE_TEST_URI"])
+    assert ReplicaMonitor(engine).check() is True
+
+
+@pytest.mark.parametrize("lag,usable", [(0, True), (5, True), (120, False)])
+def test_replica_lag_threshold(lag, usable):
+    monitor = ReplicaMonitor(lagging_engine(lag), max_lag_seconds=30)
+    assert monitor.check() is usable
+
+
+def test_replica_with_unknown_lag_is_not_usable():
+    assert ReplicaMonitor(lagging_engine(None)).check() is False
+
+
+def test_primary_with_unknown_lag_is_usable():
+    engine = lagging_engine(None, in_recovery=False)
+    assert ReplicaMonitor(engine).check() is True
+
+
+@pytest.mark.parametrize(
+    "aurora,query", [(True, AURORA_REPLICATION_LAG), (False, REPLICATION_LAG)]
+)
+def test_replica_lag_query(aurora, query):
+    engine = lagging_engine(0, aurora=aurora)
+    assert ReplicaMonitor(engine).check() is True
+
+    connection = engine.connect.return_value.__enter__.return_value
+    assert connection.execute.call_args.args == (query,)
+
+
+def test_unavailable_replica_is_not_usable():
+    engine = MagicMock()
+    engine.connect.side_effect = OperationalError("SELECT", {}, Exception())
+    assert ReplicaMonitor(engine).check() is False
+
+
+@patch("database.replica.time.monotonic")
+def test_replica_is_checked_once_per_interval(mock_monotonic):
+    mock_monotonic.return_value = 100
+    engine = lagging_engine(0)
+    monitor = ReplicaMonitor(engine, check_interval=10)
+
+    monitor.check()
+    monitor.check()
+    assert engine.connect.call_count == 1
+    assert not monitor.is_stale()
+
+    mock_monotonic.return_value = 110
+    assert monitor.is_stale()
+    monitor.check()
+    assert engine.connect.call_count == 2
@@ -0,0 +1,94 @@
+import os
+import pytest
+
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+
+from database.slow_queries import log_slow_queries, parameters_shape
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(os.environ["SQLALCHEMY_DATABASE_TEST_URI"])
+    yield engine
+    engine.dispose()
+
+
+@patch("database.slow_queries.log")
+def test_slow_queries_are_logged_with_a_sampled_plan(mock_log, engine):
+    log_slow_queries(engine, threshold_ms=0.001, explain_sample_rate=1)
+    with engine.connect() as connection:
+        result = connection.execute(
+            text("SELECT :value AS value"), {"value": "fake@email.com"}
+        )
+        assert result.scalar() == "fake@email.com"
+
+    entry = mock_log.warning.call_args.kwargs["extra"]
+    assert entry["statement"] == "SELECT %(value)s AS value"
+    assert entry["parameters"] == {"value": "str"}
+    assert entry["duration_ms"] >= 0
+    assert "actual time" in entry["plan"]
+
+
+@patch("database.slow_queries.log")
+def test_fast_queries_are_not_logged(mock_log, engine):
+    log_slow_queries(engine, threshold_ms=60000, explain_sample_rate=1)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    mock_log.warning.assert_not_called()
+
+
+@patch("database.slow_queries.log")
+def test_writes_are_not_explained(mock_log, engine):
+    log_slow_queries(engine, threshold_ms=0.001, explain_sample_rate=1)
+    with engine.connect() as connection:
+        connection.execute(text("CREATE TEMPORARY TABLE slow (id int)"))
+    assert "plan" not in mock_log.warning.call_args.kwargs["extra"]
+
+
+@patch("database.slow_queries.log")
+def test_explain_does_not_change_the_transaction(mock_log, engine):
+    log_slow_queries(engine, threshold_ms=0.001, explain_sample_rate=1)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TEMPORARY TABLE explained (id int)"))
+        connection.execute(
+            text(
+                "CREATE FUNCTION pg_temp.insert_explained() RETURNS int "
+                "AS 'INSERT INTO explained VALUES (1) RETURNING id' LANGUAGE sql"
+            )
+        )
+        connection.execute(text("SELECT pg_temp.insert_explained()"))
+        assert connection.execute(text("SELECT count(*) FROM explained")).scalar() == 1
+
+
+@patch("database.slow_queries.log")
+def test_failed_explain_leaves_the_transaction_usable(mock_log, engine):
+    log_slow_queries(engine, threshold_ms=0.001, explain_sample_rate=1)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TEMPORARY TABLE explained (id int UNIQUE)"))
+        connection.execute(
+            text(
+                "CREATE FUNCTION pg_temp.insert_explained() RETURNS int "
+                "AS 'INSERT INTO explained VALUES (1) RETURNING id' LANGUAGE sql"
+            )
+        )
+        # Running the statement again for the plan violates the constraint
+        connection.execute(text("SELECT pg_temp.insert_explained()"))
+        assert connection.execute(text("SELECT count(*) FROM explained")).scalar() == 1
+
+    assert any(
+        call.args[0].startswith("Could not explain slow query")
+        for call in mock_log.warning.call_args_list
+    )
+
+
+def test_parameters_shape_hides_values():
+    assert parameters_shape({"email": "a@b.c", "id": 1}) == {
+        "email": "str",
+        "id": "int",
+    }
+    assert parameters_shape(("a@b.c",)) == ["str"]
+    assert parameters_shape([{"id": 1}, {"id": 2}], many=True) == {
+        "rows": 2,
+        "row": {"id": "int"},
+    }
@@ -0,0 +1,16 @@
+from models.ImportUpload import ImportUpload
+
+
+def test_import_upload_model_saved(assert_new_model_saved, list_fixture, session):
+    upload = ImportUpload(list_id=list_fixture.id, type="email")
+    session.add(upload)
+    session.commit()
+    assert upload.state == "in_progress"
+    assert upload.lines_committed == 0
+    assert upload.inserted == 0
+    assert upload.skipped == 0
+    assert upload.invalid == 0
+    assert_new_model_saved(upload)
+    assert upload.to_dict()["upload_id"] == upload.id
+    session.delete(upload)
+    session.commit()
@@ -0,0 +1,20 @@
+from models.OutboxNotification import OutboxNotification
+
+
+def test_outbox_notification_model_saved(assert_new_model_saved, list_fixture, session):
+    notification = OutboxNotification(
+        list_id=list_fixture.id,
+        type="email",
+        recipient="fake@email.com",
+        template_id="template_id",
+        personalisation={"name": "fixture_name"},
+    )
+    session.add(notification)
+    session.commit()
+    assert notification.state == "pending"
+    assert notification.attempts == 0
+    assert notification.next_attempt_at is not None
+    assert notification.service_api_key is None
+    assert_new_model_saved(notification)
+    session.delete(notification)
+    session.commit()
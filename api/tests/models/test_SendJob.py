@@ -0,0 +1,34 @@
+from models.SendJob import SendJob
+
+
+def test_send_job_model_saved(assert_new_model_saved, list_fixture, session):
+    send_job = SendJob(
+        list_id=list_fixture.id,
+        template_id="template_id",
+        template_type="email",
+        job_name="job_name",
+        personalisation={"subject": "subject"},
+    )
+    session.add(send_job)
+    session.commit()
+    assert send_job.state == "pending"
+    assert send_job.unique is True
+    assert send_job.cursor is None
+    assert send_job.chunks_sent == 0
+    assert send_job.sent_count == 0
+    assert send_job.personalisation == {"subject": "subject"}
+    assert_new_model_saved(send_job)
+    session.delete(send_job)
+    session.commit()
+
+
+def test_send_job_to_dict_omits_api_key(list_fixture):
+    send_job = SendJob(
+        list_id=list_fixture.id,
+        template_id="template_id",
+        template_type="email",
+        job_name="job_name",
+        service_api_key="secret",
+    )
+    assert "service_api_key" not in send_job.to_dict()
+    assert send_job.to_dict()["list_id"] == list_fixture.id
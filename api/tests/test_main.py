@@ -1,12 +1,14 @@
+import asyncio
 import main
-from unittest.mock import MagicMock, patch
+import os
+import subprocess
+import sys
+from unittest.mock import AsyncMock, patch
 
 
-@patch("main.Mangum")
-def test_handler_api_gateway_event(mock_mangum, context_fixture, capsys):
-    mock_asgi_handler = MagicMock()
+@patch("main.asgi_handler")
+def test_handler_api_gateway_event(mock_asgi_handler, context_fixture, capsys):
     mock_asgi_handler.return_value = True
-    mock_mangum.return_value = mock_asgi_handler
     assert main.handler({"httpMethod": "GET"}, context_fixture) is True
     mock_asgi_handler.assert_called_once_with({"httpMethod": "GET"}, context_fixture)
 
@@ -14,6 +16,15 @@ def test_handler_api_gateway_event(mock_mangum, context_fixture, capsys):
     assert "ListManager" in log
 
 
+@patch("main.api.add_db_pool_metrics")
+@patch("main.asgi_handler")
+def test_handler_adds_db_pool_metrics(
+    mock_asgi_handler, mock_add_db_pool_metrics, context_fixture
+):
+    main.handler({"httpMethod": "GET"}, context_fixture)
+    mock_add_db_pool_metrics.assert_called_once()
+
+
 @patch("main.log")
 def test_handler_unmatched_event(mock_logger, context_fixture):
     assert main.handler({}, context_fixture) is False
@@ -35,3 +46,106 @@ def test_handler_migrate_event_failed(mock_migrate_head, context_fixture):
     mock_migrate_head.side_effect = Exception()
     assert main.handler({"task": "migrate"}, context_fixture) == "Error"
     mock_migrate_head.assert_called_once()
+
+
+@patch("main.api.process_send_jobs")
+def test_handler_send_event(mock_process_send_jobs, context_fixture):
+    assert main.handler({"task": "send", "job_id": "foo"}, context_fixture) == "Success"
+    mock_process_send_jobs.assert_called_once_with(
+        "foo", context_fixture.get_remaining_time_in_millis
+    )
+
+
+@patch("main.api.process_send_jobs")
+def test_handler_send_event_failed(mock_process_send_jobs, context_fixture):
+    mock_process_send_jobs.side_effect = Exception()
+    assert main.handler({"task": "send"}, context_fixture) == "Error"
+    mock_process_send_jobs.assert_called_once_with(
+        None, context_fixture.get_remaining_time_in_millis
+    )
+
+
+@patch("main.api.reconcile_subscriber_counts")
+def test_handler_reconcile_counts_event(mock_reconcile, context_fixture):
+    assert main.handler({"task": "reconcile_counts"}, context_fixture) == "Success"
+    mock_reconcile.assert_called_once()
+
+
+@patch("main.api.reconcile_subscriber_counts")
+def test_handler_reconcile_counts_event_failed(mock_reconcile, context_fixture):
+    mock_reconcile.side_effect = Exception()
+    assert main.handler({"task": "reconcile_counts"}, context_fixture) == "Error"
+    mock_reconcile.assert_called_once()
+
+
+@patch("main.api.drain_notification_outbox")
+def test_handler_drain_notifications_event(mock_drain, context_fixture):
+    assert main.handler({"task": "drain_notifications"}, context_fixture) == "Success"
+    mock_drain.assert_called_once_with(context_fixture.get_remaining_time_in_millis)
+
+
+@patch("main.api.drain_notification_outbox")
+def test_handler_drain_notifications_event_failed(mock_drain, context_fixture):
+    mock_drain.side_effect = Exception()
+    assert main.handler({"task": "drain_notifications"}, context_fixture) == "Error"
+
+
+def api_gateway_event(path):
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "GET",
+        "headers": {"Host": "localhost"},
+        "multiValueHeaders": {"Host": ["localhost"]},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "requestContext": {"resourcePath": "/{proxy+}", "stage": "v1"},
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+@patch("main.api.drain_outbox", new_callable=AsyncMock, return_value=0)
+def test_handler_serves_requests_after_drain_notifications(
+    mock_drain_outbox, context_fixture
+):
+    # A fresh container has a current loop, whatever earlier tests left behind
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    assert (
+        main.handler(api_gateway_event("/version"), context_fixture)["statusCode"]
+        == 200
+    )
+    assert main.handler({"task": "drain_notifications"}, context_fixture) == "Success"
+    mock_drain_outbox.assert_awaited_once()
+    # The drain must leave the event loop Mangum uses in place
+    assert (
+        main.handler(api_gateway_event("/version"), context_fixture)["statusCode"]
+        == 200
+    )
+
+
+@patch("main.api.warm_up")
+def test_handler_heartbeat_event_warm_up(mock_warm_up):
+    assert main.handler({"task": "heartbeat", "warm_up": True}, {}) == "Success"
+    mock_warm_up.assert_called_once()
+
+
+@patch("main.api.warm_up")
+def test_handler_heartbeat_event_without_warm_up(mock_warm_up):
+    assert main.handler({"task": "heartbeat"}, {}) == "Success"
+    mock_warm_up.assert_not_called()
+
+
+def test_import_main_does_not_load_alembic():
+    # Run in a fresh interpreter since the test suite itself imports alembic
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, main; assert 'alembic' not in sys.modules",
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
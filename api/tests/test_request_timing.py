@@ -0,0 +1,54 @@
+import pytest
+
+from sqlalchemy import create_engine, text
+
+from request_timing import (
+    current_timings,
+    instrument_queries,
+    time_notify_request,
+    time_request,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_queries(engine)
+    return engine
+
+
+def test_time_request_counts_queries(engine):
+    with time_request() as timings:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+
+    assert timings.db_queries == 2
+    assert timings.db_seconds > 0
+    assert current_timings.get() is None
+
+
+def test_failed_queries_are_not_counted(engine):
+    with time_request() as timings:
+        with engine.connect() as connection:
+            with pytest.raises(Exception):
+                connection.execute(text("SELECT * FROM missing"))
+            connection.execute(text("SELECT 1"))
+
+    assert timings.db_queries == 1
+
+
+def test_queries_outside_requests_are_ignored(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def test_server_timing_header():
+    with time_request() as timings:
+        with time_notify_request():
+            pass
+
+    header = timings.server_timing()
+    assert header.startswith('db;dur=0.0;desc="0 queries", notify;dur=')
+    assert 'desc="1 requests"' in header
+    assert ", total;dur=" in header
@@ -8,7 +8,7 @@ resource "aws_cloudwatch_event_target" "tigger-lambda-every-three-minutes" {
   rule      = aws_cloudwatch_event_rule.every-three-minutes.name
   target_id = "${var.product_name}-${var.env}-lambda-warmer"
   arn       = aws_lambda_function.api.arn
-  input     = jsonencode({ task = "heartbeat" })
+  input     = jsonencode({ task = "heartbeat", warm_up = true })
 }
 
 resource "aws_lambda_permission" "allow-cloudwatch-to-call-lambda" {
@@ -17,4 +17,66 @@ resource "aws_lambda_permission" "allow-cloudwatch-to-call-lambda" {
   function_name = aws_lambda_function.api.function_name
   principal     = "events.amazonaws.com"
   source_arn    = aws_cloudwatch_event_rule.every-three-minutes.arn
-}
\ No newline at end of file
+}
+resource "aws_cloudwatch_event_rule" "every-five-minutes" {
+  name                = "send-job-sweeper"
+  description         = "Fires every five minutes"
+  schedule_expression = "rate(5 minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "trigger-lambda-send-jobs" {
+  rule      = aws_cloudwatch_event_rule.every-five-minutes.name
+  target_id = "${var.product_name}-${var.env}-send-jobs"
+  arn       = aws_lambda_function.api.arn
+  input     = jsonencode({ task = "send" })
+}
+
+resource "aws_lambda_permission" "allow-cloudwatch-to-call-lambda-send-jobs" {
+  statement_id  = "AllowSendJobsExecutionFromCloudWatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.api.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.every-five-minutes.arn
+}
+
+resource "aws_cloudwatch_event_rule" "daily" {
+  name                = "subscriber-count-reconciler"
+  description         = "Fires once a day"
+  schedule_expression = "cron(0 7 * * ? *)"
+}
+
+resource "aws_cloudwatch_event_target" "trigger-lambda-reconcile-counts" {
+  rule      = aws_cloudwatch_event_rule.daily.name
+  target_id = "${var.product_name}-${var.env}-reconcile-counts"
+  arn       = aws_lambda_function.api.arn
+  input     = jsonencode({ task = "reconcile_counts" })
+}
+
+resource "aws_lambda_permission" "allow-cloudwatch-to-call-lambda-reconcile-counts" {
+  statement_id  = "AllowReconcileCountsExecutionFromCloudWatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.api.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.daily.arn
+}
+
+resource "aws_cloudwatch_event_rule" "every-minute" {
+  name                = "notification-outbox-drain"
+  description         = "Fires every minute"
+  schedule_expression = "rate(1 minute)"
+}
+
+resource "aws_cloudwatch_event_target" "trigger-lambda-drain-notifications" {
+  rule      = aws_cloudwatch_event_rule.every-minute.name
+  target_id = "${var.product_name}-${var.env}-drain-notifications"
+  arn       = aws_lambda_function.api.arn
+  input     = jsonencode({ task = "drain_notifications" })
+}
+
+resource "aws_lambda_permission" "allow-cloudwatch-to-call-lambda-drain-notifications" {
+  statement_id  = "AllowDrainNotificationsExecutionFromCloudWatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.api.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.every-minute.arn
+}
@@ -55,6 +55,19 @@ data "aws_iam_policy_document" "api_policies" {
     ]
   }
 
+  # Send jobs hand themselves over to a new asynchronous invocation
+  statement {
+
+    effect = "Allow"
+
+    actions = [
+      "lambda:InvokeFunction"
+    ]
+    resources = [
+      "arn:aws:lambda:${var.region}:${var.account_id}:function:api"
+    ]
+  }
+
 }
 
 resource "aws_iam_policy" "api" {
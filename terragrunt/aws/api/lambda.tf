@@ -17,6 +17,7 @@ resource "aws_lambda_function" "api" {
     variables = {
       API_AUTH_TOKEN          = var.api_auth_token
       NOTIFY_KEY              = var.notify_key
+      NOTIFICATION_OUTBOX     = "true"
       SQLALCHEMY_DATABASE_URI = module.rds.proxy_connection_string_value
     }
   }